@@ -1,14 +1,49 @@
 """
 FastAPI app exposing:
-- GET /api/models                 -> list of model names
-- GET /api/models/{name}          -> {category: {subcategory: score}}
-- GET /api/models/{name}/full     -> includes weights + notes
-- GET /api/score/{name}           -> computed per-category averages + overall
+- GET /api/models                 -> list of model names (?limit=&cursor=&q=&scores=true to paginate)
+- GET /api/models/{name}          -> {category: {subcategory: score}} (?as_of=revision|ISO time for a past state)
+- GET /api/models/{name}/full     -> includes weights + notes (?as_of= as above)
+- GET /api/models/{name}/diff     -> changed scores, notes and weights between two revisions (?from=&to=)
+- GET /api/models/{name}/similar  -> nearest models by subfeature scores (?k=&metric=cosine|euclidean&weights=)
+- GET /api/score/{name}           -> per-category averages + overall (materialized)
+- GET /api/scores                 -> per-category averages + overall for every model (leaderboard)
+- GET /api/profiles               -> stored scoring profiles (named category weights)
+- POST /api/profiles              -> create/replace a profile {"name", "description", "weights"}
+- GET /api/rankings?profile=      -> every model ranked under a stored profile (?limit=&offset=)
+- POST /api/rankings              -> rankings for many stored and/or ad-hoc profiles at once
+- GET /api/analysis/sensitivity   -> top-k / rank stability under Dirichlet-sampled category weights
+- GET /api/search?q=             -> full-text search over subfeature notes, grouped by model/category
+- POST /api/search                -> the same, combined with recommender constraints
+- GET /api/export                 -> whole dataset as streamed NDJSON (?format=columnar for a values matrix)
+- POST /api/recommend             -> filter by subfeature constraints, rank top-k by ABUS score
 - POST /api/models/upsert         -> upsert model with categories/subfeatures
+- POST /api/models/bulk_upsert    -> upsert many models (JSON list or NDJSON) in one transaction
+- POST /api/ingest                -> queue paper texts for background scoring + upsert; returns job ids
+- GET /api/ingest/{id}            -> job status and, once done, the scored payload
+- GET /api/ingest                 -> queue counts by status
 - POST /api/compute?a=..&b=..     -> demo math endpoint
 - GET /health                     -> health check
+- GET /metrics                    -> Prometheus metrics (per-route latency, SQL statements, cache hits)
 - GET /                           -> redirect to docs
 
+With ABUS_SNAPSHOT=<file> (built by `python -m services.snapshot build`)
+every read endpoint is served from that memory-mapped snapshot instead of
+the DB, which is then never opened; writes, as_of, diff and ingestion answer 503.
+
+Ingestion runs off the request path on a persistent SQLite job queue with its
+own worker pool (services.ingest_queue, ABUS_INGEST_WORKERS), started with the
+app so jobs left over from a previous run resume.
+
+The GET /api/models* and /api/score* endpoints are served from a per-version
+response cache with strong ETags (If-None-Match -> 304), see api.response_cache.
+
+Handlers are `async def`; DB work goes through api.db.run_db(), i.e. the async
+engine (asyncpg / aiosqlite) or, for SQLite by default, the threadpool.
+
+Every response carries a Server-Timing header (total, DB time and statement
+count, cache hit/miss), see api.metrics; ABUS_SLOW_REQUEST_MS logs slow
+requests with their slowest SQL.
+
 Also mounts /web (static) so you can open the site from the API (same origin).
 """
 
@@ -18,25 +53,51 @@ ROOT = os.path.dirname(os.path.dirname(__file__))  # ABUS project root
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
-from typing import Dict
-from fastapi import FastAPI, HTTPException, Body
+import json
+import re
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Body, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import PlainTextResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from sqlmodel import select
 
-from api.db import init_db, get_session
-from api.db_models import Model, Category, Subcategory, Score
+from api.db import init_db, get_session, run_db, run_db_write
+from api.db_models import Model
+from api.metrics import MetricsMiddleware, render_metrics
+from api.response_cache import acached_json_response
+from services.data_version import version_tracker
+from services.export_service import iter_export_columnar, iter_export_ndjson, list_models_page
+from services.history_service import diff_model, get_model_full_as_of, get_model_scores_as_of, parse_as_of
+from services.ingest_queue import default_ingest_queue
+from services.materialized_scores import get_materialized_score, get_materialized_scores
+from services.profile_service import get_profile, get_rankings, list_profiles, rank_models, upsert_profile
+from services.recommender import get_recommender
 from services.scoring_service import (
-    compute_model_scores,
     get_model_full as svc_get_model_full,
+    get_model_scores as svc_get_model_scores,
     upsert_model_from_payload,
+    upsert_models_from_payloads,
 )
+from services.search_service import search_notes
+from services.sensitivity import MAX_SAMPLES, MAX_TRACK, analyze_sensitivity
+from services.similarity import get_similarity_index, parse_weights, refresh_similarity
+from services.snapshot import Snapshot, open_snapshot
 
 # -----------------------------------------------------------------------------
 # App setup
 # -----------------------------------------------------------------------------
-app = FastAPI(title="ABUS API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(_app):
+    # Resume queued ingestion jobs; writes need the DB, so snapshot servers skip it
+    if SNAPSHOT is None:
+        default_ingest_queue().start()
+    yield
+    if SNAPSHOT is None:
+        default_ingest_queue().stop()
+
+app = FastAPI(title="ABUS API", version="0.1.0", lifespan=lifespan)
 
 # CORS for local dev (allow web on 127.0.0.1:5500 OR same-origin if using /web)
 app.add_middleware(
@@ -52,8 +113,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Ensure tables exist (safe if already created)
-init_db()
+# Outermost: times the whole request (CORS included) and adds Server-Timing
+app.add_middleware(MetricsMiddleware)
+
+# Read replicas serve a memory-mapped snapshot and never touch the DB
+SNAPSHOT_PATH = os.getenv("ABUS_SNAPSHOT")
+SNAPSHOT: Snapshot | None = open_snapshot(SNAPSHOT_PATH) if SNAPSHOT_PATH else None
+
+if SNAPSHOT is None:
+    # Ensure tables exist (safe if already created)
+    init_db()
+else:
+    version_tracker.pin(SNAPSHOT.version)
 
 # Optionally serve the frontend from the same origin to avoid CORS entirely
 WEB_DIR = os.path.join(ROOT, "web")
@@ -72,49 +143,195 @@ def root():
 def health():
     return {"ok": True}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # -----------------------------------------------------------------------------
 # Read-only endpoints
 # -----------------------------------------------------------------------------
+async def _read(db_fn, snapshot_fn, *args, **kwargs):
+    """db_fn(session, ...) through run_db, or snapshot_fn(SNAPSHOT, ...) when serving a snapshot."""
+    if SNAPSHOT is not None:
+        return await run_in_threadpool(snapshot_fn, SNAPSHOT, *args, **kwargs)
+    return await run_db(db_fn, *args, **kwargs)
+
+def _require_db(what: str):
+    if SNAPSHOT is not None:
+        raise HTTPException(503, f"{what} needs the database; this server reads a snapshot (ABUS_SNAPSHOT)")
+
+def _model_names(s):
+    return sorted(s.exec(select(Model.name)).all())
+
 @app.get("/api/models")
-def list_models():
-    with get_session() as s:
-        names = [m.name for m in s.exec(select(Model)).all()]
-    return {"models": sorted(names)}
+async def list_models(
+    request: Request,
+    limit: int | None = Query(None, ge=1, le=1000, description="page size; enables cursor pagination"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    q: str | None = Query(None, description="case-insensitive name filter"),
+    scores: bool = Query(False, description="embed overall + category scores"),
+):
+    if limit is None and cursor is None and q is None and not scores:
+        async def build():
+            return {"models": await _read(_model_names, Snapshot.model_names)}
+        return await acached_json_response(request, ("models",), build)
 
-@app.get("/api/models/{name}")
-def get_model(name: str):
-    with get_session() as s:
-        m = s.exec(select(Model).where(Model.name == name)).first()
-        if not m:
-            raise HTTPException(404, f"Model '{name}' not found")
+    async def build_page():
+        try:
+            return await _read(list_models_page, Snapshot.list_models_page,
+                               limit=limit or 100, cursor=cursor, q=q, with_scores=scores)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+    return await acached_json_response(request, ("models", limit, cursor, q, scores), build_page)
 
-        # Build nested shape: {category: {subcategory: score}}
-        out: Dict[str, Dict[str, float]] = {}
-        scores = s.exec(select(Score).where(Score.model_id == m.id)).all()
-        for sc in scores:
-            sub = s.get(Subcategory, sc.subcategory_id)
-            cat = s.get(Category, sub.category_id)
-            out.setdefault(cat.name, {})[sub.name] = float(sc.value)
-        return out
+def _check_as_of(*values):
+    if any(v is not None for v in values):
+        _require_db("score history")
+    try:
+        for v in values:
+            if v is not None:
+                parse_as_of(v)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+@app.get("/api/models/{name}")
+async def get_model(
+    name: str,
+    request: Request,
+    as_of: str | None = Query(None, description="revision number or ISO-8601 time; default: current"),
+):
+    # Nested shape: {category: {subcategory: score}}
+    _check_as_of(as_of)
+    async def build():
+        try:
+            if as_of is not None:
+                return await run_db(get_model_scores_as_of, name, as_of)
+            return await _read(svc_get_model_scores, Snapshot.get_model_scores, name)
+        except ValueError as e:
+            raise HTTPException(404, str(e))
+    return await acached_json_response(request, ("model", name, as_of), build)
 
 @app.get("/api/models/{name}/full")
-def get_model_full(name: str):
-    with get_session() as s:
+async def get_model_full(
+    name: str,
+    request: Request,
+    as_of: str | None = Query(None, description="revision number or ISO-8601 time; default: current"),
+):
+    _check_as_of(as_of)
+    async def build():
+        try:
+            if as_of is not None:
+                return await run_db(get_model_full_as_of, name, as_of)
+            return await _read(svc_get_model_full, Snapshot.get_model_full, name)
+        except ValueError as e:
+            raise HTTPException(404, str(e))
+    return await acached_json_response(request, ("model_full", name, as_of), build)
+
+@app.get("/api/models/{name}/diff")
+async def get_model_diff(
+    name: str,
+    request: Request,
+    from_: str = Query(..., alias="from", description="revision number or ISO-8601 time"),
+    to: str | None = Query(None, description="revision number or ISO-8601 time; default: latest"),
+):
+    _check_as_of(from_, to)
+    async def build():
         try:
-            return svc_get_model_full(s, name)
+            return await run_db(diff_model, name, from_, to)
         except ValueError as e:
             raise HTTPException(404, str(e))
+    return await acached_json_response(request, ("model_diff", name, from_, to), build)
+
+@app.get("/api/models/{name}/similar")
+async def get_similar(
+    name: str,
+    k: int = Query(10, ge=1, le=100),
+    metric: str = Query("cosine", pattern="^(cosine|euclidean)$"),
+    weights: str | None = Query(None, description="euclidean only, e.g. usability:40,bioinformatics_relevance:60"),
+):
+    index = await _read(get_similarity_index, Snapshot.similarity_index)
+    if name not in index.sm.model_index:
+        raise HTTPException(404, f"Model '{name}' not found")
+    try:
+        return await run_in_threadpool(index.similar, name, k=k, metric=metric, weights=parse_weights(weights))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+_WHERE_RE = re.compile(r"^\s*([\w.]+)\s*((?:==|!=|>=|<=|>|<|=).*)$")
+
+def _parse_where(items):
+    """['usability.code_availability>=1', ...] -> recommender constraints {key: '>=1'}."""
+    constraints = {}
+    for item in items or []:
+        m = _WHERE_RE.match(item)
+        if not m:
+            raise HTTPException(400, f"Bad filter {item!r}; expected e.g. usability.code_availability>=1")
+        constraints[m.group(1)] = m.group(2)
+    return constraints
+
+@app.get("/api/search")
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=1, description="words to find in subfeature notes; word* for a prefix"),
+    limit: int = Query(20, ge=1, le=100, description="max models"),
+    per_model: int = Query(5, ge=1, le=100, description="max hits per model"),
+    where: list[str] = Query([], description="recommender filter, repeatable: usability.code_availability>=1"),
+):
+    constraints = _parse_where(where)
+    async def build():
+        try:
+            return await _read(search_notes, Snapshot.search_notes, q,
+                               limit=limit, per_model=per_model, constraints=constraints)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+    key = ("search", q, limit, per_model, tuple(sorted(constraints.items())))
+    return await acached_json_response(request, key, build)
+
+@app.post("/api/search")
+async def search_post(payload: dict = Body(...)):
+    """Body: {"q": "structure", "constraints": {"usability.code_availability": ">= 1"}, "limit": 20, "per_model": 5}"""
+    constraints = payload.get("constraints") or {}
+    if not isinstance(constraints, dict):
+        raise HTTPException(400, "constraints must be an object")
+    try:
+        return await _read(search_notes, Snapshot.search_notes, payload.get("q"), limit=int(payload.get("limit", 20)),
+                           per_model=int(payload.get("per_model", 5)), constraints=constraints)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(400, str(e))
+
+def _stream_with_session(produce):
+    with get_session() as s:
+        yield from produce(s)
+
+@app.get("/api/export")
+def export(format: str = Query("ndjson", pattern="^(ndjson|columnar)$")):
+    """
+    Whole dataset in one streamed response; memory stays flat in the number of models.
+    Kept sync: Starlette pulls each chunk of the generator in the threadpool.
+    """
+    if format == "columnar":
+        body = SNAPSHOT.iter_export_columnar() if SNAPSHOT else _stream_with_session(iter_export_columnar)
+        return StreamingResponse(body, media_type="application/json")
+    body = SNAPSHOT.iter_export_ndjson() if SNAPSHOT else _stream_with_session(iter_export_ndjson)
+    return StreamingResponse(body, media_type="application/x-ndjson")
 
 # -----------------------------------------------------------------------------
 # Compute/scoring
 # -----------------------------------------------------------------------------
 @app.get("/api/score/{name}")
-def get_score(name: str):
-    with get_session() as s:
+async def get_score(name: str, request: Request):
+    async def build():
         try:
-            return compute_model_scores(s, name)
+            return await _read(get_materialized_score, Snapshot.get_score, name)
         except ValueError as e:
             raise HTTPException(404, str(e))
+    return await acached_json_response(request, ("score", name), build)
+
+@app.get("/api/scores")
+async def get_scores(request: Request):
+    async def build():
+        return {"scores": await _read(get_materialized_scores, Snapshot.get_scores)}
+    return await acached_json_response(request, ("scores",), build)
 
 @app.post("/api/compute")
 def compute(a: float, b: float):
@@ -124,13 +341,213 @@ def compute(a: float, b: float):
     return {"result": 2 * (a * b) / (a + b)}  # harmonic-mean style
 
 # -----------------------------------------------------------------------------
-# Upsert (create/update a full model via payload)
+# Scoring profiles (named category weights) and rankings
 # -----------------------------------------------------------------------------
-@app.post("/api/models/upsert")
-def models_upsert(payload: dict = Body(...)):
-    with get_session() as s, s.begin():
+@app.get("/api/profiles")
+async def profiles(request: Request):
+    async def build():
+        return {"profiles": await _read(list_profiles, Snapshot.list_profiles)}
+    return await acached_json_response(request, ("profiles",), build)
+
+@app.post("/api/profiles")
+async def profiles_upsert(payload: dict = Body(...)):
+    _require_db("saving profiles")
+    try:
+        name = await run_db_write(upsert_profile, payload)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return {"ok": True, "name": name}
+
+@app.get("/api/rankings")
+async def rankings(
+    request: Request,
+    profile: str = Query(..., description="name of a stored profile (see /api/profiles)"),
+    limit: int | None = Query(None, ge=1, le=100000),
+    offset: int = Query(0, ge=0),
+):
+    async def build():
+        try:
+            return await _read(get_rankings, Snapshot.get_rankings, profile, offset=offset, limit=limit)
+        except ValueError as e:
+            raise HTTPException(404, str(e))
+    return await acached_json_response(request, ("rankings", profile, limit, offset), build)
+
+@app.post("/api/rankings")
+async def rankings_batch(payload: dict = Body(...)):
+    """
+    Body: {"profiles": {"ppi": {"bioinformatics_relevance": 50, "usability": 10}, ...},
+           "stored": ["ABUS-PPI"], "limit": 20, "offset": 0}
+    Every model is scored under all profiles at once; results are keyed by profile label.
+    """
+    adhoc = payload.get("profiles") or {}
+    stored = payload.get("stored") or []
+    if not isinstance(adhoc, dict) or not isinstance(stored, list):
+        raise HTTPException(400, "profiles must be an object and stored a list of profile names")
+    try:
+        limit = None if payload.get("limit") is None else int(payload["limit"])
+        offset = int(payload.get("offset") or 0)
+    except (TypeError, ValueError):
+        raise HTTPException(400, "limit and offset must be integers")
+
+    def build(s):
+        profiles = dict(adhoc)
+        for name in stored:
+            profiles[name] = get_profile(s, name)["weights"]
+        return rank_models(s, profiles, offset=offset, limit=limit)
+
+    def build_snapshot(snap: Snapshot):
+        profiles = dict(adhoc)
+        for name in stored:
+            profiles[name] = snap.get_profile(name)["weights"]
+        return snap.rank_models(profiles, offset=offset, limit=limit)
+
+    try:
+        return {"rankings": await _read(build, build_snapshot)}
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+@app.get("/api/analysis/sensitivity")
+async def sensitivity(
+    request: Request,
+    profile: str | None = Query(None, description="stored profile to perturb (default: the models' mean weights)"),
+    weights: str | None = Query(None, description="ad-hoc base weights, e.g. usability:15,bioinformatics_relevance:30"),
+    samples: int = Query(2000, ge=1, le=MAX_SAMPLES),
+    concentration: float = Query(100.0, gt=0, description="Dirichlet concentration; higher = closer to the base"),
+    k: int = Query(5, ge=1),
+    track: int = Query(10, ge=1, le=MAX_TRACK, description="models (best under the base) to report ranks for"),
+    seed: int = Query(0),
+):
+    async def build():
         try:
-            model_name = upsert_model_from_payload(s, payload)
+            return await _read(analyze_sensitivity, Snapshot.analyze_sensitivity, profile=profile,
+                               weights=parse_weights(weights), samples=samples, concentration=concentration,
+                               k=k, track=track, seed=seed)
         except ValueError as e:
             raise HTTPException(400, str(e))
-        return {"ok": True, "name": model_name}
+    key = ("sensitivity", profile, weights, samples, concentration, k, track, seed)
+    return await acached_json_response(request, key, build)
+
+# -----------------------------------------------------------------------------
+# Recommender
+# -----------------------------------------------------------------------------
+@app.post("/api/recommend")
+async def recommend(payload: dict = Body(...)):
+    """
+    Body: {"constraints": {"usability.code_availability": ">= 1.5", ...}, "k": 10, "weights": {"usability": 40}}
+    A bare constraint object (README format) is accepted too.
+    """
+    if "constraints" in payload:
+        constraints = payload.get("constraints") or {}
+        k = payload.get("k", 10)
+        weights = payload.get("weights")
+    else:
+        constraints, k, weights = payload, 10, None
+    if not isinstance(constraints, dict) or (weights is not None and not isinstance(weights, dict)):
+        raise HTTPException(400, "constraints and weights must be objects")
+    try:
+        k = int(k)
+    except (TypeError, ValueError):
+        raise HTTPException(400, "k must be an integer")
+
+    engine = await _read(get_recommender, Snapshot.recommender)
+    try:
+        return engine.recommend(constraints, k=k, weights=weights)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+# -----------------------------------------------------------------------------
+# Upsert (create/update a full model via payload)
+# -----------------------------------------------------------------------------
+@app.post("/api/models/upsert")
+async def models_upsert(payload: dict = Body(...)):
+    _require_db("upserts")
+    try:
+        model_name = await run_db_write(upsert_model_from_payload, payload)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    await run_db(refresh_similarity, [model_name])
+    return {"ok": True, "name": model_name}
+
+def _parse_bulk_body(body: bytes, content_type: str):
+    """
+    Accepts a JSON list of payloads, {"models": [...]}, or NDJSON (one payload per line).
+    Returns (payloads, line_numbers, errors); line_numbers is None for JSON bodies.
+    Unparsable NDJSON lines become per-line errors.
+    """
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        payloads, lines, errors = [], [], []
+        for lineno, line in enumerate(body.decode("utf-8").splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                payloads.append(json.loads(line))
+                lines.append(lineno)
+            except json.JSONDecodeError as e:
+                errors.append({"line": lineno, "error": f"invalid JSON: {e}"})
+        return payloads, lines, errors
+    try:
+        data = json.loads(body or b"null")
+    except json.JSONDecodeError as e:
+        raise HTTPException(400, f"invalid JSON: {e}")
+    if isinstance(data, dict) and isinstance(data.get("models"), list):
+        data = data["models"]
+    if not isinstance(data, list):
+        raise HTTPException(400, "expected a JSON list of payloads, {\"models\": [...]}, or NDJSON")
+    return data, None, []
+
+def _bulk_upsert(payloads):
+    # Large batches are CPU-bound set-building: run them in the threadpool, off the event loop
+    with get_session() as s, s.begin():
+        return upsert_models_from_payloads(s, payloads)
+
+@app.post("/api/models/bulk_upsert")
+async def models_bulk_upsert(request: Request):
+    _require_db("upserts")
+    payloads, lines, parse_errors = _parse_bulk_body(await request.body(), request.headers.get("content-type", ""))
+    result = await run_in_threadpool(_bulk_upsert, payloads)
+    if result["ok"]:
+        await run_db(refresh_similarity, result["ok"])
+    if lines is not None:
+        for err in result["errors"]:
+            err["line"] = lines[err["index"]]
+    return {
+        "ok": len(result["ok"]),
+        "failed": len(result["errors"]) + len(parse_errors),
+        "names": result["ok"],
+        "errors": parse_errors + result["errors"],
+    }
+
+# -----------------------------------------------------------------------------
+# Background ingestion (paper text -> scores -> upsert, see services.ingest_queue)
+# -----------------------------------------------------------------------------
+@app.post("/api/ingest", status_code=202)
+async def ingest_submit(payload: dict = Body(...)):
+    """
+    {"name", "text", "weights"?} for one paper, or {"papers": [...], "weights"?} for many.
+    Identical submissions return the existing job ("deduplicated": true).
+    """
+    _require_db("ingestion")
+    single = "papers" not in payload
+    papers = [payload] if single else payload["papers"]
+    if not isinstance(papers, list):
+        raise HTTPException(400, "'papers' must be a list")
+    queue = default_ingest_queue()
+    try:
+        jobs = await run_in_threadpool(queue.submit_many, papers, None if single else payload.get("weights"))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    queue.start()
+    return jobs[0] if single else {"jobs": jobs}
+
+@app.get("/api/ingest")
+async def ingest_stats():
+    _require_db("ingestion")
+    return await run_in_threadpool(default_ingest_queue().stats)
+
+@app.get("/api/ingest/{job_id}")
+async def ingest_status(job_id: int):
+    _require_db("ingestion")
+    job = await run_in_threadpool(default_ingest_queue().get, job_id)
+    if job is None:
+        raise HTTPException(404, f"ingestion job {job_id} not found")
+    return job
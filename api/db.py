@@ -2,31 +2,101 @@
 """
 Database engine + session management.
 - Reads DATABASE_URL from .env (default sqlite:///./abus.db)
-- Enables SQLite foreign keys for data integrity
-- Ensures models are imported before create_all()
+- Enables SQLite foreign keys for data integrity; file databases run in WAL
+  mode with tuned pragmas (SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS,
+  SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_KB, SQLITE_MMAP_MB)
+- Pool tuning: DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+  DB_POOL_PRE_PING (shared by the sync and async engines)
+- Async engine for the API handlers: sqlite+aiosqlite / postgresql+asyncpg,
+  derived from DATABASE_URL unless ASYNC_DATABASE_URL is set.
+  ABUS_ASYNC_DB=auto (default) uses it for server databases only: for a local
+  SQLite file the sync driver in the threadpool is about twice as cheap per
+  query as aiosqlite's thread hops. run_db() hides the difference.
+- Cursor hooks on both engines time every statement for api.metrics
+  (per-request SQL count / DB time, /metrics, Server-Timing)
+- Ensures models are imported before create_all(); also creates the note
+  full-text index (services.search_service)
 """
 
 import os
+import time
+from typing import Any, Dict
 from dotenv import load_dotenv
 from sqlmodel import SQLModel, create_engine, Session
 from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from api.metrics import record_sql
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./abus.db")
 
-# SQLite dev convenience; safe for local use. For Postgres, this is ignored.
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(DATABASE_URL, echo=False, connect_args=connect_args)
+_IS_SQLITE = DATABASE_URL.startswith("sqlite")
+_SQLITE_MEMORY = _IS_SQLITE and make_url(DATABASE_URL).database in (None, "", ":memory:")
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, "1" if default else "0").lower() in ("1", "true", "yes", "on")
+
+
+def _pool_kwargs() -> Dict[str, Any]:
+    """QueuePool settings; in-memory SQLite keeps SQLAlchemy's single-connection default."""
+    if _SQLITE_MEMORY:
+        return {}
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        # a local SQLite file cannot drop connections; skip the extra round-trip per checkout
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", not _IS_SQLITE),
+    }
 
-# Enforce foreign keys on SQLite (off by default).
-if DATABASE_URL.startswith("sqlite"):
-    @event.listens_for(engine, "connect")
+
+def _sqlite_pragmas() -> list:
+    pragmas = ["PRAGMA foreign_keys=ON"]
+    if not _SQLITE_MEMORY:
+        pragmas += [
+            f"PRAGMA journal_mode={os.getenv('SQLITE_JOURNAL_MODE', 'WAL')}",
+            f"PRAGMA synchronous={os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+            f"PRAGMA busy_timeout={int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))}",
+            f"PRAGMA cache_size=-{int(os.getenv('SQLITE_CACHE_KB', '20000'))}",
+            f"PRAGMA mmap_size={int(os.getenv('SQLITE_MMAP_MB', '256')) * 1024 * 1024}",
+            "PRAGMA temp_store=MEMORY",
+        ]
+    return pragmas
+
+
+def _install_sqlite_pragmas(sync_engine) -> None:
+    pragmas = _sqlite_pragmas()
+
+    @event.listens_for(sync_engine, "connect")
     def _set_sqlite_pragma(dbapi_connection, _):
         cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON;")
+        for pragma in pragmas:
+            cursor.execute(pragma)
         cursor.close()
 
 
+def _install_sql_timing(sync_engine) -> None:
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("abus_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        record_sql(time.perf_counter() - conn.info["abus_query_start"].pop(), statement)
+
+
+# SQLite dev convenience; safe for local use. For Postgres, this is ignored.
+connect_args = {"check_same_thread": False} if _IS_SQLITE else {}
+engine = create_engine(DATABASE_URL, echo=False, connect_args=connect_args, **_pool_kwargs())
+
+# Enforce foreign keys on SQLite (off by default), plus WAL and friends for file DBs.
+if _IS_SQLITE:
+    _install_sqlite_pragmas(engine)
+_install_sql_timing(engine)
+
+
 def init_db() -> None:
     """
     Import model definitions and create tables if they don't exist.
@@ -35,8 +105,100 @@ def init_db() -> None:
     # Important: ensure table metadata is registered
     from api import db_models  # noqa: F401
     SQLModel.metadata.create_all(engine)
+    # Full-text index over Score.note (FTS5 / tsvector), synced by the DB itself
+    from services.search_service import init_search_index
+    init_search_index(engine)
 
 
 def get_session() -> Session:
     """Open a new DB session. Use with: `with get_session() as s:`"""
     return Session(engine)
+
+
+# -----------------------------------------------------------------------------
+# Async engine (API handlers)
+# -----------------------------------------------------------------------------
+_ASYNC_DRIVERS = {"sqlite": ("sqlite+aiosqlite", "aiosqlite"), "postgresql": ("postgresql+asyncpg", "asyncpg")}
+
+_async_engine = None
+
+
+def async_database_url() -> str:
+    """ASYNC_DATABASE_URL, or DATABASE_URL with its async driver (aiosqlite / asyncpg)."""
+    explicit = os.getenv("ASYNC_DATABASE_URL")
+    if explicit:
+        return explicit
+    url = make_url(DATABASE_URL)
+    backend = url.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver configured for {backend!r}; set ASYNC_DATABASE_URL")
+    return url.set(drivername=_ASYNC_DRIVERS[backend][0]).render_as_string(hide_password=False)
+
+
+def get_async_engine():
+    """Process-wide AsyncEngine, created on first use."""
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        url = async_database_url()
+        backend = make_url(url).get_backend_name()
+        module = _ASYNC_DRIVERS.get(backend, (None, None))[1]
+        if module:
+            try:
+                __import__(module)
+            except ImportError as e:
+                raise RuntimeError(f"The async DB engine requires `{module}` (pip install {module})") from e
+        _async_engine = create_async_engine(url, echo=False, **_pool_kwargs())
+        if backend == "sqlite":
+            _install_sqlite_pragmas(_async_engine.sync_engine)
+        _install_sql_timing(_async_engine.sync_engine)
+    return _async_engine
+
+
+def get_async_session():
+    """Open a new AsyncSession. Use with: `async with get_async_session() as s:`"""
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    return AsyncSession(get_async_engine(), expire_on_commit=False)
+
+
+def _use_async_engine() -> bool:
+    mode = os.getenv("ABUS_ASYNC_DB", "auto").lower()
+    if mode == "auto":
+        return not _IS_SQLITE
+    return mode in ("1", "true", "yes", "on")
+
+
+USE_ASYNC_ENGINE = _use_async_engine()
+
+
+def _call_with_session(fn, args, kwargs, write: bool):
+    with get_session() as s:
+        if not write:
+            return fn(s, *args, **kwargs)
+        with s.begin():
+            return fn(s, *args, **kwargs)
+
+
+async def _run(fn, args, kwargs, write: bool):
+    if USE_ASYNC_ENGINE:
+        async with get_async_session() as s:
+            if not write:
+                return await s.run_sync(fn, *args, **kwargs)
+            async with s.begin():
+                return await s.run_sync(fn, *args, **kwargs)
+    from starlette.concurrency import run_in_threadpool
+    return await run_in_threadpool(_call_with_session, fn, args, kwargs, write)
+
+
+async def run_db(fn, *args, **kwargs):
+    """
+    `fn(session, *args, **kwargs)` for async handlers, without blocking the event
+    loop: on the async engine (AsyncSession.run_sync) or, for SQLite by default,
+    with a sync Session in the threadpool.
+    """
+    return await _run(fn, args, kwargs, write=False)
+
+
+async def run_db_write(fn, *args, **kwargs):
+    """run_db() inside a transaction that commits on success."""
+    return await _run(fn, args, kwargs, write=True)
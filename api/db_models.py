@@ -2,9 +2,16 @@
 """
 + ModelCategory: (model_id, category_id) -> weight
 + Score.note: optional text note for the subfeature
++ ModelCategoryStat / ModelScore: materialized per-category sum/count and
+  overall score, kept in sync by services.materialized_scores
++ DataVersion: single-row write counter (see services.data_version)
++ ScoringProfile / ProfileWeight: named category-weight presets (e.g. ABUS-PPI)
++ Revision / ScoreRevision / WeightRevision / ModelSnapshot / ModelHistory:
+  append-only score history (see services.history_service)
 """
 
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, UniqueConstraint
 
 class Model(SQLModel, table=True):
@@ -40,3 +47,77 @@ class Score(SQLModel, table=True):
     value: float
     note: Optional[str] = None
     __table_args__ = (UniqueConstraint("model_id", "subcategory_id", name="uq_model_subcategory"),)
+
+class ModelCategoryStat(SQLModel, table=True):
+    __tablename__ = "model_category_stats"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    model_id: int = Field(foreign_key="models.id", index=True)
+    category_id: int = Field(foreign_key="categories.id", index=True)
+    score_sum: float = 0.0
+    score_count: int = 0
+    __table_args__ = (UniqueConstraint("model_id", "category_id", name="uq_model_category_stat"),)
+
+class ModelScore(SQLModel, table=True):
+    __tablename__ = "model_scores"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    model_id: int = Field(foreign_key="models.id", unique=True)
+    overall: float = 0.0
+
+class DataVersion(SQLModel, table=True):
+    __tablename__ = "data_version"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    version: int = 0
+
+class ScoringProfile(SQLModel, table=True):
+    __tablename__ = "scoring_profiles"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(index=True, unique=True)
+    description: Optional[str] = None
+
+class ProfileWeight(SQLModel, table=True):
+    __tablename__ = "profile_weights"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    profile_id: int = Field(foreign_key="scoring_profiles.id", index=True)
+    category_id: int = Field(foreign_key="categories.id")
+    weight: float = 0.0
+    __table_args__ = (UniqueConstraint("profile_id", "category_id", name="uq_profile_category"),)
+
+class Revision(SQLModel, table=True):
+    __tablename__ = "revisions"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: float  # Unix time of the write
+
+class ScoreRevision(SQLModel, table=True):
+    __tablename__ = "score_revisions"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    revision: int = Field(foreign_key="revisions.id")
+    model_id: int = Field(foreign_key="models.id")
+    subcategory_id: int = Field(foreign_key="subcategories.id")
+    value: float
+    note: Optional[str] = None  # only stored when note_changed
+    note_changed: bool = False
+    __table_args__ = (Index("ix_score_revisions_model_revision", "model_id", "revision"),)
+
+class WeightRevision(SQLModel, table=True):
+    __tablename__ = "weight_revisions"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    revision: int = Field(foreign_key="revisions.id")
+    model_id: int = Field(foreign_key="models.id")
+    category_id: int = Field(foreign_key="categories.id")
+    weight: float
+    __table_args__ = (Index("ix_weight_revisions_model_revision", "model_id", "revision"),)
+
+class ModelSnapshot(SQLModel, table=True):
+    __tablename__ = "model_snapshots"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    model_id: int = Field(foreign_key="models.id")
+    revision: int  # state after this revision; 0 = state from before history was recorded
+    data: bytes    # zlib-compressed JSON, see services.history_service
+    __table_args__ = (UniqueConstraint("model_id", "revision", name="uq_model_snapshot"),)
+
+class ModelHistory(SQLModel, table=True):
+    __tablename__ = "model_history"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    model_id: int = Field(foreign_key="models.id", unique=True)
+    snapshot_revision: int = -1  # latest snapshot, -1 if none
+    pending: int = 0             # revision rows written since that snapshot
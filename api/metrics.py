@@ -0,0 +1,237 @@
+# api/metrics.py
+"""
+Request instrumentation, exposed as Prometheus text on GET /metrics and as a
+Server-Timing header on every response.
+
+MetricsMiddleware (pure ASGI, so streamed bodies are timed to the last byte)
+opens a RequestStats for each HTTP request in a context variable; the
+cursor hooks in api.db (record_sql) and the response cache (record_cache)
+add to it from whichever thread runs the query. Per route template
+(e.g. /api/models/{name}/full):
+- abus_http_requests_total{method,route,status}
+- abus_http_request_duration_seconds         histogram
+- abus_http_request_sql_statements           histogram (statements per request)
+- abus_http_request_db_seconds_total         time spent executing SQL
+plus abus_sql_statements_total / abus_sql_seconds_total for all SQL (also
+outside requests) and abus_response_cache_{hits,misses}_total / _entries.
+
+Server-Timing: app;dur=<ms>, db;dur=<ms>;desc="<n> queries", cache;desc=hit|miss
+
+ABUS_SLOW_REQUEST_MS > 0 logs requests slower than that to the "abus.slow"
+logger, with their slowest SQL statements.
+"""
+
+from __future__ import annotations
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+import logging
+import os
+import threading
+import time
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+SLOW_REQUEST_MS = float(os.getenv("ABUS_SLOW_REQUEST_MS", "0"))
+SLOW_LOG_STATEMENTS = 5      # slowest statements printed per slow request
+MAX_KEPT_STATEMENTS = 200    # statements remembered per request for the slow log
+
+slow_log = logging.getLogger("abus.slow")
+
+
+# -----------------------------------------------------------------------------
+# Registry
+# -----------------------------------------------------------------------------
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    esc = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels) + "}"
+
+
+def _num(x: float) -> str:
+    return repr(float(x)) if x != int(x) else str(int(x))
+
+
+class Registry:
+    """Counters and histograms keyed by (name, labels); render() gives Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}  # name -> (type, help)
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._hists: Dict[str, Tuple[tuple, Dict[Labels, List[float]]]] = {}
+
+    def counter(self, name: str, help_text: str) -> None:
+        self._help[name] = ("counter", help_text)
+        self._counters.setdefault(name, {})
+
+    def histogram(self, name: str, help_text: str, buckets: tuple) -> None:
+        self._help[name] = ("histogram", help_text)
+        self._hists.setdefault(name, (buckets, {}))
+
+    def inc(self, name: str, value: float = 1.0, labels: Labels = ()) -> None:
+        with self._lock:
+            series = self._counters[name]
+            series[labels] = series.get(labels, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        buckets, series = self._hists[name]
+        with self._lock:
+            row = series.get(labels)
+            if row is None:
+                row = series[labels] = [0.0] * (len(buckets) + 2)  # per-bucket counts, sum, count
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            row[-2] += value
+            row[-1] += 1
+
+    def render(self, extra: Optional[List[str]] = None) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, series in self._counters.items():
+                lines += [f"# HELP {name} {self._help[name][1]}", f"# TYPE {name} counter"]
+                lines += [f"{name}{_labels(l)} {_num(v)}" for l, v in series.items()]
+            for name, (buckets, series) in self._hists.items():
+                lines += [f"# HELP {name} {self._help[name][1]}", f"# TYPE {name} histogram"]
+                for l, row in series.items():
+                    cumulative = 0.0
+                    for bound, n in zip(buckets, row):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{_labels(l + (('le', _num(bound)),))} {_num(cumulative)}")
+                    lines.append(f"{name}_bucket{_labels(l + (('le', '+Inf'),))} {_num(row[-1])}")
+                    lines.append(f"{name}_sum{_labels(l)} {_num(row[-2])}")
+                    lines.append(f"{name}_count{_labels(l)} {_num(row[-1])}")
+        return "\n".join(lines + (extra or [])) + "\n"
+
+
+registry = Registry()
+registry.counter("abus_http_requests_total", "HTTP requests by route template and status")
+registry.histogram("abus_http_request_duration_seconds", "HTTP request latency", REQUEST_BUCKETS)
+registry.histogram("abus_http_request_sql_statements", "SQL statements executed per HTTP request", SQL_COUNT_BUCKETS)
+registry.counter("abus_http_request_db_seconds_total", "Time spent executing SQL, per route")
+registry.counter("abus_sql_statements_total", "SQL statements executed (all, including outside requests)")
+registry.counter("abus_sql_seconds_total", "Time spent executing SQL (all)")
+
+
+# -----------------------------------------------------------------------------
+# Per-request stats
+# -----------------------------------------------------------------------------
+class RequestStats:
+    __slots__ = ("sql_count", "db_time", "statements", "cache_hits", "cache_misses")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.db_time = 0.0
+        self.statements: List[Tuple[float, str]] = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("abus_request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+def record_sql(duration: float, statement: str) -> None:
+    """Called by the cursor hooks in api.db after every statement."""
+    registry.inc("abus_sql_statements_total")
+    registry.inc("abus_sql_seconds_total", duration)
+    stats = _current.get()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.db_time += duration
+        if SLOW_REQUEST_MS > 0 and len(stats.statements) < MAX_KEPT_STATEMENTS:
+            stats.statements.append((duration, statement))
+
+
+def record_cache(hit: bool) -> None:
+    """Called by api.response_cache on every lookup (the totals are the cache's own counters)."""
+    stats = _current.get()
+    if stats is not None:
+        if hit:
+            stats.cache_hits += 1
+        else:
+            stats.cache_misses += 1
+
+
+def server_timing(stats: RequestStats, elapsed: float) -> str:
+    parts = [f"app;dur={elapsed * 1000:.1f}",
+             f'db;dur={stats.db_time * 1000:.1f};desc="{stats.sql_count} queries"']
+    if stats.cache_hits or stats.cache_misses:
+        parts.append(f"cache;desc={'hit' if not stats.cache_misses else 'miss'}")
+    return ", ".join(parts)
+
+
+# -----------------------------------------------------------------------------
+# ASGI middleware
+# -----------------------------------------------------------------------------
+class MetricsMiddleware:
+    """Times every HTTP request and records it under its route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(stats, time.perf_counter() - start).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            self._record(scope["method"], route, status, elapsed, stats)
+
+    @staticmethod
+    def _record(method: str, route: str, status: int, elapsed: float, stats: RequestStats) -> None:
+        labels = (("method", method), ("route", route))
+        registry.inc("abus_http_requests_total", labels=labels + (("status", str(status)),))
+        registry.observe("abus_http_request_duration_seconds", elapsed, labels)
+        registry.observe("abus_http_request_sql_statements", stats.sql_count, labels)
+        registry.inc("abus_http_request_db_seconds_total", stats.db_time, labels)
+        if SLOW_REQUEST_MS > 0 and elapsed * 1000 >= SLOW_REQUEST_MS:
+            worst = sorted(stats.statements, key=lambda s: -s[0])[:SLOW_LOG_STATEMENTS]
+            slow_log.warning(
+                "slow request %s %s: %.1f ms, %d SQL statements (%.1f ms)%s",
+                method, route, elapsed * 1000, stats.sql_count, stats.db_time * 1000,
+                "".join(f"\n  {d * 1000:8.2f} ms  {' '.join(sql.split())[:500]}" for d, sql in worst),
+            )
+
+
+def render_metrics() -> str:
+    from api.response_cache import response_cache
+    extra = [
+        "# HELP abus_response_cache_hits_total Read responses served from the response cache",
+        "# TYPE abus_response_cache_hits_total counter",
+        f"abus_response_cache_hits_total {response_cache.hits}",
+        "# HELP abus_response_cache_misses_total Read responses built and stored in the response cache",
+        "# TYPE abus_response_cache_misses_total counter",
+        f"abus_response_cache_misses_total {response_cache.misses}",
+        "# HELP abus_response_cache_entries Entries in the response cache",
+        "# TYPE abus_response_cache_entries gauge",
+        f"abus_response_cache_entries {len(response_cache)}",
+    ]
+    return registry.render(extra)
@@ -0,0 +1,112 @@
+# api/response_cache.py
+"""
+Pre-serialized JSON responses for the read endpoints.
+
+Entries are keyed by (endpoint, model) and belong to one dataset version
+(services.data_version); any write bumps the version and drops them all.
+A hit returns the stored bytes with their strong ETag, without touching the
+DB or the JSON encoder, and `If-None-Match` is answered with 304.
+ABUS_RESPONSE_CACHE_SIZE sets the entry limit (0 disables the cache).
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable, Optional
+import hashlib
+import json
+import os
+import threading
+from fastapi import Request
+from fastapi.responses import Response
+from api.metrics import record_cache
+from services.data_version import adata_version
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    version: int
+    body: bytes
+    etag: str
+
+
+def encode_json(data: Any) -> bytes:
+    """Same bytes as FastAPI's JSONResponse."""
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+class ResponseCache:
+    """LRU of CachedBody per key; max_entries=0 disables caching (ETags are still sent)."""
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._version: Optional[int] = None
+        self._entries: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: int) -> Optional[CachedBody]:
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        record_cache(entry is not None)
+        return entry
+
+    def put(self, key: Hashable, version: int, data: Any) -> CachedBody:
+        body = encode_json(data)
+        entry = CachedBody(version, body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+        with self._lock:
+            # a write may have landed while `data` was built; keep it out of the newer version
+            if version == self._version and self.max_entries > 0:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache(int(os.getenv("ABUS_RESPONSE_CACHE_SIZE", "10000")))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/"x" matches "x", and * matches anything."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+async def acached_json_response(request: Request, key: Hashable, build: Callable[[], Awaitable[Any]]) -> Response:
+    """
+    Serve `key` from the cache, or await `build()` (which may raise HTTPException)
+    and cache its result for the current dataset version.
+    """
+    version = await adata_version()
+    entry = response_cache.get(key, version)
+    if entry is None:
+        entry = response_cache.put(key, version, await build())
+    return _respond(request, entry)
+
+
+def _respond(request: Request, entry: CachedBody) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
@@ -3,16 +3,25 @@
 Now stores:
 - category weights in ModelCategory
 - subfeature notes in Score.note
+
+Default is a set-based bulk load (preloaded ids, executemany inserts,
+INSERT ... ON CONFLICT upserts); `--row-by-row` keeps the original path.
 """
 
 from __future__ import annotations
 import json
+import math
 from pathlib import Path
-from typing import Any, Dict, Iterator, Tuple
+from typing import Any, Dict, Iterator, List, Tuple
 from sqlmodel import select
 from sqlalchemy import func
 from api.db import get_session, init_db
 from api.db_models import Model, Category, Subcategory, Score, ModelCategory
+from services.data_version import mark_data_changed
+from services.history_service import load_states, record_revision
+from services.materialized_scores import rebuild_materialized
+from services.schema_service import mark_schema_changed
+from services.scoring_service import ScoreRow, WeightRow, write_model_rows
 
 def _find_json() -> Path:
     candidates = [
@@ -28,6 +37,8 @@ def _find_json() -> Path:
 
 def _extract_score_and_note(raw: Any, ctx: str) -> Tuple[float, str | None]:
     if isinstance(raw, (int, float)):
+        if not math.isfinite(raw):
+            raise ValueError(f"Score at {ctx} must be finite; got {raw!r}")
         return float(raw), None
     if isinstance(raw, dict):
         if "score" in raw:
@@ -35,6 +46,8 @@ def _extract_score_and_note(raw: Any, ctx: str) -> Tuple[float, str | None]:
                 score = float(raw["score"])
             except Exception:
                 raise ValueError(f"Score at {ctx} must be numeric; got {raw['score']!r}")
+            if not math.isfinite(score):
+                raise ValueError(f"Score at {ctx} must be finite; got {raw['score']!r}")
             note = raw.get("note")
             if note is not None and not isinstance(note, str):
                 note = str(note)
@@ -59,9 +72,12 @@ def _iter_subfeatures(cat_val: Any, model: str, cat: str) -> Iterator[Tuple[str,
 def _get_category_weight(cat_val: Any) -> float | None:
     if isinstance(cat_val, dict) and "weight" in cat_val:
         try:
-            return float(cat_val["weight"])
+            weight = float(cat_val["weight"])
         except Exception:
             return None
+        if not math.isfinite(weight):
+            raise ValueError(f"Category weight must be finite; got {cat_val['weight']!r}")
+        return weight
     return None
 
 def _count_rows(session) -> dict:
@@ -75,9 +91,113 @@ def _count_rows(session) -> dict:
         "model_categories": c(ModelCategory),
     }
 
-def seed() -> None:
-    json_path = _find_json()
-    print(f"[seed] Using JSON: {json_path}")
+def seed_row_by_row(s, data: Dict[str, Any]) -> None:
+    """Original seeding path: get-or-create + flush per row. Kept for comparison."""
+    def upsert(obj):
+        s.add(obj); s.flush(); return obj
+
+    def get_or_create_model(name: str) -> Model:
+        m = s.exec(select(Model).where(Model.name == name)).first()
+        return m or upsert(Model(name=name))
+
+    def get_or_create_category(name: str) -> Category:
+        c = s.exec(select(Category).where(Category.name == name)).first()
+        if c:
+            return c
+        mark_schema_changed(s)
+        return upsert(Category(name=name))
+
+    def get_or_create_subcategory(category_id: int, name: str) -> Subcategory:
+        sub = s.exec(
+            select(Subcategory).where(Subcategory.category_id == category_id, Subcategory.name == name)
+        ).first()
+        if sub:
+            return sub
+        mark_schema_changed(s)
+        return upsert(Subcategory(name=name, category_id=category_id))
+
+    def get_or_create_model_category(model_id: int, category_id: int) -> ModelCategory:
+        mc = s.exec(
+            select(ModelCategory).where(
+                ModelCategory.model_id == model_id,
+                ModelCategory.category_id == category_id,
+            )
+        ).first()
+        return mc or upsert(ModelCategory(model_id=model_id, category_id=category_id, weight=0.0))
+
+    existing = s.exec(select(Model.id).where(Model.name.in_(list(data.keys())))).all() if data else []
+    before = load_states(s, existing)
+
+    for model_name, categories in data.items():
+        if not isinstance(categories, dict):
+            raise ValueError(f"Model '{model_name}' must map to a dict of categories")
+
+        m = get_or_create_model(model_name)
+
+        for cat_name, cat_val in categories.items():
+            c = get_or_create_category(cat_name)
+
+            # store per-model category weight if present
+            w = _get_category_weight(cat_val)
+            mc = get_or_create_model_category(m.id, c.id)
+            if w is not None:
+                mc.weight = w
+                s.add(mc)
+
+            # store subfeature scores (+ notes)
+            for sub_name, score_val, note in _iter_subfeatures(cat_val, model_name, cat_name):
+                sub = get_or_create_subcategory(c.id, sub_name)
+                existing = s.exec(
+                    select(Score).where(Score.model_id == m.id, Score.subcategory_id == sub.id)
+                ).first()
+                if existing:
+                    existing.value = score_val
+                    existing.note = note
+                    s.add(existing)
+                else:
+                    s.add(Score(model_id=m.id, subcategory_id=sub.id, value=score_val, note=note))
+
+    s.flush()
+    rebuild_materialized(s, list(data.keys()))
+    touched = s.exec(select(Model.id).where(Model.name.in_(list(data.keys())))).all() if data else []
+    record_revision(s, {mid: before.get(mid, ({}, {})) for mid in touched}, load_states(s, touched))
+    mark_data_changed(s)
+
+
+# -----------------------------------------------------------------------------
+# Bulk (set-based) seeding
+# -----------------------------------------------------------------------------
+def _flatten(data: Dict[str, Any]) -> Tuple[List[WeightRow], List[ScoreRow]]:
+    """
+    Validate the whole file up front (same errors as the row-by-row path) and
+    flatten it into (model, category, weight) and (model, category, sub, score, note) rows.
+    """
+    weights: List[WeightRow] = []
+    scores: List[ScoreRow] = []
+    for model_name, categories in data.items():
+        if not isinstance(categories, dict):
+            raise ValueError(f"Model '{model_name}' must map to a dict of categories")
+        for cat_name, cat_val in categories.items():
+            weights.append((model_name, cat_name, _get_category_weight(cat_val)))
+            for sub_name, score_val, note in _iter_subfeatures(cat_val, model_name, cat_name):
+                scores.append((model_name, cat_name, sub_name, score_val, note))
+    return weights, scores
+
+def seed_bulk(s, data: Dict[str, Any]) -> None:
+    """
+    Set-based equivalent of seed_row_by_row(): ids are resolved per name batch,
+    missing dimension rows inserted with executemany, and model_categories /
+    scores upserted (INSERT ... ON CONFLICT on SQLite/Postgres). See
+    services.scoring_service.write_model_rows.
+    """
+    weight_rows, score_rows = _flatten(data)
+    # models without any category still get a row, as in the row-by-row path
+    write_model_rows(s, weight_rows, score_rows, extra_models=list(data.keys()))
+
+
+def seed(json_path: Path | None = None, bulk: bool = True) -> None:
+    json_path = Path(json_path) if json_path else _find_json()
+    print(f"[seed] Using JSON: {json_path} ({'bulk' if bulk else 'row-by-row'})")
 
     data = json.loads(json_path.read_text(encoding="utf-8"))
     if not isinstance(data, dict):
@@ -89,68 +209,23 @@ def seed() -> None:
         before = _count_rows(s)
         print(f"[seed] Rows before: {before}")
 
-        def upsert(obj):
-            s.add(obj); s.flush(); return obj
-
-        def get_or_create_model(name: str) -> Model:
-            m = s.exec(select(Model).where(Model.name == name)).first()
-            return m or upsert(Model(name=name))
-
-        def get_or_create_category(name: str) -> Category:
-            c = s.exec(select(Category).where(Category.name == name)).first()
-            return c or upsert(Category(name=name))
-
-        def get_or_create_subcategory(category_id: int, name: str) -> Subcategory:
-            sub = s.exec(
-                select(Subcategory).where(Subcategory.category_id == category_id, Subcategory.name == name)
-            ).first()
-            return sub or upsert(Subcategory(name=name, category_id=category_id))
-
-        def get_or_create_model_category(model_id: int, category_id: int) -> ModelCategory:
-            mc = s.exec(
-                select(ModelCategory).where(
-                    ModelCategory.model_id == model_id,
-                    ModelCategory.category_id == category_id,
-                )
-            ).first()
-            return mc or upsert(ModelCategory(model_id=model_id, category_id=category_id, weight=0.0))
-
-        for model_name, categories in data.items():
-            if not isinstance(categories, dict):
-                raise ValueError(f"Model '{model_name}' must map to a dict of categories")
-
-            m = get_or_create_model(model_name)
-
-            for cat_name, cat_val in categories.items():
-                c = get_or_create_category(cat_name)
-
-                # store per-model category weight if present
-                w = _get_category_weight(cat_val)
-                mc = get_or_create_model_category(m.id, c.id)
-                if w is not None:
-                    mc.weight = w
-                    s.add(mc)
-
-                # store subfeature scores (+ notes)
-                for sub_name, score_val, note in _iter_subfeatures(cat_val, model_name, cat_name):
-                    sub = get_or_create_subcategory(c.id, sub_name)
-                    existing = s.exec(
-                        select(Score).where(Score.model_id == m.id, Score.subcategory_id == sub.id)
-                    ).first()
-                    if existing:
-                        existing.value = score_val
-                        existing.note = note
-                        s.add(existing)
-                    else:
-                        s.add(Score(model_id=m.id, subcategory_id=sub.id, value=score_val, note=note))
+        if bulk:
+            seed_bulk(s, data)
+        else:
+            seed_row_by_row(s, data)
 
         after = _count_rows(s)
         print(f"[seed] Rows after:  {after}")
         print("[seed] Seed complete")
 
 if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Seed the ABUS DB from model_scores.json")
+    ap.add_argument("json_path", nargs="?", help="defaults to abus/data/model_scores.json")
+    ap.add_argument("--row-by-row", action="store_true", help="use the original per-row path")
+    args = ap.parse_args()
     try:
-        seed()
+        seed(args.json_path, bulk=not args.row_by_row)
     except Exception as e:
         import traceback
         print("[seed] ERROR:", e)
@@ -0,0 +1,222 @@
+# benchmarks/bench_concurrent_reads.py
+"""
+Load test: concurrent read throughput of the API.
+
+Seeds a SQLite file with synthetic models, then starts each variant as its
+own uvicorn process and hammers GET /api/models/{name}/full and
+GET /api/score/{name} from C concurrent clients for D seconds, optionally
+while a writer upserts models in the background:
+
+  sync handlers      the previous handlers: `def` endpoints on the threadpool,
+                     sync Session, default pool, rollback journal
+  async handlers     api.app with the response cache disabled: `async def`
+                     endpoints, run_db() in the threadpool (SQLite default), tuned pool, WAL
+  async aiosqlite    the same on the async engine (ABUS_ASYNC_DB=1)
+  async + cache      api.app as deployed (per-version response cache)
+
+Run from the project root (needs uvicorn, httpx, aiosqlite):
+    python -m benchmarks.bench_concurrent_reads [--models 2000] [--concurrency 64] [--seconds 10] [--write-rate 5]
+"""
+
+from __future__ import annotations
+import os, sys, time, socket, subprocess, argparse, asyncio, random, statistics, tempfile
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import httpx
+
+
+def legacy_app():
+    """The handlers as they were before the async engine (uvicorn --factory)."""
+    from fastapi import FastAPI, HTTPException, Body
+    from api.db import get_session, init_db
+    from services.scoring_service import compute_model_scores, get_model_full, upsert_model_from_payload
+
+    app = FastAPI()
+    init_db()
+
+    @app.get("/api/models/{name}/full")
+    def full(name: str):
+        with get_session() as s:
+            try:
+                return get_model_full(s, name)
+            except ValueError as e:
+                raise HTTPException(404, str(e))
+
+    @app.get("/api/score/{name}")
+    def score(name: str):
+        with get_session() as s:
+            try:
+                return compute_model_scores(s, name)
+            except ValueError as e:
+                raise HTTPException(404, str(e))
+
+    @app.post("/api/models/upsert")
+    def upsert(payload: dict = Body(...)):
+        with get_session() as s, s.begin():
+            return {"ok": True, "name": upsert_model_from_payload(s, payload)}
+
+    return app
+
+
+VARIANTS = {
+    "sync handlers": (
+        ["benchmarks.bench_concurrent_reads:legacy_app", "--factory"],
+        {"SQLITE_JOURNAL_MODE": "DELETE", "DB_POOL_SIZE": "5", "DB_MAX_OVERFLOW": "10", "DB_POOL_PRE_PING": "0"},
+    ),
+    "async handlers": (["api.app:app"], {"ABUS_RESPONSE_CACHE_SIZE": "0"}),
+    "async aiosqlite": (["api.app:app"], {"ABUS_RESPONSE_CACHE_SIZE": "0", "ABUS_ASYNC_DB": "1"}),
+    "async + cache": (["api.app:app"], {}),
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _seed(path: str, n_models: int) -> list:
+    # rollback journal, so the template is a single file that can be copied per variant
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{path}", "SQLITE_JOURNAL_MODE": "DELETE"}
+    code = (
+        "from api.db import get_session, init_db\n"
+        "from api.seed_from_json import seed_bulk\n"
+        "from benchmarks.bench_seed import synthetic_data\n"
+        "init_db()\n"
+        f"with get_session() as s, s.begin(): seed_bulk(s, synthetic_data({n_models}))\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True)
+    return [f"Model_{i:05d}" for i in range(n_models)]
+
+
+def _start(target: list, extra_env: dict, db_path: str):
+    port = _free_port()
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}", **extra_env}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", *target, "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(200):
+        try:
+            httpx.get(f"{base}/api/score/__warmup__", timeout=1)
+            return base, proc
+        except httpx.TransportError:
+            time.sleep(0.05)
+    proc.kill()
+    raise SystemExit(f"[bench] server {target} did not start")
+
+
+class _Conn:
+    """
+    Minimal keep-alive HTTP/1.1 client (Content-Length bodies only), so the load
+    generator spends as little CPU as possible next to the server under test.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method: str, path: str, body: bytes = b"") -> int:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+        if body:
+            head += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+        self.writer.write(head.encode() + b"\r\n" + body)
+        status_line = await self.reader.readline()
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            key, _, value = line.partition(b":")
+            if key.strip().lower() == b"content-length":
+                length = int(value)
+        await self.reader.readexactly(length)
+        return int(status_line.split()[1])
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def _load(base: str, names: list, concurrency: int, seconds: float, write_rate: float) -> dict:
+    host, port = base.rsplit("//", 1)[1].split(":")
+    latencies, errors = [], 0
+    stop = time.perf_counter() + seconds
+
+    async def reader(seed: int):
+        nonlocal errors
+        rng = random.Random(seed)
+        conn = _Conn(host, int(port))
+        try:
+            while time.perf_counter() < stop:
+                name = rng.choice(names)
+                path = f"/api/models/{name}/full" if rng.random() < 0.5 else f"/api/score/{name}"
+                t = time.perf_counter()
+                try:
+                    ok = await conn.request("GET", path) == 200
+                except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                    ok, conn = False, _Conn(host, int(port))
+                latencies.append(time.perf_counter() - t)
+                errors += not ok
+        finally:
+            conn.close()
+
+    async def writer():
+        nonlocal errors
+        rng = random.Random(-1)
+        async with httpx.AsyncClient(base_url=base, timeout=30) as client:
+            while write_rate and time.perf_counter() < stop:
+                payload = {"name": rng.choice(names), "categories": {
+                    "usability": {"subfeatures": {"code_availability": {"score": rng.randint(0, 2)}}}}}
+                try:
+                    errors += (await client.post("/api/models/upsert", json=payload)).status_code != 200
+                except httpx.HTTPError:
+                    errors += 1
+                await asyncio.sleep(1.0 / write_rate)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(writer(), *(reader(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    q = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+    return {"rps": len(latencies) / elapsed, "p50": q(0.50), "p95": q(0.95), "p99": q(0.99),
+            "mean": statistics.fmean(latencies) * 1000, "errors": errors, "n": len(latencies)}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--models", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--write-rate", type=float, default=5.0, help="background upserts per second (0 = reads only)")
+    ap.add_argument("--variants", default=",".join(VARIANTS), help="comma-separated subset of: " + ", ".join(VARIANTS))
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template = os.path.join(tmp, "template.db")
+        names = _seed(template, args.models)
+        print(f"[bench] {args.models} models, {args.concurrency} concurrent readers, "
+              f"{args.write_rate:g} writes/s, {args.seconds:g} s per variant")
+        for label in args.variants.split(","):
+            target, extra_env = VARIANTS[label]
+            db_path = os.path.join(tmp, f"{label.replace(' ', '_').replace('+', '')}.db")
+            with open(template, "rb") as src, open(db_path, "wb") as dst:
+                dst.write(src.read())
+            base, proc = _start(target, extra_env, db_path)
+            try:
+                r = asyncio.run(_load(base, names, args.concurrency, args.seconds, args.write_rate))
+            finally:
+                proc.terminate()
+                proc.wait()
+            print(f"[bench] {label:<15} {r['rps']:8.0f} req/s   p50 {r['p50']:7.1f} ms   p95 {r['p95']:7.1f} ms   "
+                  f"p99 {r['p99']:7.1f} ms   errors {r['errors']}/{r['n']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/bench_ingest_queue.py
+"""
+API responsiveness during background ingestion (POST /api/ingest,
+services/ingest_queue.py).
+
+Seeds the hand-written dataset into a temporary SQLite file, measures read
+latency (GET /api/models/{name}/full, response cache disabled) on an idle
+API, then submits synthetic papers (default 300) in one POST and keeps
+reading until the queue has drained. Reports the submit time, the read
+latency while jobs run, ingestion throughput, and that resubmitting the same
+papers is deduplicated.
+
+Run from the project root:
+    python -m benchmarks.bench_ingest_queue [--papers 300] [--size 30000] [--workers 2]
+"""
+
+from __future__ import annotations
+import os, sys, time, argparse, tempfile
+from pathlib import Path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def _pct(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--papers", type=int, default=300)
+    ap.add_argument("--size", type=int, default=30_000, help="characters per paper")
+    ap.add_argument("--workers", type=int, default=2)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="abus_queue_")
+    os.environ.update(DATABASE_URL=f"sqlite:///{tmp}/bench.db", ABUS_RESPONSE_CACHE_SIZE="0",
+                      ABUS_SCORE_CACHE="off", ABUS_INGEST_QUEUE=f"{tmp}/jobs.sqlite",
+                      ABUS_INGEST_WORKERS=str(args.workers))
+    os.environ.pop("ABUS_SNAPSHOT", None)
+
+    from fastapi.testclient import TestClient
+    from api.seed_from_json import seed
+    from benchmarks.synthetic import generate_papers
+
+    seed(Path(ROOT) / "abus" / "data" / "model_scores.json")
+    from api.app import app
+    papers = list(generate_papers(args.papers, size=args.size))
+
+    with TestClient(app) as c:
+        def read() -> float:
+            t = time.perf_counter()
+            assert c.get("/api/models/MULAN/full").status_code == 200
+            return time.perf_counter() - t
+
+        idle = [read() for _ in range(200)]
+        t = time.perf_counter()
+        r = c.post("/api/ingest", json={"papers": papers})
+        submit_s = time.perf_counter() - t
+        assert r.status_code == 202, r.text
+        ids = [job["id"] for job in r.json()["jobs"]]
+
+        busy = []
+        t0 = time.perf_counter()
+        while True:
+            busy.append(read())
+            stats = c.get("/api/ingest").json()
+            if not stats["queued"] and not stats["running"]:
+                break
+        drain_s = time.perf_counter() - t0
+
+        again = c.post("/api/ingest", json={"papers": papers}).json()["jobs"]
+        if [job["id"] for job in again] != ids or not all(job["deduplicated"] for job in again):
+            raise SystemExit("[bench] resubmitted papers were not deduplicated")
+        if stats["done"] != args.papers:
+            raise SystemExit(f"[bench] expected {args.papers} done jobs, got {stats}")
+
+    print(f"[bench] {args.papers} papers x {args.size} chars, {args.workers} {stats['executor']} workers")
+    print(f"[bench] submit: {submit_s * 1000:.0f} ms; drained in {drain_s:.2f} s ({args.papers / drain_s:.1f} papers/s)")
+    print(f"{'read latency (ms)':<22} {'p50':>8} {'p95':>8} {'max':>8}")
+    for label, lat in (("idle", idle), ("while ingesting", busy)):
+        print(f"{label:<22} {_pct(lat, 0.5):>8.2f} {_pct(lat, 0.95):>8.2f} {max(lat) * 1000:>8.2f}")
+    print("[bench] OK: all jobs done; resubmission deduplicated")
+
+
+if __name__ == "__main__":
+    main()
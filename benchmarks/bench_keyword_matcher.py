@@ -0,0 +1,88 @@
+# benchmarks/bench_keyword_matcher.py
+"""
+RuleBasedProvider.score: single-pass KeywordMatcher vs the original
+one-regex-scan-per-keyword loop, on ~1 MB synthetic paper texts.
+Also checks that both produce identical scores and notes.
+
+Run from the project root:
+    python -m benchmarks.bench_keyword_matcher [size_mb]
+"""
+
+from __future__ import annotations
+import os, sys, re, time, random
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from services.llm_providers import RuleBasedProvider
+
+FILLER = ("the of and protein model we results method data using show table figure "
+          "residue binding domain embedding layer training dataset loss").split()
+
+
+def reference_score(provider: RuleBasedProvider, paper_text: str, schema: dict) -> dict:
+    """The pre-KeywordMatcher implementation: one re.findall per keyword."""
+    t = paper_text.lower()
+    out = {}
+    for cat, subdict in schema.items():
+        out[cat] = {}
+        for sub in subdict.keys():
+            keywords = provider.KEYWORDS.get(cat, {}).get(sub, [])
+            hits = 0
+            note_bits = []
+            for kw in keywords:
+                count = len(re.findall(rf"\b{re.escape(kw.lower())}\b", t))
+                if count:
+                    hits += count
+                    note_bits.append(f"{kw}×{count}")
+            score = provider._score_for_hits(hits)
+            note = " | ".join(note_bits) if note_bits else "no keyword evidence"
+            out[cat][sub] = {"score": score, "note": note}
+    return out
+
+
+def synthetic_text(size: int, keyword_rate: float, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    kws = [kw for subdict in RuleBasedProvider.KEYWORDS.values() for kws in subdict.values() for kw in kws]
+    # Near-misses exercise the word-boundary handling
+    tricky = ["Structural", "structures", "GitHub", "pip installation", "3D", "few-shot", "codebase",
+              "Secondary Structure", "open-source-ish", "interpretability", "docs.", "(docker)"]
+    words, n = [], 0
+    while n < size:
+        r = rng.random()
+        w = rng.choice(kws) if r < keyword_rate else rng.choice(tricky) if r < 2 * keyword_rate else rng.choice(FILLER)
+        words.append(w)
+        n += len(w) + 1
+    return " ".join(words)
+
+
+def _time(fn, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    provider = RuleBasedProvider()
+    schema = {cat: {sub: {} for sub in subs} for cat, subs in provider.KEYWORDS.items()}
+
+    for rate in (0.001, 0.02, 0.1):
+        text = synthetic_text(int(size_mb * 1024 * 1024), rate)
+        new = provider.score(text, schema)
+        ref = reference_score(provider, text, schema)
+        if new != ref:
+            raise SystemExit(f"[bench] MISMATCH at keyword rate {rate}")
+        t_new = _time(lambda: provider.score(text, schema))
+        t_ref = _time(lambda: reference_score(provider, text, schema))
+        print(f"[bench] {len(text) / 1e6:.2f} MB, keyword rate {rate:<5}: "
+              f"per-keyword {t_ref * 1000:8.1f} ms   single-pass {t_new * 1000:8.1f} ms   "
+              f"x{t_ref / t_new:.1f}")
+    print("[bench] OK: identical scores and notes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/bench_read_path.py
+"""
+Query-count benchmark for the model read path.
+
+Seeds an in-memory SQLite DB with models whose taxonomy grows from a handful
+to a few hundred subfeatures, then counts the SQL statements issued by
+get_model_full / get_model_scores / compute_model_scores / load_models_full.
+The count must stay constant as the taxonomy grows (no N+1).
+
+Run from the project root:
+    python -m benchmarks.bench_read_path
+"""
+
+from __future__ import annotations
+import os, sys, time
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine
+
+from api import db_models  # noqa: F401  (register tables)
+from services.scoring_service import (
+    compute_model_scores,
+    get_model_full,
+    get_model_scores,
+    load_models_full,
+    upsert_model_from_payload,
+)
+
+N_CATEGORIES = 5
+N_MODELS = 10
+SUBFEATURE_COUNTS = (2, 10, 60, 250)
+
+
+def _payload(name: str, subs_per_cat: int) -> dict:
+    return {
+        "name": name,
+        "categories": {
+            f"cat_{c}": {
+                "weight": 20,
+                "subfeatures": {
+                    f"sub_{c}_{j}": {"score": (c + j) % 3, "note": f"note {c}/{j}"}
+                    for j in range(subs_per_cat)
+                },
+            }
+            for c in range(N_CATEGORIES)
+        },
+    }
+
+
+def _build(subs_per_cat: int):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as s, s.begin():
+        for i in range(N_MODELS):
+            upsert_model_from_payload(s, _payload(f"model_{i}", subs_per_cat))
+    return engine
+
+
+def _count(engine, fn) -> tuple[int, float]:
+    counter = {"n": 0}
+
+    def _on_exec(*_):
+        counter["n"] += 1
+
+    event.listen(engine, "before_cursor_execute", _on_exec)
+    try:
+        with Session(engine) as s:
+            t0 = time.perf_counter()
+            fn(s)
+            dt = time.perf_counter() - t0
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_exec)
+    return counter["n"], dt
+
+
+def main() -> None:
+    cases = {
+        "get_model_full": lambda s: get_model_full(s, "model_0"),
+        "get_model_scores": lambda s: get_model_scores(s, "model_0"),
+        "compute_model_scores": lambda s: compute_model_scores(s, "model_0"),
+        "load_models_full(all)": lambda s: load_models_full(s),
+    }
+    seen: dict[str, set[int]] = {k: set() for k in cases}
+
+    print(f"{'subfeatures':>12} {'case':<24} {'queries':>8} {'ms':>8}")
+    for subs_per_cat in SUBFEATURE_COUNTS:
+        engine = _build(subs_per_cat)
+        for label, fn in cases.items():
+            n, dt = _count(engine, fn)
+            seen[label].add(n)
+            print(f"{subs_per_cat * N_CATEGORIES:>12} {label:<24} {n:>8} {dt * 1000:>8.2f}")
+        engine.dispose()
+
+    bad = {k: sorted(v) for k, v in seen.items() if len(v) != 1}
+    if bad:
+        raise SystemExit(f"[bench] query count grows with taxonomy size: {bad}")
+    print("[bench] OK: query count is constant across taxonomy sizes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_recommender.py
+"""
+Latency benchmark for services/recommender.py on a synthetic ScoreMatrix
+(no DB): thousands of models, ~60 subfeatures, queries with many constraints.
+
+Run from the project root:
+    python -m benchmarks.bench_recommender [n_models]
+"""
+
+from __future__ import annotations
+import os, sys, time
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+from services.recommender import Recommender
+from services.score_matrix import ScoreMatrix
+
+N_CATEGORIES = 5
+SUBS_PER_CAT = 12
+REPEATS = 200
+
+
+def synthetic_matrix(n_models: int, seed: int = 0) -> ScoreMatrix:
+    rng = np.random.default_rng(seed)
+    S = N_CATEGORIES * SUBS_PER_CAT
+    values = rng.integers(0, 3, size=(n_models, S)).astype(np.float64)
+    values[rng.random((n_models, S)) < 0.05] = np.nan  # some missing scores
+    membership = np.zeros((S, N_CATEGORIES))
+    membership[np.arange(S), np.arange(S) // SUBS_PER_CAT] = 1.0
+    weights = np.tile([20.0, 30.0, 15.0, 15.0, 20.0], (n_models, 1))
+    return ScoreMatrix(
+        models=[f"model_{i}" for i in range(n_models)],
+        categories=[f"cat_{c}" for c in range(N_CATEGORIES)],
+        subcategories=[(f"cat_{j // SUBS_PER_CAT}", f"sub_{j}") for j in range(S)],
+        values=values,
+        membership=membership,
+        weights=weights,
+    )
+
+
+def _time(fn) -> float:
+    fn()  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - t0) / REPEATS * 1000
+
+
+def main() -> None:
+    n_models = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    sm = synthetic_matrix(n_models)
+
+    t0 = time.perf_counter()
+    rec = Recommender(sm)
+    print(f"[bench] build index for {n_models} models x {sm.values.shape[1]} subfeatures: "
+          f"{(time.perf_counter() - t0) * 1000:.2f} ms")
+
+    keys = [f"{c}.{s}" for c, s in sm.subcategories]
+    queries = {
+        "1 constraint": {keys[0]: ">= 1"},
+        "5 constraints": {k: ">= 1" for k in keys[:5]},
+        "20 constraints": {k: ("!= 0" if i % 2 else ">= 1") for i, k in enumerate(keys[:20])},
+        "60 constraints": {k: ">= 0" for k in keys},
+    }
+    for label, q in queries.items():
+        matched = rec.recommend(q, k=10)["matched"]
+        ms = _time(lambda: rec.recommend(q, k=10))
+        ms_w = _time(lambda: rec.recommend(q, k=10, weights={"cat_0": 50, "cat_1": 0}))
+        print(f"[bench] {label:<16} matched={matched:<6} {ms:.3f} ms/query  "
+              f"(with weight overrides: {ms_w:.3f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/bench_seed.py
+"""
+Timing benchmark: row-by-row vs bulk seeding (api/seed_from_json.py).
+
+Generates a synthetic model_scores.json-shaped dataset (default 10k models,
+5 categories, ~11 subfeatures), seeds it into fresh SQLite files with both
+paths, then re-seeds once more (update path), and checks that both DBs end
+up with identical content.
+
+Run from the project root:
+    python -m benchmarks.bench_seed [--models 10000] [--skip-row-by-row]
+"""
+
+from __future__ import annotations
+import os, sys, time, argparse, random, tempfile
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine
+
+from api import db_models  # noqa: F401  (register tables)
+from api.seed_from_json import seed_bulk, seed_row_by_row
+from services.scoring_service import load_models_full
+
+CATEGORIES = {
+    "adaptability": (20, ["modular_architecture", "transferability"]),
+    "bioinformatics_relevance": (30, ["biological_input_modalities", "structural_awareness"]),
+    "usability": (15, ["code_availability", "documentation_quality", "setup_ease"]),
+    "computational_efficiency": (15, ["parameter_count_efficiency", "runtime_scalability"]),
+    "output_suitability": (20, ["output_interpretability", "task_alignment"]),
+}
+
+
+def synthetic_data(n_models: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    return {
+        f"Model_{i:05d}": {
+            cat: {
+                "weight": weight,
+                "subfeatures": {
+                    sub: {"score": rng.randint(0, 2), "note": f"synthetic note for {sub} #{i}"}
+                    for sub in subs
+                },
+            }
+            for cat, (weight, subs) in CATEGORIES.items()
+        }
+        for i in range(n_models)
+    }
+
+
+def _engine(path: str):
+    eng = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(eng)
+    return eng
+
+
+def _run(engine, fn, data) -> tuple[float, int]:
+    counter = {"n": 0}
+
+    def _on_exec(*_):
+        counter["n"] += 1
+
+    event.listen(engine, "before_cursor_execute", _on_exec)
+    try:
+        t0 = time.perf_counter()
+        with Session(engine) as s, s.begin():
+            fn(s, data)
+        return time.perf_counter() - t0, counter["n"]
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_exec)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--models", type=int, default=10000)
+    ap.add_argument("--skip-row-by-row", action="store_true")
+    args = ap.parse_args()
+
+    data = synthetic_data(args.models)
+    # Second pass changes a few scores/weights so the update path is exercised
+    data2 = synthetic_data(args.models, seed=1)
+    n_scores = sum(len(c["subfeatures"]) for m in data.values() for c in m.values())
+    print(f"[bench] {args.models} models, {n_scores} scores")
+
+    paths = {"bulk": seed_bulk}
+    if not args.skip_row_by_row:
+        paths["row-by-row"] = seed_row_by_row
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for label, fn in paths.items():
+            eng = _engine(os.path.join(tmp, f"{label}.db"))
+            t1, q1 = _run(eng, fn, data)
+            t2, q2 = _run(eng, fn, data2)
+            print(f"[bench] {label:<11} initial {t1:8.2f} s ({q1} statements)   "
+                  f"re-seed {t2:8.2f} s ({q2} statements)")
+            with Session(eng) as s:
+                results[label] = load_models_full(s)
+            eng.dispose()
+
+        if len(results) == 2:
+            if results["bulk"] != results["row-by-row"]:
+                raise SystemExit("[bench] MISMATCH between bulk and row-by-row seeding")
+            print("[bench] OK: bulk and row-by-row produce identical data")
+
+
+if __name__ == "__main__":
+    main()
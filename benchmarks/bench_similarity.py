@@ -0,0 +1,67 @@
+# benchmarks/bench_similarity.py
+"""
+Latency benchmark for services/similarity.py on a synthetic ScoreMatrix
+(no DB): index build, all-pairs top-K table, per-query cosine / weighted
+Euclidean, and the incremental refresh after a single-model upsert
+(checked against a rebuild with the same column means).
+
+Run from the project root:
+    python -m benchmarks.bench_similarity [n_models] [table_k]
+"""
+
+from __future__ import annotations
+import os, sys, time
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+from benchmarks.bench_recommender import synthetic_matrix
+from services.similarity import SimilarityIndex
+
+REPEATS = 50
+
+
+def _time(fn) -> float:
+    fn()  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - t0) / REPEATS * 1000
+
+
+def main() -> None:
+    n_models = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    table_k = max(1, int(sys.argv[2]) if len(sys.argv) > 2 else 20)
+    sm = synthetic_matrix(n_models)
+    names = sm.models
+
+    t0 = time.perf_counter()
+    plain = SimilarityIndex(sm)
+    print(f"[bench] index for {n_models} models x {sm.values.shape[1]} subfeatures: "
+          f"{(time.perf_counter() - t0) * 1000:.1f} ms")
+    t0 = time.perf_counter()
+    tabled = SimilarityIndex(sm, table_k=table_k, center=plain.center)
+    print(f"[bench] all-pairs top-{table_k} table: {time.perf_counter() - t0:.2f} s")
+
+    rng = np.random.default_rng(1)
+    picks = [names[i] for i in rng.integers(0, n_models, REPEATS + 1)]
+    it = iter(picks * 4)
+    print(f"[bench] cosine k=10 (matrix)      {_time(lambda: plain.similar(next(it), k=10)):.3f} ms/query")
+    print(f"[bench] cosine k=10 (table)       {_time(lambda: tabled.similar(next(it), k=10)):.3f} ms/query")
+    print(f"[bench] euclidean k=10            {_time(lambda: plain.similar(next(it), k=10, metric='euclidean')):.3f} ms/query")
+    print(f"[bench] euclidean k=10 (weights)  "
+          f"{_time(lambda: plain.similar(next(it), k=10, metric='euclidean', weights={'cat_0': 60})):.3f} ms/query")
+
+    S, C = sm.values.shape[1], len(sm.categories)
+    row = {names[7]: (rng.integers(0, 3, S).astype(np.float64), np.full(C, 20.0))}
+    t0 = time.perf_counter()
+    patched = tabled.updated(row)
+    ms = (time.perf_counter() - t0) * 1000
+    fresh = SimilarityIndex(patched.sm, table_k=table_k, center=plain.center)
+    same = np.allclose(patched.similarities, fresh.similarities)
+    print(f"[bench] refresh after 1 upsert:   {ms:.1f} ms  (matches rebuild: {same})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# benchmarks/bench_snapshot.py
+"""
+Cold start, memory and read latency: DB-backed API vs mapped snapshot
+(services/snapshot.py, ABUS_SNAPSHOT).
+
+Seeds a synthetic dataset (default 20k models) into a temporary SQLite file,
+builds a snapshot from it, then starts the API in a fresh process once per
+backend and reports: time to import the app and answer the first request,
+peak RSS, and mean latency per read endpoint (response cache disabled, so
+every request does the work).
+
+Run from the project root:
+    python -m benchmarks.bench_snapshot [--models 20000] [--requests 200]
+"""
+
+from __future__ import annotations
+import os, sys, time, json, argparse, subprocess, tempfile
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+ENDPOINTS = [
+    ("GET /api/models/{name}", lambda c, name: c.get(f"/api/models/{name}")),
+    ("GET /api/models/{name}/full", lambda c, name: c.get(f"/api/models/{name}/full")),
+    ("GET /api/score/{name}", lambda c, name: c.get(f"/api/score/{name}")),
+    ("GET /api/models?q=..&limit=100", lambda c, name: c.get("/api/models", params={"limit": 100, "q": name[:-2]})),
+    ("GET /api/rankings", lambda c, name: c.get("/api/rankings", params={"profile": "bench", "limit": 20})),
+    ("GET /api/search", lambda c, name: c.get("/api/search", params={"q": "transferability " + name[-3:], "limit": 5})),
+]
+
+
+def _serve(requests: int, names: list) -> dict:
+    """Runs inside the child process; the environment selects the backend."""
+    t0 = time.perf_counter()
+    from fastapi.testclient import TestClient
+    from api.app import app
+    c = TestClient(app)
+    assert c.get(f"/api/models/{names[0]}").status_code == 200
+    out = {"cold_start_s": time.perf_counter() - t0, "endpoints": {}}
+    for label, call in ENDPOINTS:
+        call(c, names[0])  # first call builds lazily derived structures
+        t = time.perf_counter()
+        for k in range(requests):
+            r = call(c, names[k % len(names)])
+            assert r.status_code == 200, (label, r.status_code, r.text[:200])
+        out["endpoints"][label] = (time.perf_counter() - t) / requests
+    out.update(_memory_mb())
+    return out
+
+
+def _memory_mb() -> dict:
+    """Peak and current RSS from /proc (ru_maxrss would include the parent's peak from before exec)."""
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmHWM", "VmRSS"):
+                fields[key] = int(value.split()[0]) / 1024
+    return {"peak_rss_mb": fields.get("VmHWM", 0.0), "rss_mb": fields.get("VmRSS", 0.0)}
+
+
+def _child(env: dict, requests: int, names: list) -> dict:
+    code = (f"import json, sys; sys.path.insert(0, {ROOT!r}); from benchmarks.bench_snapshot import _serve; "
+            f"print(json.dumps(_serve({requests}, {names!r})))")
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode:
+        raise SystemExit(proc.stderr)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--models", type=int, default=20000)
+    ap.add_argument("--requests", type=int, default=200)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="abus_snap_")
+    db_url = f"sqlite:///{tmp}/bench.db"
+    env = dict(os.environ, DATABASE_URL=db_url, ABUS_RESPONSE_CACHE_SIZE="0")
+    env.pop("ABUS_SNAPSHOT", None)
+    os.environ.update(env)
+
+    from api.db import init_db, get_session
+    from api.seed_from_json import seed_bulk
+    from benchmarks.bench_seed import synthetic_data
+    from services.profile_service import upsert_profile
+    from services.snapshot import build_snapshot
+
+    init_db()
+    data = synthetic_data(args.models)
+    with get_session() as s, s.begin():
+        seed_bulk(s, data)
+        upsert_profile(s, {"name": "bench", "weights": {"usability": 40, "bioinformatics_relevance": 30}})
+    path = f"{tmp}/bench.snap"
+    t = time.perf_counter()
+    with get_session() as s:
+        info = build_snapshot(s, path)
+    print(f"[bench] {args.models} models; snapshot {info['bytes'] / 1e6:.1f} MB built in {time.perf_counter() - t:.2f} s")
+
+    names = sorted(data)[:: max(1, len(data) // 50)]
+    results = {
+        "db": _child(env, args.requests, names),
+        "snapshot": _child(dict(env, ABUS_SNAPSHOT=path), args.requests, names),
+    }
+    print(f"{'':<34} {'db':>10} {'snapshot':>10}")
+    print(f"{'cold start (s)':<34} {results['db']['cold_start_s']:>10.2f} {results['snapshot']['cold_start_s']:>10.2f}")
+    for key, label in (("peak_rss_mb", "peak RSS (MB)"), ("rss_mb", "RSS at exit (MB)")):
+        print(f"{label:<34} {results['db'][key]:>10.0f} {results['snapshot'][key]:>10.0f}")
+    for label, _ in ENDPOINTS:
+        a, b = results["db"]["endpoints"][label], results["snapshot"]["endpoints"][label]
+        print(f"{label + ' (ms)':<34} {a * 1000:>10.2f} {b * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
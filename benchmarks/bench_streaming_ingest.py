@@ -0,0 +1,73 @@
+# benchmarks/bench_streaming_ingest.py
+"""
+Peak memory of RuleBasedProvider scoring: whole-string vs streamed paper text.
+
+Writes synthetic papers of growing size (default 8, 32 and 128 MB) to a temp
+directory, then scores each one twice: read into one string and passed to
+score() (the original path), and as a TextFile fed through score_chunks()
+(services/ingest_pipeline.py). Reports wall time and the tracemalloc peak of
+each, and checks the scores are identical. The streamed peak should stay
+flat as the input grows.
+
+Run from the project root:
+    python -m benchmarks.bench_streaming_ingest [sizes_mb ...]
+"""
+
+from __future__ import annotations
+import os, sys, time, tempfile, tracemalloc
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.bench_keyword_matcher import synthetic_text
+from services.ingest_pipeline import TextFile
+from services.llm_providers import RuleBasedProvider
+
+SCHEMA = {cat: {sub: {} for sub in subs} for cat, subs in RuleBasedProvider.KEYWORDS.items()}
+
+
+def _measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    dt = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, dt, peak / 1e6
+
+
+def _write(path: str, size_mb: int) -> None:
+    block = synthetic_text(4_000_000, 0.03)
+    with open(path, "w", encoding="utf-8") as f:
+        written = 0
+        while written < size_mb * 1_000_000:
+            f.write(block + "\n")
+            written += len(block) + 1
+
+
+def main() -> None:
+    sizes = [int(a) for a in sys.argv[1:]] or [8, 32, 128]
+    provider = RuleBasedProvider()
+    peaks = []
+    print(f"{'MB':>6} {'whole s':>9} {'whole peak MB':>14} {'stream s':>9} {'stream peak MB':>15}")
+    with tempfile.TemporaryDirectory(prefix="abus_stream_") as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"paper_{size}.txt")
+            _write(path, size)
+
+            def whole():
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    return provider.score(f.read(), SCHEMA)
+
+            a, ta, pa = _measure(whole)
+            b, tb, pb = _measure(lambda: provider.score_chunks(TextFile(path), SCHEMA))
+            if a != b:
+                raise SystemExit(f"[bench] streamed scores differ from whole-text scores at {size} MB")
+            peaks.append(pb)
+            print(f"{size:>6} {ta:>9.2f} {pa:>14.1f} {tb:>9.2f} {pb:>15.1f}")
+            os.remove(path)
+    print(f"[bench] OK: identical scores; streamed peak {min(peaks):.1f}-{max(peaks):.1f} MB across sizes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+# benchmarks/suite.py
+"""
+End-to-end benchmark suite at multiples of the hand-written dataset.
+
+Each scale (N × the 23 models of abus/data/model_scores.json; default 10,
+100 and 1000) runs in a fresh process against its own SQLite file, with a
+dataset from benchmarks.synthetic:
+- seed       bulk seed of the dataset, then a re-seed of a changed copy
+             (the update path); seconds and peak RSS
+- compute    compute_model_scores() per model
+- endpoints  per-request latency (mean, p50, p95) of the read endpoints and
+             POST /api/models/upsert, through an in-process ASGI client
+             (httpx.ASGITransport) with the response cache off
+- ingest     RuleBasedProvider ingestion of synthetic papers, scored and
+             saved (services.ingest_pipeline.ingest_many, score cache off);
+             papers/s and peak RSS
+
+Results are written as JSON (--out, default benchmarks/results/latest.json):
+    {"meta": {...}, "metrics": {"100x.endpoint.GET /api/score/{name}.p95_ms":
+                                {"value": 3.1, "unit": "ms", "better": "lower"}, ...}}
+With --baseline FILE every metric is compared to the same metric there;
+ones worse by more than --tolerance (relative, default 0.25) are flagged
+REGRESSION and the exit status is 1. --save-baseline FILE stores this run
+as the baseline. Baselines are machine-specific: record one on the machine
+that will compare against it.
+
+Run from the project root:
+    python -m benchmarks.suite [--scales 10,100,1000] [--requests 200] [--papers 100]
+    python -m benchmarks.suite --save-baseline benchmarks/results/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/results/baseline.json
+"""
+
+from __future__ import annotations
+import os, sys, json, time, argparse, platform, subprocess, tempfile
+from typing import Any, Dict, List, Optional
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+REFERENCE_MODELS = 23
+DEFAULT_OUT = os.path.join(ROOT, "benchmarks", "results", "latest.json")
+
+# (label, method, path, share of --requests); {name} is a seeded model, {word} a note word
+ENDPOINTS = [
+    ("GET /api/models/{name}", "GET", "/api/models/{name}", 1.0),
+    ("GET /api/models/{name}/full", "GET", "/api/models/{name}/full", 1.0),
+    ("GET /api/score/{name}", "GET", "/api/score/{name}", 1.0),
+    ("GET /api/models?limit=100&scores=true", "GET", "/api/models?limit=100&scores=true", 0.5),
+    ("GET /api/rankings", "GET", "/api/rankings?profile=bench&limit=20", 0.5),
+    ("GET /api/search", "GET", "/api/search?q={word}&limit=10", 0.5),
+    ("POST /api/recommend", "POST", "/api/recommend", 0.5),
+    ("GET /api/scores", "GET", "/api/scores", 0.05),
+    ("POST /api/models/upsert", "POST", "/api/models/upsert", 0.5),
+]
+
+
+# -----------------------------------------------------------------------------
+# Measurements (run in the per-scale worker process)
+# -----------------------------------------------------------------------------
+def _reset_peak_rss() -> bool:
+    """Restart the VmHWM high-water mark (Linux >= 4.0); False where unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class _Metrics:
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.values: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, name: str, value: Optional[float], unit: str, better: str = "lower") -> None:
+        if value is not None:
+            self.values[f"{self.prefix}.{name}"] = {"value": round(value, 6), "unit": unit, "better": better}
+
+    def stage(self, name: str, fn):
+        """Run fn(); record its wall time and peak RSS (when the OS lets us reset the peak)."""
+        tracked = _reset_peak_rss()
+        t0 = time.perf_counter()
+        result = fn()
+        self.add(f"{name}.seconds", time.perf_counter() - t0, "s")
+        if tracked:
+            self.add(f"{name}.peak_rss_mb", _peak_rss_mb(), "MB")
+        return result
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def _endpoint_latencies(app, names: List[str], words: List[str], dataset: Dict[str, Any],
+                              requests: int) -> Dict[str, List[float]]:
+    import httpx
+    out: Dict[str, List[float]] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://abus") as client:
+        for label, method, path, share in ENDPOINTS:
+            n = max(3, int(requests * share))
+            times: List[float] = []
+            for k in range(n + 1):  # the first request warms lazily built structures and is not counted
+                name = names[k % len(names)]
+                url = path.format(name=name, word=words[k % len(words)])
+                body = None
+                if label == "POST /api/recommend":
+                    body = {"constraints": {"usability.code_availability": ">= 1"}, "k": 10}
+                elif label == "POST /api/models/upsert":
+                    body = {"name": name, "categories": dataset[name]}
+                    cell = next(iter(next(iter(dataset[name].values()))["subfeatures"].values()))
+                    cell["score"] = (cell["score"] + 1) % 3  # a real change every time
+                t0 = time.perf_counter()
+                r = await client.request(method, url, json=body)
+                dt = time.perf_counter() - t0
+                if r.status_code != 200:
+                    raise RuntimeError(f"{label}: HTTP {r.status_code} {r.text[:200]}")
+                if k:
+                    times.append(dt)
+            out[label] = times
+    return out
+
+
+def run_scale(scale: int, requests: int, papers: int, paper_size: int,
+              subfeatures: Optional[int], note_words: Optional[float]) -> Dict[str, Dict[str, Any]]:
+    """One scale, in this process; DATABASE_URL must point at an empty database."""
+    import asyncio
+    from benchmarks.synthetic import generate_dataset, generate_papers
+    from api.db import get_session, init_db
+    from api.seed_from_json import seed_bulk
+
+    m = _Metrics(f"{scale}x")
+    n_models = REFERENCE_MODELS * scale
+    data = generate_dataset(n_models, subfeatures=subfeatures, note_words=note_words)
+    changed = generate_dataset(n_models, subfeatures=subfeatures, note_words=note_words, seed=1)
+    n_scores = sum(len(c["subfeatures"]) for model in data.values() for c in model.values())
+    m.add("models", n_models, "count", "info")
+    m.add("scores", n_scores, "count", "info")
+
+    init_db()
+
+    def seed(d):
+        with get_session() as s, s.begin():
+            seed_bulk(s, d)
+    m.stage("seed", lambda: seed(data))
+    m.add("seed.scores_per_s", n_scores / m.values[f"{m.prefix}.seed.seconds"]["value"], "1/s", "higher")
+    m.stage("reseed", lambda: seed(changed))
+
+    from services.scoring_service import compute_model_scores
+    names = sorted(changed)[:: max(1, n_models // 200)]
+
+    def compute():
+        with get_session() as s:
+            for name in names:
+                compute_model_scores(s, name)
+    m.stage("compute", compute)
+    m.add("compute.per_model_ms", m.values[f"{m.prefix}.compute.seconds"]["value"] * 1000 / len(names), "ms")
+
+    from services.profile_service import upsert_profile
+    with get_session() as s, s.begin():
+        upsert_profile(s, {"name": "bench", "weights": {"usability": 40, "bioinformatics_relevance": 30}})
+    from api.app import app
+    words = sorted({w.strip(".,;:()").lower() for model in list(changed.values())[:20] for c in model.values()
+                    for cell in c["subfeatures"].values() for w in (cell["note"] or "").split()
+                    if len(w) > 4 and w.isalpha()}) or ["synthetic"]
+    latencies = m.stage("endpoints", lambda: asyncio.run(_endpoint_latencies(app, names, words, changed, requests)))
+    for label, times in latencies.items():
+        times.sort()
+        m.add(f"endpoint.{label}.mean_ms", sum(times) / len(times) * 1000, "ms")
+        m.add(f"endpoint.{label}.p50_ms", _percentile(times, 0.5) * 1000, "ms")
+        m.add(f"endpoint.{label}.p95_ms", _percentile(times, 0.95) * 1000, "ms")
+
+    from services.ingest_pipeline import ingest_many
+    n_papers = min(papers, n_models)
+    report = m.stage("ingest", lambda: ingest_many(generate_papers(n_papers, size=paper_size), workers=1,
+                                                    use_cache=False))
+    if report["failed"]:
+        raise RuntimeError(f"ingestion failures: {report['failures'][:3]}")
+    m.add("ingest.papers_per_s", n_papers / m.values[f"{m.prefix}.ingest.seconds"]["value"], "1/s", "higher")
+    return m.values
+
+
+# -----------------------------------------------------------------------------
+# Driver
+# -----------------------------------------------------------------------------
+def _meta(args) -> Dict[str, Any]:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                             text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        rev = None
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_rev": rev,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": {k: v for k, v in vars(args).items() if k not in ("worker", "baseline", "save_baseline", "out")},
+    }
+
+
+def compare(metrics: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            tolerance: float) -> List[Dict[str, Any]]:
+    """Metrics worse than the baseline by more than `tolerance` (relative)."""
+    flagged = []
+    for key, cur in metrics.items():
+        base = baseline.get(key)
+        if base is None or cur["better"] not in ("lower", "higher") or not base["value"]:
+            continue
+        change = (cur["value"] - base["value"]) / abs(base["value"])
+        worse = change if cur["better"] == "lower" else -change
+        if worse > tolerance:
+            flagged.append({"metric": key, "baseline": base["value"], "value": cur["value"],
+                            "unit": cur["unit"], "change": round(change, 4)})
+    return flagged
+
+
+def _worker(spec: Dict[str, Any]) -> None:
+    print(json.dumps(run_scale(**spec)))
+
+
+def _run_worker(scale: int, args, tmp: str) -> Dict[str, Dict[str, Any]]:
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/bench_{scale}x.db", ABUS_RESPONSE_CACHE_SIZE="0")
+    env.pop("ABUS_SNAPSHOT", None)
+    spec = {"scale": scale, "requests": args.requests, "papers": args.papers, "paper_size": args.paper_size,
+            "subfeatures": args.subfeatures, "note_words": args.note_words}
+    proc = subprocess.run([sys.executable, "-m", "benchmarks.suite", "--worker", json.dumps(spec)],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode:
+        raise SystemExit(f"[bench] {scale}x failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="ABUS end-to-end benchmark suite")
+    ap.add_argument("--scales", default="10,100,1000", help="multiples of the 23 reference models")
+    ap.add_argument("--requests", type=int, default=200, help="requests per endpoint (some use a share)")
+    ap.add_argument("--papers", type=int, default=100, help="papers ingested per scale (at most one per model)")
+    ap.add_argument("--paper-size", type=int, default=30_000, help="characters per synthetic paper")
+    ap.add_argument("--subfeatures", type=int, default=None, help="per category (default: the real taxonomy)")
+    ap.add_argument("--note-words", type=float, default=None, help="mean note length in words")
+    ap.add_argument("--out", default=DEFAULT_OUT)
+    ap.add_argument("--baseline", help="results file to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="relative slowdown flagged as a regression")
+    ap.add_argument("--save-baseline", help="also write this run's results here")
+    ap.add_argument("--worker", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+    if args.worker:
+        _worker(json.loads(args.worker))
+        return
+
+    metrics: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="abus_suite_") as tmp:
+        for scale in (int(s) for s in args.scales.split(",")):
+            t0 = time.perf_counter()
+            metrics.update(_run_worker(scale, args, tmp))
+            print(f"[bench] {scale}x ({REFERENCE_MODELS * scale} models) done in {time.perf_counter() - t0:.1f} s")
+
+    width = max(len(k) for k in metrics)
+    for key, m in metrics.items():
+        print(f"{key:<{width}}  {m['value']:>12.3f} {m['unit']}")
+
+    results = {"meta": _meta(args), "metrics": metrics}
+    for path in filter(None, (args.out, args.save_baseline)):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"[bench] results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        flagged = compare(metrics, baseline["metrics"], args.tolerance)
+        results["regressions"] = flagged
+        for r in flagged:
+            print(f"[bench] REGRESSION {r['metric']}: {r['baseline']} -> {r['value']} {r['unit']} "
+                  f"({r['change']:+.0%})")
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+        if flagged:
+            raise SystemExit(1)
+        print(f"[bench] OK: no metric worse than baseline ({baseline['meta'].get('git_rev')}) "
+              f"by more than {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
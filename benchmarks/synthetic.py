@@ -0,0 +1,159 @@
+# benchmarks/synthetic.py
+"""
+Synthetic ABUS datasets and paper texts at any scale.
+
+generate_dataset() returns {model: {category: {weight, subfeatures: {sub:
+{score, note}}}}}, the shape of abus/data/model_scores.json, modelled on
+that file:
+- categories and weights are the real ones; subfeatures are the real ones,
+  padded with extra_<category>_<k> (or cut) to `subfeatures` per category
+- scores follow the real 0/1/2 (and fractional) distribution
+- notes come from a word-bigram chain over the real notes, `note_words`
+  words on average (lognormal spread), so full-text search sees realistic
+  vocabulary; note_words=0 leaves them out
+generate_papers() yields ingestion inputs ({"name", "text"}) with a given
+density of RuleBasedProvider keywords.
+
+Both are deterministic for a given seed. Write files from the command line:
+    python -m benchmarks.synthetic dataset out.json --models 2300 [--subfeatures 4] [--note-words 14]
+    python -m benchmarks.synthetic papers out.jsonl --papers 200 [--size 30000]
+"""
+
+from __future__ import annotations
+import os, sys, json, math, random, argparse
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+REFERENCE_JSON = os.path.join(ROOT, "abus", "data", "model_scores.json")
+NAME_PARTS = ("Prot", "ESM", "Bert", "Fold", "Gen", "Seq", "Struct", "Mul", "Evo", "Ankh", "Saprot", "Gear")
+
+
+class _Reference:
+    """Taxonomy, score distribution and note vocabulary of the hand-written dataset."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.categories: Dict[str, Tuple[float, List[str]]] = {}
+        scores: Counter = Counter()
+        self.bigrams: Dict[str, List[str]] = defaultdict(list)
+        self.starts: List[str] = []
+        note_words: List[int] = []
+        for model in data.values():
+            for cat, blob in model.items():
+                subs = self.categories.setdefault(cat, (float(blob.get("weight", 0)), []))[1]
+                for sub, cell in blob.get("subfeatures", {}).items():
+                    if sub not in subs:
+                        subs.append(sub)
+                    scores[cell["score"]] += 1
+                    words = (cell.get("note") or "").split()
+                    if words:
+                        note_words.append(len(words))
+                        self.starts.append(words[0])
+                        for a, b in zip(words, words[1:]):
+                            self.bigrams[a].append(b)
+        self.score_values = sorted(scores)
+        self.score_weights = [scores[v] for v in self.score_values]
+        self.mean_note_words = sum(note_words) / max(1, len(note_words))
+
+    def note(self, rng: random.Random, n_words: int) -> str:
+        words: List[str] = []
+        while len(words) < n_words:
+            w = rng.choice(self.starts)
+            while len(words) < n_words:
+                words.append(w)
+                follow = self.bigrams.get(w)
+                if not follow:
+                    break
+                w = rng.choice(follow)
+        text = " ".join(words)
+        return text if text.endswith(".") else text.rstrip(",;:") + "."
+
+
+@lru_cache(maxsize=1)
+def reference() -> _Reference:
+    with open(REFERENCE_JSON, encoding="utf-8") as f:
+        return _Reference(json.load(f))
+
+
+def model_name(i: int) -> str:
+    return f"{NAME_PARTS[i % len(NAME_PARTS)]}-{i:06d}"
+
+
+def taxonomy(subfeatures: Optional[int] = None) -> Dict[str, Tuple[float, List[str]]]:
+    """{category: (weight, [subfeature, ...])}; `subfeatures` per category pads or cuts the real lists."""
+    out = {}
+    for cat, (weight, subs) in reference().categories.items():
+        if subfeatures is not None:
+            subs = (subs + [f"extra_{cat}_{k}" for k in range(subfeatures)])[:subfeatures]
+        out[cat] = (weight, list(subs))
+    return out
+
+
+def generate_dataset(n_models: int,
+                     subfeatures: Optional[int] = None,
+                     note_words: Optional[float] = None,
+                     seed: int = 0) -> Dict[str, Any]:
+    """
+    `n_models` models over the real categories with `subfeatures` per category
+    (default: the real ones) and notes of about `note_words` words (default: the
+    real mean; 0 = no notes).
+    """
+    ref = reference()
+    rng = random.Random(seed)
+    tax = taxonomy(subfeatures)
+    mean_words = ref.mean_note_words if note_words is None else note_words
+    sigma = 0.35
+    mu = math.log(mean_words) - sigma * sigma / 2 if mean_words > 0 else 0.0
+    data: Dict[str, Any] = {}
+    for i in range(n_models):
+        model: Dict[str, Any] = {}
+        for cat, (weight, subs) in tax.items():
+            cells = {}
+            for sub in subs:
+                score = rng.choices(ref.score_values, ref.score_weights)[0]
+                note = ref.note(rng, max(1, round(rng.lognormvariate(mu, sigma)))) if mean_words > 0 else None
+                cells[sub] = {"score": score, "note": note}
+            model[cat] = {"weight": weight, "subfeatures": cells}
+        data[model_name(i)] = model
+    return data
+
+
+def generate_papers(n_papers: int, size: int = 30_000, keyword_rate: float = 0.02,
+                    seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """{"name", "text"} per paper: ~`size` characters, `keyword_rate` of the words RuleBasedProvider keywords."""
+    from benchmarks.bench_keyword_matcher import synthetic_text
+    for i in range(n_papers):
+        yield {"name": model_name(i), "text": synthetic_text(size, keyword_rate, seed=seed * 1_000_003 + i)}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Write synthetic ABUS datasets or paper texts")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    d = sub.add_parser("dataset", help="model_scores.json-shaped dataset")
+    d.add_argument("out")
+    d.add_argument("--models", type=int, default=1000)
+    d.add_argument("--subfeatures", type=int, default=None, help="per category (default: the real ones)")
+    d.add_argument("--note-words", type=float, default=None, help="mean note length in words (0 = no notes)")
+    d.add_argument("--seed", type=int, default=0)
+    p = sub.add_parser("papers", help="JSONL paper texts for services.ingest_pipeline")
+    p.add_argument("out")
+    p.add_argument("--papers", type=int, default=100)
+    p.add_argument("--size", type=int, default=30_000, help="characters per paper")
+    p.add_argument("--keyword-rate", type=float, default=0.02)
+    p.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        if args.cmd == "dataset":
+            json.dump(generate_dataset(args.models, args.subfeatures, args.note_words, args.seed), f)
+        else:
+            for paper in generate_papers(args.papers, args.size, args.keyword_rate, args.seed):
+                f.write(json.dumps(paper) + "\n")
+    print(f"[synthetic] wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
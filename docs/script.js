@@ -20,7 +20,12 @@ document.addEventListener("DOMContentLoaded", () => {
   const btnRecommend       = document.getElementById("btnRecommend");
   const recommendResultsEl = document.getElementById("recommendResults");
 
-  // Cached JSON from data/model_scores.json
+  // Precomputed export (tools/export_static.py): data/manifest.json + per-model shards.
+  // Falls back to the hand-maintained data/model_scores.json when no export exists.
+  let manifest = null;
+  const shardCache = {};
+
+  // Cached JSON from data/model_scores.json (fallback mode)
   let modelData = null;
 
   function setStatus(s) {
@@ -77,15 +82,35 @@ document.addEventListener("DOMContentLoaded", () => {
     modelView.appendChild(wrap);
   }
 
+  // Computed score block from an export shard (same shape as /api/score/{name})
+  function renderScore(sc) {
+    if (!sc) return;
+    const block = document.createElement("div");
+    block.className = "panel";
+    const lines = [`<h3>Computed Score</h3>`];
+    lines.push(`<div class="muted">overall: <strong>${(sc.overall ?? 0).toFixed(3)}</strong></div>`);
+    lines.push(`<div style="margin-top:8px">`);
+    for (const [cat, obj] of Object.entries(sc.categories || {})) {
+      lines.push(`<div class="sub"><strong>${cat}</strong> — avg: ${(obj.avg ?? 0).toFixed(3)} (n=${obj.count}), weight: ${obj.weight}</div>`);
+    }
+    lines.push(`</div>`);
+    block.innerHTML = lines.join("");
+    modelView.prepend(block);
+  }
+
   // ---------------------------
   // ABUS helpers
   // ---------------------------
 
-  // Overall ABUS score 0–100 using category weights + average subfeature score
+  // Overall ABUS score 0–100 using category weights + average subfeature score.
+  // Like the backend (services/score_matrix.py), categories count equally when
+  // their weights sum to <= 0 (e.g. ingested models, saved with weight 0).
   function computeAbusScore(model) {
     if (!model) return 0;
     let total = 0;
     let maxTotal = 0;
+    let equalTotal = 0;
+    let active = 0;
 
     for (const [, cat] of Object.entries(model)) {
       const weight = cat?.weight ?? 0;
@@ -97,10 +122,12 @@ document.addEventListener("DOMContentLoaded", () => {
       const normalized = avg / 2; // [0,1]
       total += weight * normalized;
       maxTotal += weight;
+      equalTotal += normalized;
+      active += 1;
     }
 
-    if (maxTotal === 0) return 0;
-    return (total / maxTotal) * 100;
+    if (maxTotal > 0) return (total / maxTotal) * 100;
+    return active ? (equalTotal / active) * 100 : 0;
   }
 
   // Per-category average scores (0–2)
@@ -132,15 +159,22 @@ document.addEventListener("DOMContentLoaded", () => {
     setStatus("loading models…");
 
     try {
-      const data = await fetchJSON("data/model_scores.json");
-
-      if (!data || typeof data !== "object") {
-        throw new Error("model_scores.json must be an object mapping name → details");
-      }
+      let modelNames;
+      try {
+        manifest = await fetchJSON("data/manifest.json");
+        modelNames = manifest.models.map((m) => m.name);
+      } catch (e) {
+        console.warn("[models] no manifest.json, using model_scores.json:", e.message);
+        manifest = null;
+        const data = await fetchJSON("data/model_scores.json");
 
-      modelData = data;
+        if (!data || typeof data !== "object") {
+          throw new Error("model_scores.json must be an object mapping name → details");
+        }
 
-      const modelNames = Object.keys(data);
+        modelData = data;
+        modelNames = Object.keys(data);
+      }
       modelSelect.innerHTML = "";
 
       const ph = document.createElement("option");
@@ -181,6 +215,17 @@ document.addEventListener("DOMContentLoaded", () => {
     if (raw) raw.textContent = "";
 
     try {
+      if (manifest) {
+        const entry = manifest.models.find((m) => m.name === name);
+        if (!entry) throw new Error(`Model "${name}" not found in manifest.json`);
+        if (!shardCache[name]) shardCache[name] = await fetchJSON(`data/${entry.shard}`);
+        const shard = shardCache[name];
+        renderFull(shard.full);
+        renderScore(shard.score);
+        setStatus(`loaded ${name}`);
+        return;
+      }
+
       if (!modelData) {
         const data = await fetchJSON("data/model_scores.json");
         modelData = data;
@@ -219,8 +264,21 @@ document.addEventListener("DOMContentLoaded", () => {
     return Number.isNaN(n) ? null : n;
   }
 
+  // [{name, abusScore, catAvg}] from the manifest (precomputed) or from raw model_scores.json
+  function categoryRows() {
+    if (manifest) {
+      // overall is on the 0–2 subfeature scale; ABUS is reported as 0–100
+      return manifest.models.map((m) => ({ name: m.name, abusScore: m.overall * 50, catAvg: m.avg }));
+    }
+    return Object.entries(modelData || {}).map(([name, model]) => ({
+      name,
+      abusScore: computeAbusScore(model),
+      catAvg: computeCategoryAverages(model),
+    }));
+  }
+
   function runRecommender() {
-    if (!modelData || !recommendResultsEl) return;
+    if ((!manifest && !modelData) || !recommendResultsEl) return;
 
     const minAdapt = getMin(filterAdapt?.value);
     const minBio   = getMin(filterBio?.value);
@@ -230,8 +288,8 @@ document.addEventListener("DOMContentLoaded", () => {
 
     const out = [];
 
-    for (const [name, model] of Object.entries(modelData)) {
-      const catAvg = computeCategoryAverages(model);
+    for (const row of categoryRows()) {
+      const catAvg = row.catAvg;
 
       // Category keys in your JSON:
       // "adaptability", "bioinformatics_relevance",
@@ -242,8 +300,7 @@ document.addEventListener("DOMContentLoaded", () => {
       if (minComp  !== null && (catAvg.computational_efficiency ?? 0) < minComp) continue;
       if (minOut   !== null && (catAvg.output_suitability ?? 0) < minOut) continue;
 
-      const abusScore = computeAbusScore(model);
-      out.push({ name, abusScore, catAvg });
+      out.push(row);
     }
 
     out.sort((a, b) => b.abusScore - a.abusScore);
@@ -0,0 +1,127 @@
+# services/data_version.py
+"""
+Dataset version: a counter in the single-row data_version table, bumped by
+every transaction that writes models, weights or scores. Caches keyed on
+it (e.g. api.response_cache) see writes from this process immediately and
+writes from other processes (seeder, ingest CLI) within a few seconds.
+
+- mark_data_changed(session): called by the write paths; the counter is
+  bumped once, inside the same transaction, right before it commits
+- data_version(): current value, re-read from the DB after local commits
+  and at most every ABUS_DATA_VERSION_TTL seconds otherwise (default 1)
+- adata_version(): the same for async handlers
+- version_tracker.pin(v): fixed version when serving a snapshot (services.snapshot)
+"""
+
+from __future__ import annotations
+from typing import Optional
+import os
+import threading
+import time
+from sqlalchemy import event, insert as sa_insert, select as sa_select, update as sa_update
+from sqlalchemy.orm import Session as OrmSession
+from api.db_models import DataVersion
+from api.db import get_session, run_db
+
+_ROW_ID = 1
+
+
+def _read_version_in(session) -> int:
+    t = DataVersion.__table__
+    return session.execute(sa_select(t.c.version).where(t.c.id == _ROW_ID)).scalar() or 0
+
+
+def _read_version() -> int:
+    with get_session() as s:
+        return _read_version_in(s)
+
+
+class VersionTracker:
+    """Process-local view of the dataset version."""
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = float(os.getenv("ABUS_DATA_VERSION_TTL", "1")) if ttl is None else ttl
+        self._value: Optional[int] = None
+        self._checked = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def expire(self) -> None:
+        with self._lock:
+            self._value = None
+            self._generation += 1
+
+    def pin(self, value: int) -> None:
+        """Serve `value` from now on without reading the DB (read-only snapshot serving)."""
+        with self._lock:
+            self.ttl = -1.0
+            self._value = value
+            self._generation += 1
+
+    def _fresh(self) -> bool:
+        return self._value is not None and (self.ttl < 0 or time.monotonic() - self._checked < self.ttl)
+
+    def peek(self):
+        """(value or None if a re-read is due, generation to pass to update())."""
+        with self._lock:
+            return (self._value if self._fresh() else None), self._generation
+
+    def update(self, value: int, generation: int) -> None:
+        """Store a value read outside the lock, unless a commit expired it meanwhile."""
+        with self._lock:
+            if generation == self._generation:
+                self._value = value
+                self._checked = time.monotonic()
+
+    def get(self) -> int:
+        value = self._value
+        if value is not None and (self.ttl < 0 or time.monotonic() - self._checked < self.ttl):
+            return value
+        with self._lock:
+            if not self._fresh():
+                self._value = _read_version()
+                self._checked = time.monotonic()
+            return self._value
+
+
+version_tracker = VersionTracker()
+
+
+def data_version() -> int:
+    """Current dataset version (see VersionTracker)."""
+    return version_tracker.get()
+
+
+async def adata_version() -> int:
+    """data_version() without blocking the event loop (see api.db.run_db)."""
+    value, generation = version_tracker.peek()
+    if value is not None:
+        return value
+    value = await run_db(_read_version_in)
+    version_tracker.update(value, generation)
+    return value
+
+
+def mark_data_changed(session) -> None:
+    """Flag that `session` wrote model data; the version is bumped when it commits."""
+    session.info["abus_data_changed"] = True
+
+
+@event.listens_for(OrmSession, "before_commit")
+def _bump_before_commit(session) -> None:
+    if session.info.get("abus_data_changed"):
+        t = DataVersion.__table__
+        res = session.execute(sa_update(t).where(t.c.id == _ROW_ID).values(version=t.c.version + 1))
+        if not res.rowcount:
+            session.execute(sa_insert(t).values(id=_ROW_ID, version=1))
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _expire_on_commit(session) -> None:
+    if session.info.pop("abus_data_changed", False):
+        version_tracker.expire()
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _clear_on_rollback(session) -> None:
+    session.info.pop("abus_data_changed", None)
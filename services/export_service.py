@@ -0,0 +1,201 @@
+# services/export_service.py
+"""
+Listing and bulk export of the whole dataset:
+- list_models_page(session, limit, cursor, q, with_scores) -> one keyset page of model names
+  (optionally with their materialized scores) + an opaque cursor for the next page
+- iter_export_ndjson(session)    -> NDJSON lines, one per model, streamed from a server-side cursor
+- iter_export_columnar(session)  -> one JSON document (names, subfeature keys, values matrix),
+                                    streamed in row order
+
+Both exports hold at most one model's rows (plus the schema) in memory.
+Models are never deleted, so the columnar passes are pinned to the models that
+existed when the export started and their rows always line up.
+"""
+
+from __future__ import annotations
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import base64
+import binascii
+import json
+from sqlalchemy import and_, func, select as sa_select
+from api.db_models import Model, Category, Subcategory, Score, ModelCategory
+from services.data_version import data_version
+from services.materialized_scores import materialized_model_scores
+from services.scoring_service import score_from_full
+
+MAX_PAGE = 1000
+YIELD_PER = 1000      # rows fetched per round-trip from the server-side cursor
+LINES_PER_CHUNK = 64  # NDJSON lines joined into one response chunk
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def _json_items(items) -> Iterator[str]:
+    """Comma-separated JSON items (the inside of an array), a few dozen per chunk."""
+    buf: List[str] = []
+    for i, item in enumerate(items):
+        buf.append(("," if i else "") + _dumps(item))
+        if len(buf) >= LINES_PER_CHUNK:
+            yield "".join(buf)
+            buf = []
+    if buf:
+        yield "".join(buf)
+
+
+# -----------------------------------------------------------------------------
+# Cursor pagination
+# -----------------------------------------------------------------------------
+def encode_cursor(last_name: str) -> str:
+    return base64.urlsafe_b64encode(_dumps({"after": last_name}).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        after = json.loads(raw)["after"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("invalid cursor")
+    if not isinstance(after, str):
+        raise ValueError("invalid cursor")
+    return after
+
+
+def list_models_page(session, limit: int = 100, cursor: Optional[str] = None,
+                     q: Optional[str] = None, with_scores: bool = False) -> Dict[str, Any]:
+    """
+    Models ordered by name, `limit` per page (1..MAX_PAGE), after `cursor`.
+    `q` keeps names containing it (case-insensitive).
+    Returns {"models": [name, ...] or [{"name", "overall", "categories"}, ...], "next_cursor": str | None}.
+    """
+    if not 1 <= limit <= MAX_PAGE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE}")
+    mt = Model.__table__
+    stmt = sa_select(mt.c.name).order_by(mt.c.name).limit(limit + 1)
+    if cursor:
+        stmt = stmt.where(mt.c.name > decode_cursor(cursor))
+    if q:
+        escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        stmt = stmt.where(mt.c.name.ilike(f"%{escaped}%", escape="\\"))
+    names = list(session.execute(stmt).scalars())
+    next_cursor = encode_cursor(names[limit - 1]) if len(names) > limit else None
+    names = names[:limit]
+    if not with_scores:
+        return {"models": names, "next_cursor": next_cursor}
+    scores = materialized_model_scores(session, names)
+    return {
+        "models": [
+            {"name": n, "overall": scores[n]["overall"], "categories": scores[n]["categories"]}
+            for n in names if n in scores
+        ],
+        "next_cursor": next_cursor,
+    }
+
+
+# -----------------------------------------------------------------------------
+# Streaming export
+# -----------------------------------------------------------------------------
+def _export_rows_stmt():
+    """Model ⟕ Score ⋈ Subcategory ⋈ Category ⟕ ModelCategory, so models without scores appear too."""
+    return (
+        sa_select(Model.id, Model.name, Category.name, Subcategory.name, Score.value, Score.note, ModelCategory.weight)
+        .select_from(Model)
+        .outerjoin(Score, Score.model_id == Model.id)
+        .outerjoin(Subcategory, Subcategory.id == Score.subcategory_id)
+        .outerjoin(Category, Category.id == Subcategory.category_id)
+        .outerjoin(
+            ModelCategory,
+            and_(ModelCategory.model_id == Model.id, ModelCategory.category_id == Category.id),
+        )
+        .order_by(Model.id, Score.id)
+        .execution_options(yield_per=YIELD_PER)
+    )
+
+
+def iter_models_full(session) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(model_name, get_model_full() shape) for every model, one model in memory at a time."""
+    current_id, current_name, blob = None, None, {}
+    for mid, model_name, cat_name, sub_name, value, note, weight in session.execute(_export_rows_stmt()):
+        if mid != current_id:
+            if current_id is not None:
+                yield current_name, blob
+            current_id, current_name, blob = mid, model_name, {}
+        if sub_name is None:
+            continue
+        if cat_name not in blob:
+            blob[cat_name] = {"weight": float(weight or 0.0), "subfeatures": {}}
+        blob[cat_name]["subfeatures"][sub_name] = {"score": float(value), "note": note}
+    if current_id is not None:
+        yield current_name, blob
+
+
+def iter_export_ndjson(session) -> Iterator[str]:
+    """
+    First line: {"format": "abus-export/1", "version": <dataset version>}
+    Then one line per model: {"model": name, "overall": float, "categories": <get_model_full shape>}
+    """
+    lines = [_dumps({"format": "abus-export/1", "version": data_version()})]
+    for name, full in iter_models_full(session):
+        lines.append(_dumps({"model": name, "overall": score_from_full(name, full)["overall"], "categories": full}))
+        if len(lines) >= LINES_PER_CHUNK:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def iter_export_columnar(session) -> Iterator[str]:
+    """
+    One JSON document, streamed:
+    {"format": "abus-columnar/1", "version": v,
+     "categories": [cat, ...], "subfeatures": [[cat, sub], ...],
+     "models": [name, ...],
+     "weights": [[w per category] per model],
+     "values": [[score or null per subfeature] per model]}
+    Rows of "weights" and "values" follow the order of "models".
+    """
+    max_id = session.execute(sa_select(func.max(Model.id))).scalar() or 0
+    cat_rows = session.execute(sa_select(Category.id, Category.name).order_by(Category.id)).all()
+    sub_rows = session.execute(
+        sa_select(Subcategory.id, Subcategory.name, Subcategory.category_id).order_by(Subcategory.id)
+    ).all()
+    cat_pos = {cid: j for j, (cid, _) in enumerate(cat_rows)}
+    sub_pos = {sid: k for k, (sid, _, _) in enumerate(sub_rows)}
+    cat_names = [name for _, name in cat_rows]
+
+    def grouped(stmt, width: int, pos: Dict[int, int], default) -> Iterator[List[Any]]:
+        """One dense row per model from (model_id, key, value) rows ordered by model id."""
+        current, row = None, None
+        stmt = stmt.where(Model.id <= max_id).order_by(Model.id).execution_options(yield_per=YIELD_PER)
+        for mid, key, value in session.execute(stmt):
+            if mid != current:
+                if row is not None:
+                    yield row
+                current, row = mid, [default] * width
+            if key is not None and key in pos:
+                row[pos[key]] = float(value if value is not None else 0.0)
+        if row is not None:
+            yield row
+
+    yield (
+        '{"format":"abus-columnar/1","version":' + _dumps(data_version())
+        + ',"categories":' + _dumps(cat_names)
+        + ',"subfeatures":' + _dumps([[cat_names[cat_pos[cid]], name] for _, name, cid in sub_rows])
+        + ',"models":['
+    )
+    names = sa_select(Model.name).where(Model.id <= max_id).order_by(Model.id)
+    yield from _json_items(session.execute(names.execution_options(yield_per=YIELD_PER)).scalars())
+    yield '],"weights":['
+    yield from _json_items(grouped(
+        sa_select(Model.id, ModelCategory.category_id, ModelCategory.weight)
+        .select_from(Model).outerjoin(ModelCategory, ModelCategory.model_id == Model.id),
+        len(cat_rows), cat_pos, 0.0,
+    ))
+    yield '],"values":['
+    yield from _json_items(grouped(
+        sa_select(Model.id, Score.subcategory_id, Score.value)
+        .select_from(Model).outerjoin(Score, Score.model_id == Model.id),
+        len(sub_rows), sub_pos, None,
+    ))
+    yield "]}"
@@ -0,0 +1,314 @@
+# services/history_service.py
+"""
+Append-only score history (README Step 8, "version control for scoring history").
+
+Every write through write_model_rows() (upsert endpoints, bulk seeder,
+ingest CLI) or the row-by-row seeder that changes anything opens one
+Revision (global, monotonic id + Unix time) and appends only the cells
+that changed:
+- score_revisions:  (model, subcategory, revision) -> value, note (the note
+                    only when it changed: note_changed)
+- weight_revisions: (model, category, revision)    -> weight
+The current tables (scores, model_categories) are untouched, so the
+current-state read path costs the same as before.
+
+Reconstruction never replays the whole history: each model gets a
+ModelSnapshot (zlib-compressed JSON of its full state) once SNAPSHOT_EVERY
+revision rows have piled up since its previous one, so the state at revision
+R is the latest snapshot <= R plus fewer than SNAPSHOT_EVERY deltas, two
+indexed range reads. The revision that takes a snapshot stores no delta rows
+for that model, so a large first write is kept once, as a snapshot. A model that already had data when history started
+gets a baseline snapshot at revision 0 on its first recorded change; one
+never changed since has no history and its current state stands for every
+revision.
+
+Scores and weights are never deleted by the write paths, so revisions only
+set values.
+
+- load_states(session, model_ids)              -> {model_id: State}, current rows
+- record_revision(session, before, after)      -> revision id, or None if nothing changed
+- parse_as_of(as_of) / resolve_revision(session, as_of) -> revision id from "<int>" or an ISO-8601 time
+- get_model_full_as_of(session, name, as_of)   -> get_model_full() shape at that revision
+- get_model_scores_as_of(session, name, as_of) -> get_model_scores() shape at that revision
+- diff_model(session, name, from_, to)         -> changed scores, notes and weights between two revisions
+
+Env: ABUS_HISTORY_SNAPSHOT_EVERY (default 64).
+"""
+
+from __future__ import annotations
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+import json
+import os
+import time
+import zlib
+from sqlalchemy import and_, insert as sa_insert, select as sa_select
+from api.db_models import (
+    Category, Model, ModelCategory, ModelHistory, ModelSnapshot, Revision, Score, ScoreRevision,
+    Subcategory, WeightRevision,
+)
+from services.scoring_service import BATCH_SIZE, IN_CHUNK, _chunks, _upsert_rows
+
+SNAPSHOT_EVERY = max(1, int(os.getenv("ABUS_HISTORY_SNAPSHOT_EVERY", "64")))
+LATEST = 2 ** 62  # as_of beyond any revision
+
+# (scores {subcategory_id: (value, note)}, weights {category_id: weight}) of one model
+State = Tuple[Dict[int, Tuple[float, Optional[str]]], Dict[int, float]]
+
+_rev, _srev, _wrev = Revision.__table__, ScoreRevision.__table__, WeightRevision.__table__
+_snap, _head = ModelSnapshot.__table__, ModelHistory.__table__
+
+
+# -----------------------------------------------------------------------------
+# Recording (called from write_model_rows)
+# -----------------------------------------------------------------------------
+def load_states(session, model_ids: List[int]) -> Dict[int, State]:
+    """Current scores and weights of `model_ids` (models without rows map to empty dicts)."""
+    st, mc = Score.__table__, ModelCategory.__table__
+    out: Dict[int, State] = {mid: ({}, {}) for mid in model_ids}
+    for batch in _chunks(list(model_ids), IN_CHUNK):
+        rows = session.execute(
+            sa_select(st.c.model_id, st.c.subcategory_id, st.c.value, st.c.note).where(st.c.model_id.in_(batch))
+        )
+        for mid, sid, value, note in rows:
+            out[mid][0][sid] = (value, note)
+        rows = session.execute(sa_select(mc.c.model_id, mc.c.category_id, mc.c.weight).where(mc.c.model_id.in_(batch)))
+        for mid, cid, weight in rows:
+            out[mid][1][cid] = weight
+    return out
+
+
+def _pack(state: State) -> bytes:
+    scores, weights = state
+    blob = {"s": [[sid, v, note] for sid, (v, note) in scores.items()], "w": [[cid, w] for cid, w in weights.items()]}
+    return zlib.compress(json.dumps(blob, separators=(",", ":")).encode("utf-8"))
+
+
+def _unpack(data: bytes) -> State:
+    blob = json.loads(zlib.decompress(data))
+    return {sid: (v, note) for sid, v, note in blob["s"]}, {cid: w for cid, w in blob["w"]}
+
+
+def record_revision(session, before: Dict[int, State], after: Dict[int, State]) -> Optional[int]:
+    """
+    Append the cells that differ between `before` and `after` ({model_id: State},
+    same keys) as one revision, inside the caller's transaction, and snapshot
+    models that are due. A model snapshotted at this revision gets no delta
+    rows for it (the snapshot already holds them; a first seed is stored once).
+    Returns the revision id, or None if nothing changed.
+    """
+    score_rows: Dict[int, List[Dict[str, Any]]] = {}
+    weight_rows: Dict[int, List[Dict[str, Any]]] = {}
+    for mid, (scores, weights) in after.items():
+        old_scores, old_weights = before[mid]
+        srows, wrows = [], []
+        for sid, (value, note) in scores.items():
+            prev = old_scores.get(sid)
+            if prev == (value, note):
+                continue
+            note_changed = note != (prev[1] if prev is not None else None)
+            srows.append({"model_id": mid, "subcategory_id": sid, "value": value,
+                          "note": note if note_changed else None, "note_changed": note_changed})
+        for cid, weight in weights.items():
+            if old_weights.get(cid) != weight:
+                wrows.append({"model_id": mid, "category_id": cid, "weight": weight})
+        if srows or wrows:
+            score_rows[mid], weight_rows[mid] = srows, wrows
+    if not score_rows:
+        return None
+
+    rev = session.execute(sa_insert(_rev).values(created_at=time.time())).inserted_primary_key[0]
+    changed = sorted(score_rows)
+    heads: Dict[int, Tuple[int, int]] = {}
+    for batch in _chunks(changed, IN_CHUNK):
+        heads.update((m, (s, p)) for m, s, p in session.execute(
+            sa_select(_head.c.model_id, _head.c.snapshot_revision, _head.c.pending).where(_head.c.model_id.in_(batch))
+        ))
+    snapshots: List[Dict[str, Any]] = []
+    new_heads: List[Dict[str, Any]] = []
+    deltas: Tuple[List[Dict[str, Any]], List[Dict[str, Any]]] = ([], [])
+    for mid in changed:
+        if mid not in heads and (before[mid][0] or before[mid][1]):
+            # first change of data that predates the history: keep where it started from
+            snapshots.append({"model_id": mid, "revision": 0, "data": _pack(before[mid])})
+            heads[mid] = (0, 0)
+        snap_rev, pending = heads.get(mid, (-1, 0))
+        pending += len(score_rows[mid]) + len(weight_rows[mid])
+        if pending >= SNAPSHOT_EVERY:
+            snapshots.append({"model_id": mid, "revision": rev, "data": _pack(after[mid])})
+            snap_rev, pending = rev, 0
+        else:
+            deltas[0].extend(score_rows[mid])
+            deltas[1].extend(weight_rows[mid])
+        new_heads.append({"model_id": mid, "snapshot_revision": snap_rev, "pending": pending})
+    for rows, table in zip(deltas, (_srev, _wrev)):
+        for r in rows:
+            r["revision"] = rev
+        for batch in _chunks(rows, BATCH_SIZE):
+            session.execute(sa_insert(table), batch)
+    for batch in _chunks(snapshots, BATCH_SIZE):
+        session.execute(sa_insert(_snap), batch)
+    # concurrent writers to one model may lose a `pending` increment: that only delays its next snapshot
+    _upsert_rows(session, _head, new_heads, ["model_id"], ["snapshot_revision", "pending"])
+    return rev
+
+
+# -----------------------------------------------------------------------------
+# Reconstruction
+# -----------------------------------------------------------------------------
+def parse_as_of(as_of: Any) -> Tuple[str, float]:
+    """("revision", id) for an int / digit string, ("time", Unix time) for ISO-8601 (naive = UTC)."""
+    if isinstance(as_of, int) and not isinstance(as_of, bool) and as_of >= 0:
+        return "revision", as_of
+    if isinstance(as_of, str) and as_of.strip():
+        value = as_of.strip()
+        if value.isdigit():
+            return "revision", int(value)
+        try:
+            ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            pass
+        else:
+            if ts.tzinfo is None:
+                ts = ts.replace(tzinfo=timezone.utc)
+            return "time", ts.timestamp()
+    raise ValueError(f"as_of must be a revision number or an ISO-8601 time, got {as_of!r}")
+
+
+def resolve_revision(session, as_of: Any) -> int:
+    """
+    Revision id for `as_of` (see parse_as_of): a revision number is capped at
+    the latest revision, a time gives the last revision committed at or
+    before it (0 if none).
+    """
+    kind, value = parse_as_of(as_of)
+    if kind == "revision":
+        latest = session.execute(sa_select(_rev.c.id).order_by(_rev.c.id.desc()).limit(1)).scalar() or 0
+        return min(int(value), latest)
+    return session.execute(
+        sa_select(_rev.c.id).where(_rev.c.created_at <= value).order_by(_rev.c.id.desc()).limit(1)
+    ).scalar() or 0
+
+
+def _model_id(session, name: str) -> int:
+    mid = session.execute(sa_select(Model.__table__.c.id).where(Model.__table__.c.name == name)).scalar()
+    if mid is None:
+        raise ValueError(f"Model '{name}' not found")
+    return mid
+
+
+def _state_at(session, model_id: int, revision: int) -> Optional[State]:
+    """State of `model_id` after `revision`; None if it had no data yet."""
+    if session.execute(sa_select(_head.c.id).where(_head.c.model_id == model_id)).first() is None:
+        return load_states(session, [model_id])[model_id]  # unchanged since before history started
+
+    snap = session.execute(
+        sa_select(_snap.c.revision, _snap.c.data)
+        .where(_snap.c.model_id == model_id, _snap.c.revision <= revision)
+        .order_by(_snap.c.revision.desc()).limit(1)
+    ).first()
+    since = snap.revision if snap is not None else -1
+    scores, weights = _unpack(snap.data) if snap is not None else ({}, {})
+    found = snap is not None
+
+    window = lambda t: and_(t.c.model_id == model_id, t.c.revision > since, t.c.revision <= revision)
+    for sid, value, note, note_changed in session.execute(
+        sa_select(_srev.c.subcategory_id, _srev.c.value, _srev.c.note, _srev.c.note_changed)
+        .where(window(_srev)).order_by(_srev.c.revision, _srev.c.id)
+    ):
+        prev = scores.get(sid)
+        scores[sid] = (value, note if note_changed else (prev[1] if prev is not None else None))
+        found = True
+    for cid, weight in session.execute(
+        sa_select(_wrev.c.category_id, _wrev.c.weight).where(window(_wrev)).order_by(_wrev.c.revision, _wrev.c.id)
+    ):
+        weights[cid] = weight
+        found = True
+    return (scores, weights) if found else None
+
+
+def _names(session, state: State) -> Tuple[Dict[int, Tuple[int, str, str]], Dict[int, str]]:
+    """({subcategory_id: (category_id, category, subfeature)}, {category_id: category}) for the ids in `state`."""
+    sub, cat = Subcategory.__table__, Category.__table__
+    subs: Dict[int, Tuple[int, str, str]] = {}
+    for batch in _chunks(sorted(state[0]), IN_CHUNK):
+        subs.update((sid, (cid, cname, sname)) for sid, cid, cname, sname in session.execute(
+            sa_select(sub.c.id, cat.c.id, cat.c.name, sub.c.name)
+            .select_from(sub.join(cat, cat.c.id == sub.c.category_id)).where(sub.c.id.in_(batch))
+        ))
+    cats: Dict[int, str] = {}
+    for batch in _chunks(sorted(state[1]), IN_CHUNK):
+        cats.update(session.execute(sa_select(cat.c.id, cat.c.name).where(cat.c.id.in_(batch))).all())
+    return subs, cats
+
+
+def _as_full(session, state: State) -> Dict[str, Any]:
+    """get_model_full() shape: categories with scores, ordered by category then subfeature id."""
+    scores, weights = state
+    subs, _ = _names(session, (scores, {}))
+    out: Dict[str, Any] = {}
+    for sid in sorted(scores, key=lambda s: (subs[s][0], s)):
+        cid, cname, sname = subs[sid]
+        if cname not in out:
+            out[cname] = {"weight": float(weights.get(cid) or 0.0), "subfeatures": {}}
+        value, note = scores[sid]
+        out[cname]["subfeatures"][sname] = {"score": float(value), "note": note}
+    return out
+
+
+def _model_at(session, name: str, as_of: Any) -> Tuple[int, State]:
+    mid = _model_id(session, name)
+    revision = resolve_revision(session, as_of)
+    state = _state_at(session, mid, revision)
+    if state is None:
+        raise ValueError(f"Model '{name}' has no data as of revision {revision}")
+    return revision, state
+
+
+def get_model_full_as_of(session, name: str, as_of: Any) -> Dict[str, Any]:
+    """get_model_full() as it was after revision `as_of` (see resolve_revision)."""
+    return _as_full(session, _model_at(session, name, as_of)[1])
+
+
+def get_model_scores_as_of(session, name: str, as_of: Any) -> Dict[str, Dict[str, float]]:
+    full = get_model_full_as_of(session, name, as_of)
+    return {
+        cat: {sub: blob["score"] for sub, blob in cat_blob["subfeatures"].items()}
+        for cat, cat_blob in full.items()
+    }
+
+
+def diff_model(session, name: str, from_: Any, to: Any = None) -> Dict[str, Any]:
+    """
+    Returns:
+    {
+      "model": str, "from": int, "to": int,       # resolved revisions
+      "scores":  {category: {subfeature: {"from": {"score", "note"} | None, "to": {...}}}},
+      "weights": {category: {"from": float | None, "to": float}}
+    }
+    listing only what differs. `to` defaults to the latest revision; a model
+    without data at `from_` diffs against nothing.
+    """
+    mid = _model_id(session, name)
+    rev_from = resolve_revision(session, from_)
+    rev_to = resolve_revision(session, LATEST if to is None else to)
+    a = _state_at(session, mid, rev_from) or ({}, {})
+    b = _state_at(session, mid, rev_to)
+    if b is None:
+        raise ValueError(f"Model '{name}' has no data as of revision {rev_to}")
+    subs, cats = _names(session, ({**a[0], **b[0]}, {**a[1], **b[1]}))
+
+    scores: Dict[str, Dict[str, Any]] = {}
+    for sid in sorted(set(a[0]) | set(b[0]), key=lambda s: (subs[s][0], s)):
+        old, new = a[0].get(sid), b[0].get(sid)
+        if old != new:
+            _, cname, sname = subs[sid]
+            scores.setdefault(cname, {})[sname] = {
+                "from": {"score": float(old[0]), "note": old[1]} if old is not None else None,
+                "to": {"score": float(new[0]), "note": new[1]} if new is not None else None,
+            }
+    weights = {
+        cats[cid]: {"from": a[1].get(cid), "to": b[1].get(cid)}
+        for cid in sorted(set(a[1]) | set(b[1])) if a[1].get(cid) != b[1].get(cid)
+    }
+    return {"model": name, "from": rev_from, "to": rev_to, "scores": scores, "weights": weights}
@@ -5,13 +5,69 @@ Pipeline to turn a paper's text into ABUS JSON:
 2) Run provider (rule-based or LLM) to get 0/1/2 + note for each subfeature
 3) Assemble payload with optional category weights
 4) (Optional) Upsert into DB
+
+A paper's text may be a string, a file path or an iterable of consecutive
+text chunks. Paths are read CHUNK_CHARS at a time (TextFile) and providers
+score chunked text with score_chunks(); RuleBasedProvider counts keywords
+across chunk boundaries, so memory stays bounded whatever the paper's size
+and the scores equal those for the whole string.
+
+Batch mode (ingest_many / CLI) fetches the schema once, fans provider.score
+out over a process pool, streams results back as they complete and saves
+them in batched transactions (papers from a directory are passed to the
+workers as paths, and read there):
+
+    python -m services.ingest_pipeline papers/ --workers 8
+    python -m services.ingest_pipeline papers.jsonl --workers 8 --batch-size 100
 """
 
 from __future__ import annotations
-from typing import Dict, Any, Optional
-from services.schema_service import get_schema_from_db
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple, Union
+from services.schema_service import get_schema
 from services.llm_providers import RuleBasedProvider, LLMProvider
-from services.scoring_service import upsert_model_from_payload
+from services.scoring_service import upsert_model_from_payload, upsert_models_from_payloads
+from services.score_cache import CachedProvider, ScoreCache, default_score_cache, merge_scored
+
+CHUNK_CHARS = 1 << 20  # characters read from a paper file at a time
+
+
+class TextFile:
+    """A UTF-8 text file as a re-iterable of chunks (picklable, so workers read it themselves)."""
+
+    def __init__(self, path: Union[str, os.PathLike], chunk_chars: int = CHUNK_CHARS):
+        self.path = Path(path)
+        self.chunk_chars = chunk_chars
+
+    def __iter__(self) -> Iterator[str]:
+        with self.path.open(encoding="utf-8", errors="replace") as f:
+            while True:
+                chunk = f.read(self.chunk_chars)
+                if not chunk:
+                    return
+                yield chunk
+
+    def __repr__(self) -> str:
+        return f"TextFile({str(self.path)!r})"
+
+
+# The text itself, a path to a UTF-8 file, or consecutive chunks (a TextFile, a list, a generator)
+PaperText = Union[str, os.PathLike, Iterable[str]]
+
+
+def _as_chunks(paper_text: PaperText) -> Union[str, Iterable[str]]:
+    return TextFile(paper_text) if isinstance(paper_text, os.PathLike) else paper_text
+
+
+def _score(provider: LLMProvider, paper_text: Union[str, Iterable[str]], schema: Dict[str, Any]):
+    if isinstance(paper_text, str):
+        return provider.score(paper_text, schema)
+    return provider.score_chunks(paper_text, schema)
 
 def build_payload_from_scores(model_name: str,
                               scores: Dict[str, Dict[str, Dict[str, Any]]],
@@ -24,26 +80,285 @@ def build_payload_from_scores(model_name: str,
         }
     return {"name": model_name, "categories": categories}
 
+def _resolve_cache(cache: Optional[ScoreCache], use_cache: bool) -> Optional[ScoreCache]:
+    if not use_cache:
+        return None
+    return cache if cache is not None else default_score_cache()
+
 def ingest_paper_to_json(model_name: str,
-                         paper_text: str,
+                         paper_text: PaperText,
                          weights: Optional[Dict[str, float]] = None,
-                         provider: Optional[LLMProvider] = None) -> Dict[str, Any]:
+                         provider: Optional[LLMProvider] = None,
+                         cache: Optional[ScoreCache] = None,
+                         use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Score one paper against the DB schema. Subfeature results are looked up in
+    (and written to) `cache`, by default the process-wide ScoreCache; a one-shot
+    chunk iterator cannot be hashed before scoring, so it is only written to it.
+    """
     provider = provider or RuleBasedProvider()
-    schema = get_schema_from_db()
-    scored = provider.score(paper_text, schema)
+    cache = _resolve_cache(cache, use_cache)
+    if cache is not None:
+        provider = CachedProvider(provider, cache)
+    schema = get_schema()
+    scored = _score(provider, _as_chunks(paper_text), schema)
     payload = build_payload_from_scores(model_name, scored, weights=weights)
     return payload
 
 def ingest_and_save(model_name: str,
-                    paper_text: str,
+                    paper_text: PaperText,
                     weights: Optional[Dict[str, float]] = None,
-                    provider: Optional[LLMProvider] = None) -> Dict[str, Any]:
+                    provider: Optional[LLMProvider] = None,
+                    cache: Optional[ScoreCache] = None,
+                    use_cache: bool = True) -> Dict[str, Any]:
     """
     End-to-end: score + save to DB (upsert). Returns payload.
     """
-    payload = ingest_paper_to_json(model_name, paper_text, weights=weights, provider=provider)
+    payload = ingest_paper_to_json(model_name, paper_text, weights=weights, provider=provider,
+                                   cache=cache, use_cache=use_cache)
     # persist
     from api.db import get_session
     with get_session() as s, s.begin():
         upsert_model_from_payload(s, payload)
     return payload
+
+
+# -----------------------------------------------------------------------------
+# Batch ingestion
+# -----------------------------------------------------------------------------
+# A paper is (model_name, paper_text) or {"name": ..., "text" | "path": ..., "weights": {...}}
+# (paper_text: see PaperText; with workers > 1 it must pickle, so no generators).
+# Readers may also yield {"name": ..., "error": ...} for inputs they could not parse;
+# those are passed through as failures.
+Paper = Union[Tuple[str, PaperText], Dict[str, Any]]
+
+
+def _unpack_paper(paper: Paper, default_weights: Optional[Dict[str, float]]):
+    if isinstance(paper, dict):
+        text = TextFile(paper["path"]) if paper.get("path") is not None else paper.get("text")
+        return paper.get("name"), _as_chunks(text), paper.get("weights", default_weights)
+    name, text = paper
+    return name, _as_chunks(text), default_weights
+
+
+def _score_only(provider: LLMProvider, schema: Dict[str, Any], paper_text: Union[str, Iterable[str]]):
+    """Worker entry point (must stay top-level so it pickles)."""
+    return _score(provider, paper_text, schema)
+
+
+def iter_ingest(papers: Iterable[Paper],
+                weights: Optional[Dict[str, float]] = None,
+                provider: Optional[LLMProvider] = None,
+                workers: Optional[int] = None,
+                schema: Optional[Dict[str, Any]] = None,
+                max_in_flight: Optional[int] = None,
+                cache: Optional[ScoreCache] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Score many papers, yielding {"name", "payload"} or {"name", "error"} as each completes
+    (completion order, not input order).
+
+    The schema is read once (from the process-wide cache). With workers > 1, provider.score runs in a
+    ProcessPoolExecutor (provider must be picklable); at most `max_in_flight`
+    papers are queued at a time, so `papers` can be a lazy iterator over
+    thousands of texts. workers <= 1 scores on the calling thread.
+    With a `cache`, lookups and stores happen here in the parent process and
+    workers only see the subfeatures that are not cached yet.
+    """
+    provider = provider or RuleBasedProvider()
+    schema = schema if schema is not None else get_schema()
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+
+    def prepare(paper):
+        """-> (name, text, weights, cached, missing_schema, keys)"""
+        name, text, w = _unpack_paper(paper, weights)
+        if cache is None or iter(text) is text:  # a one-shot chunk stream cannot be hashed up front
+            return name, text, w, {}, schema, None
+        return (name, text, w, *cache.lookup(provider, text, schema))
+
+    def finish(job, fresh) -> Dict[str, Any]:
+        name, _, w, cached, _, keys = job
+        if keys is not None:
+            cache.store(keys, fresh)
+            fresh = merge_scored(schema, cached, fresh)
+        return {"name": name, "payload": build_payload_from_scores(name, fresh, weights=w)}
+
+    if workers <= 1:
+        for paper in papers:
+            if isinstance(paper, dict) and "error" in paper:
+                yield paper
+                continue
+            try:
+                job = prepare(paper)
+                missing = job[4]
+                yield finish(job, _score_only(provider, missing, job[1]) if missing else {})
+            except Exception as e:
+                yield {"name": _unpack_paper(paper, weights)[0], "error": f"{type(e).__name__}: {e}"}
+        return
+
+    max_in_flight = max_in_flight or workers * 4
+    it = iter(papers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        ready: List[Dict[str, Any]] = []  # unreadable inputs and full cache hits
+
+        def submit_next() -> bool:
+            for paper in it:
+                if isinstance(paper, dict) and "error" in paper:
+                    ready.append(paper)
+                    continue
+                try:
+                    job = prepare(paper)
+                    if not job[4]:
+                        ready.append(finish(job, {}))
+                        continue
+                except Exception as e:
+                    ready.append({"name": _unpack_paper(paper, weights)[0], "error": f"{type(e).__name__}: {e}"})
+                    continue
+                pending[pool.submit(_score_only, provider, job[4], job[1])] = job
+                return True
+            return False
+
+        while len(pending) < max_in_flight and submit_next():
+            pass
+        while pending or ready:
+            while ready:
+                yield ready.pop(0)
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                job = pending.pop(fut)
+                try:
+                    yield finish(job, fut.result())
+                except Exception as e:
+                    yield {"name": job[0], "error": f"{type(e).__name__}: {e}"}
+                submit_next()
+
+
+def ingest_many(papers: Iterable[Paper],
+                weights: Optional[Dict[str, float]] = None,
+                provider: Optional[LLMProvider] = None,
+                workers: Optional[int] = None,
+                batch_size: int = 50,
+                save: bool = True,
+                on_result=None,
+                cache: Optional[ScoreCache] = None,
+                use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Batch version of ingest_and_save. Scored payloads are written with
+    upsert_models_from_payloads in one transaction per `batch_size` papers.
+    `on_result(result_dict)` is called for every paper as it completes.
+
+    Returns a report:
+    {"total", "scored", "saved", "failed", "elapsed_s", "papers_per_s",
+     "failures": [{"name", "stage": "read" | "score" | "save", "error"}],
+     "cache": ScoreCache.stats() or None}
+    """
+    from api.db import get_session
+
+    t0 = time.perf_counter()
+    report: Dict[str, Any] = {"total": 0, "scored": 0, "saved": 0, "failed": 0, "failures": []}
+    batch: List[Dict[str, Any]] = []
+
+    def flush():
+        if not batch:
+            return
+        with get_session() as s, s.begin():
+            res = upsert_models_from_payloads(s, batch)
+        report["saved"] += len(res["ok"])
+        for err in res["errors"]:
+            report["failures"].append({"name": err["name"], "stage": "save", "error": err["error"]})
+        batch.clear()
+
+    cache = _resolve_cache(cache, use_cache)
+    for result in iter_ingest(papers, weights=weights, provider=provider, workers=workers, cache=cache):
+        report["total"] += 1
+        if "error" in result:
+            report["failures"].append({"name": result["name"], "stage": result.get("stage", "score"),
+                                       "error": result["error"]})
+        else:
+            report["scored"] += 1
+            if save:
+                batch.append(result["payload"])
+                if len(batch) >= batch_size:
+                    flush()
+        if on_result:
+            on_result(result)
+    if save:
+        flush()
+
+    elapsed = time.perf_counter() - t0
+    report["failed"] = len(report["failures"])
+    report["elapsed_s"] = round(elapsed, 3)
+    report["papers_per_s"] = round(report["total"] / elapsed, 2) if elapsed > 0 else None
+    report["cache"] = cache.stats() if cache is not None else None
+    return report
+
+
+def iter_papers(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily read papers from a directory of text files or a single .txt/.md
+    file (model name = file stem; yielded as {"name", "path"}, the text is read
+    by whoever scores it), or from a JSONL file with {"name", "text" or "path",
+    optional "weights"} per line.
+    Malformed lines are yielded as {"name": "<file>:<line>", "stage": "read", "error": ...}.
+    """
+    path = Path(path)
+    if path.is_dir():
+        for f in sorted(path.iterdir()):
+            if f.is_file() and f.suffix.lower() in (".txt", ".md"):
+                yield {"name": f.stem, "path": f}
+        return
+    if path.suffix.lower() in (".txt", ".md"):
+        yield {"name": path.stem, "path": path}
+        return
+    with path.open(encoding="utf-8") as fh:
+        for lineno, line in enumerate(fh, start=1):
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield {"name": f"{path}:{lineno}", "stage": "read", "error": f"invalid JSON: {e}"}
+                continue
+            if not isinstance(rec, dict) or not rec.get("name") or not (
+                    isinstance(rec.get("text"), str) or isinstance(rec.get("path"), str)):
+                yield {"name": f"{path}:{lineno}", "stage": "read",
+                       "error": "expected {'name': str, 'text': str} or {'name': str, 'path': str}"}
+                continue
+            yield rec
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+    ap = argparse.ArgumentParser(description="Batch-ingest paper texts into ABUS scores")
+    ap.add_argument("source", help="directory of .txt/.md papers, one such file, or a JSONL file")
+    ap.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    ap.add_argument("--batch-size", type=int, default=50, help="papers per DB transaction")
+    ap.add_argument("--weights", help='JSON object of default category weights, e.g. \'{"usability": 15}\'')
+    ap.add_argument("--dry-run", action="store_true", help="score only, do not write to the DB")
+    ap.add_argument("--out", help="also write scored payloads as JSONL here")
+    ap.add_argument("--no-cache", action="store_true", help="bypass the provider score cache (ABUS_SCORE_CACHE)")
+    args = ap.parse_args(argv)
+
+    weights = json.loads(args.weights) if args.weights else None
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+
+    def on_result(r):
+        if out and "payload" in r:
+            out.write(json.dumps(r["payload"]) + "\n")
+        if "error" in r:
+            print(f"[ingest] FAILED {r['name']}: {r['error']}", file=sys.stderr)
+
+    try:
+        report = ingest_many(iter_papers(args.source), weights=weights, workers=args.workers,
+                             batch_size=args.batch_size, save=not args.dry_run, on_result=on_result,
+                             use_cache=not args.no_cache)
+    finally:
+        if out:
+            out.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+# services/ingest_queue.py
+"""
+Persistent background queue for paper ingestion (POST /api/ingest).
+
+Jobs live in a small SQLite file, so they survive restarts:
+    jobs(id, key, name, status, weights, text, result, error, attempts,
+         owner, lease_until, created_at, started_at, finished_at)
+    status: queued -> running -> done | failed
+
+- submit_many() deduplicates: a paper whose key (sha256 of name, text digest,
+  weights and provider identity) matches a queued, running or done job gets
+  that job back instead of a new one; a failed job is re-queued in place.
+- A dispatcher thread claims queued jobs (one atomic UPDATE ... RETURNING, so
+  several API processes can share one file), scores them on a pool of
+  `workers` processes (or threads, for network-bound providers), looks them up
+  in / writes them to the ScoreCache like iter_ingest, and saves finished
+  payloads with upsert_models_from_payloads, one transaction per round.
+- Crash-safe resume: a running job holds a lease that its dispatcher renews.
+  Jobs whose lease has expired (the process died) are re-queued, up to
+  MAX_ATTEMPTS claims, after which they fail. stop() hands unfinished jobs
+  back at once. Saving is an upsert, so a job re-run after a crash between
+  its save and its "done" mark is harmless.
+
+Config:
+    ABUS_INGEST_QUEUE     path of the SQLite file (default ./.abus_cache/ingest_jobs.sqlite)
+    ABUS_INGEST_WORKERS   scoring concurrency (default 2; 0 = accept jobs, process them elsewhere)
+    ABUS_INGEST_EXECUTOR  process (default) | thread
+    ABUS_INGEST_PROVIDER  rule (default) | openai (OpenAICompatibleProvider, see its env vars)
+    ABUS_INGEST_LEASE_S   lease length in seconds (default 30)
+
+A standalone worker, for an API started with ABUS_INGEST_WORKERS=0:
+    python -m services.ingest_queue run [--workers 4]
+    python -m services.ingest_queue stats
+Its saves bump the dataset version (services.data_version), so the API's
+caches, recommender and similarity index pick them up within
+ABUS_DATA_VERSION_TTL like any other out-of-process write.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+from services.ingest_pipeline import _score_only, build_payload_from_scores
+from services.llm_providers import LLMProvider, OpenAICompatibleProvider, RuleBasedProvider
+from services.schema_service import get_schema
+from services.score_cache import ScoreCache, default_score_cache, merge_scored, text_digest
+
+DEFAULT_PATH = os.path.join(".abus_cache", "ingest_jobs.sqlite")
+STATUSES = ("queued", "running", "done", "failed")
+MAX_ATTEMPTS = 3
+
+log = logging.getLogger("abus.ingest")
+
+_COLUMNS = "id, name, status, attempts, error, result, created_at, started_at, finished_at"
+
+
+def _canonical(obj: Any) -> str:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts)) if ts is not None else None
+
+
+def _check_weights(weights: Any, where: str) -> Optional[Dict[str, float]]:
+    if weights is None:
+        return None
+    if not isinstance(weights, dict):
+        raise ValueError(f"{where}: 'weights' must be an object of category -> number")
+    try:
+        return {str(k): float(v) for k, v in weights.items()}
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: 'weights' values must be numbers")
+
+
+def provider_from_env() -> LLMProvider:
+    kind = os.getenv("ABUS_INGEST_PROVIDER", "rule").lower()
+    if kind == "rule":
+        return RuleBasedProvider()
+    if kind == "openai":
+        return OpenAICompatibleProvider()
+    raise ValueError(f"ABUS_INGEST_PROVIDER must be 'rule' or 'openai', not {kind!r}")
+
+
+class IngestQueue:
+    def __init__(self, path: str = DEFAULT_PATH,
+                 workers: int = 2,
+                 provider: Optional[LLMProvider] = None,
+                 executor: str = "process",
+                 lease_s: float = 30.0,
+                 cache: Optional[ScoreCache] = None):
+        if executor not in ("process", "thread"):
+            raise ValueError("executor must be 'process' or 'thread'")
+        self.path = path
+        self.workers = max(0, int(workers))
+        self.provider = provider or RuleBasedProvider()
+        self.executor = executor
+        self.lease_s = float(lease_s)
+        self.cache = cache
+        self.owner = uuid.uuid4().hex
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._identity = _canonical(self.provider.identity())
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL UNIQUE, name TEXT NOT NULL,"
+                " status TEXT NOT NULL, weights TEXT, text TEXT, result TEXT, error TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0, owner TEXT, lease_until REAL,"
+                " created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status, id)")
+            self._conn = conn
+        return self._conn
+
+    def _write(self, fn, *args):
+        """fn(db, *args) in one BEGIN IMMEDIATE transaction (serialized across processes)."""
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                out = fn(db, *args)
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+            return out
+
+    def close(self) -> None:
+        self.stop()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # -------------------------------------------------------------------------
+    # Submitting and reading jobs
+    # -------------------------------------------------------------------------
+    def job_key(self, name: str, text: str, weights: Optional[Dict[str, float]]) -> str:
+        blob = _canonical([name, text_digest(text), weights, self._identity])
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def submit_many(self, papers: List[Dict[str, Any]],
+                    weights: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+        """
+        papers: [{"name": str, "text": str, "weights": {...} (optional, else `weights`)}, ...]
+        Returns [{"id", "name", "status", "deduplicated": bool}, ...] in input order.
+        Raises ValueError on a malformed paper (nothing is queued then).
+        """
+        default_weights = _check_weights(weights, "weights")
+        rows = []
+        for i, paper in enumerate(papers):
+            where = f"papers[{i}]"
+            if not isinstance(paper, dict):
+                raise ValueError(f"{where}: expected an object with 'name' and 'text'")
+            name, text = paper.get("name"), paper.get("text")
+            if not isinstance(name, str) or not name.strip():
+                raise ValueError(f"{where}: 'name' must be a non-empty string")
+            if not isinstance(text, str):
+                raise ValueError(f"{where}: 'text' must be a string")
+            w = _check_weights(paper["weights"], where) if "weights" in paper else default_weights
+            rows.append((self.job_key(name, text, w), name, text, _canonical(w) if w is not None else None))
+        out = self._write(self._enqueue, rows)
+        if any(not job["deduplicated"] for job in out):
+            self._wake.set()
+        return out
+
+    def _enqueue(self, db: sqlite3.Connection, rows: List[Tuple[str, str, str, Optional[str]]]):
+        out = []
+        now = time.time()
+        for key, name, text, weights in rows:
+            found = db.execute("SELECT id, status FROM jobs WHERE key = ?", (key,)).fetchone()
+            if found is not None and found[1] != "failed":
+                out.append({"id": found[0], "name": name, "status": found[1], "deduplicated": True})
+                continue
+            if found is not None:
+                db.execute("UPDATE jobs SET status = 'queued', text = ?, result = NULL, error = NULL, attempts = 0,"
+                           " owner = NULL, lease_until = NULL, created_at = ?, started_at = NULL, finished_at = NULL"
+                           " WHERE id = ?", (text, now, found[0]))
+                job_id = found[0]
+            else:
+                job_id = db.execute("INSERT INTO jobs (key, name, status, weights, text, created_at)"
+                                    " VALUES (?, ?, 'queued', ?, ?, ?)", (key, name, weights, text, now)).lastrowid
+            out.append({"id": job_id, "name": name, "status": "queued", "deduplicated": False})
+        return out
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db().execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        jid, name, status, attempts, error, result, created, started, finished = row
+        return {
+            "id": jid,
+            "name": name,
+            "status": status,
+            "attempts": attempts,
+            "created_at": _iso(created),
+            "started_at": _iso(started),
+            "finished_at": _iso(finished),
+            "error": error,
+            "result": json.loads(result) if result is not None else None,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._db().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {
+            **{status: counts.get(status, 0) for status in STATUSES},
+            "workers": self.workers,
+            "executor": self.executor,
+            "processing": self.running,
+        }
+
+    # -------------------------------------------------------------------------
+    # Claims and leases
+    # -------------------------------------------------------------------------
+    def _claim(self, db: sqlite3.Connection, n: int) -> List[Tuple[int, str, Optional[str], str]]:
+        now = time.time()
+        return db.execute(
+            "UPDATE jobs SET status = 'running', owner = ?, lease_until = ?, attempts = attempts + 1, started_at = ?"
+            " WHERE id IN (SELECT id FROM jobs WHERE status = 'queued' ORDER BY id LIMIT ?)"
+            " RETURNING id, name, weights, text",
+            (self.owner, now + self.lease_s, now, n),
+        ).fetchall()
+
+    def _recover(self, db: sqlite3.Connection) -> None:
+        """Re-queue (or, after MAX_ATTEMPTS claims, fail) running jobs whose lease expired."""
+        now = time.time()
+        db.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, text = NULL, owner = NULL, finished_at = ?"
+            " WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+            (f"abandoned: the worker stopped {MAX_ATTEMPTS} times while processing it", now, now, MAX_ATTEMPTS),
+        )
+        db.execute("UPDATE jobs SET status = 'queued', owner = NULL, lease_until = NULL"
+                   " WHERE status = 'running' AND lease_until < ?", (now,))
+
+    def _renew(self, db: sqlite3.Connection) -> None:
+        db.execute("UPDATE jobs SET lease_until = ? WHERE status = 'running' AND owner = ?",
+                   (time.time() + self.lease_s, self.owner))
+
+    def _release(self, db: sqlite3.Connection, ids: Optional[List[int]], count_attempt: bool) -> None:
+        """
+        Hand claimed jobs (ids=None: all of this queue's) back: on shutdown without
+        counting the claim, after a worker process died as a failed attempt.
+        """
+        owned = " AND owner = ?" + ("" if ids is None else f" AND id IN ({','.join('?' * len(ids))})")
+        args = [self.owner] + list(ids or [])
+        if count_attempt:
+            db.execute(f"UPDATE jobs SET lease_until = 0 WHERE status = 'running'{owned}", args)
+            self._recover(db)
+        else:
+            db.execute("UPDATE jobs SET status = 'queued', owner = NULL, lease_until = NULL, attempts = attempts - 1"
+                       f" WHERE status = 'running'{owned}", args)
+
+    def _finish(self, db: sqlite3.Connection, done: List[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]):
+        now = time.time()
+        for job_id, result, error in done:
+            db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, text = NULL, owner = NULL, lease_until = NULL,"
+                " finished_at = ? WHERE id = ? AND owner = ?",
+                ("failed" if error else "done", _canonical(result) if result is not None else None, error,
+                 now, job_id, self.owner),
+            )
+
+    # -------------------------------------------------------------------------
+    # Dispatcher
+    # -------------------------------------------------------------------------
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "IngestQueue":
+        """Start the dispatcher thread (no-op if running or workers == 0)."""
+        with self._lock:
+            if self.workers == 0 or (self._thread is not None and self._thread.is_alive()):
+                return self
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="abus-ingest-queue", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """Stop claiming; jobs still being scored go back to the queue for the next start."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        thread.join(timeout)
+        self._thread = None
+
+    def _pool(self) -> Executor:
+        if self.executor == "thread":
+            return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="abus-ingest")
+        # spawn, not fork: the API process runs other threads (DB pools, the event loop)
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._dispatch()
+            except Exception:
+                # a DB or schema error must not end background ingestion for good
+                log.exception("ingest queue dispatcher failed; restarting")
+                self._stop.wait(self.lease_s / 3)
+
+    def _dispatch(self) -> None:
+        cache = self.cache if self.cache is not None else default_score_cache()
+        tick = max(0.05, min(1.0, self.lease_s / 3))
+        pool = self._pool()
+        pending: Dict[Any, Tuple[int, str, Optional[Dict[str, float]], Dict[str, Any], Any]] = {}
+        last_renew = 0.0
+        self._write(self._release, None, True)  # left over from a failed previous round
+        try:
+            while not self._stop.is_set():
+                if time.monotonic() - last_renew >= tick:
+                    self._write(self._renew)
+                    self._write(self._recover)
+                    last_renew = time.monotonic()
+                ready = []  # (job, freshly scored part); full cache hits are ready at once
+                free = self.workers - len(pending)
+                claimed = self._write(self._claim, free) if free > 0 else []
+                schema = get_schema() if claimed or pending else None
+                for job_id, name, weights, text in claimed:
+                    w = json.loads(weights) if weights is not None else None
+                    cached, missing, keys = cache.lookup(self.provider, text, schema) if cache else ({}, schema, None)
+                    job = (job_id, name, w, cached, keys)
+                    if missing:
+                        pending[pool.submit(_score_only, self.provider, missing, text)] = job
+                    else:
+                        ready.append((job, {}))
+                if not pending and not ready:
+                    self._wake.wait(tick)
+                    self._wake.clear()
+                    continue
+                done, _ = wait(pending, timeout=0 if ready else tick, return_when=FIRST_COMPLETED)
+                failed: List[Tuple[int, Optional[Dict[str, Any]], Optional[str]]] = []
+                broken: List[int] = []
+                for fut in done:
+                    job = pending.pop(fut)
+                    try:
+                        ready.append((job, fut.result()))
+                    except BrokenProcessPool:
+                        broken.append(job[0])
+                    except Exception as e:
+                        failed.append((job[0], None, f"{type(e).__name__}: {e}"))
+                if ready:
+                    self._save(schema, cache, ready)
+                if failed:
+                    self._write(self._finish, failed)
+                if broken:
+                    # a worker process died mid-job: every job on the pool is lost, retry them on a new one
+                    broken += [job[0] for job in pending.values()]
+                    pending.clear()
+                    self._write(self._release, broken, True)
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = self._pool()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            if pending:
+                self._write(self._release, [job[0] for job in pending.values()], False)
+
+    def _save(self, schema: Dict[str, Any], cache: Optional[ScoreCache], ready) -> None:
+        """Build payloads for scored jobs and upsert them in one transaction; record each job's outcome."""
+        from api.db import get_session
+        from services.scoring_service import upsert_models_from_payloads
+        from services.similarity import refresh_similarity
+
+        payloads = []
+        for (job_id, name, w, cached, keys), fresh in ready:
+            if keys is not None:
+                cache.store(keys, fresh)
+                fresh = merge_scored(schema, cached, fresh)
+            payloads.append(build_payload_from_scores(name, fresh, weights=w))
+        try:
+            with get_session() as s, s.begin():
+                res = upsert_models_from_payloads(s, payloads)
+        except Exception as e:
+            res = {"ok": [], "errors": [{"index": i, "error": f"{type(e).__name__}: {e}"} for i in range(len(ready))]}
+        errors = {err["index"]: err["error"] for err in res["errors"]}
+        outcome = []
+        for i, ((job_id, name, *_), _) in enumerate(ready):
+            if i in errors:
+                outcome.append((job_id, None, f"save failed: {errors[i]}"))
+            else:
+                outcome.append((job_id, {"name": name, "saved": True, "payload": payloads[i]}, None))
+        self._write(self._finish, outcome)
+        if res["ok"]:
+            # Patch this process's similarity index in place of a full rebuild on the
+            # next read; every other process rebuilds its own on the version bump.
+            with get_session() as s:
+                refresh_similarity(s, res["ok"])
+
+
+_default_queue: Optional[IngestQueue] = None
+_default_lock = threading.Lock()
+
+
+def default_ingest_queue() -> IngestQueue:
+    """Process-wide queue configured from the ABUS_INGEST_* variables (not started)."""
+    global _default_queue
+    with _default_lock:
+        if _default_queue is None:
+            _default_queue = IngestQueue(
+                path=os.getenv("ABUS_INGEST_QUEUE", DEFAULT_PATH),
+                workers=int(os.getenv("ABUS_INGEST_WORKERS", "2")),
+                provider=provider_from_env(),
+                executor=os.getenv("ABUS_INGEST_EXECUTOR", "process").lower(),
+                lease_s=float(os.getenv("ABUS_INGEST_LEASE_S", "30")),
+            )
+        return _default_queue
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+    ap = argparse.ArgumentParser(description="Run or inspect the background ingestion queue")
+    ap.add_argument("command", choices=["run", "stats"])
+    ap.add_argument("--workers", type=int, default=None, help="scoring concurrency (default: ABUS_INGEST_WORKERS)")
+    args = ap.parse_args(argv)
+
+    queue = default_ingest_queue()
+    if args.command == "stats":
+        print(json.dumps(queue.stats(), indent=2))
+        return
+    queue.workers = max(1, args.workers if args.workers is not None else queue.workers)
+    queue.start()
+    print(f"[ingest-queue] processing {queue.path} with {queue.workers} {queue.executor} workers (Ctrl-C to stop)")
+    try:
+        while queue.running:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        queue.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,95 @@
 Pluggable providers that turn a paper's text into 0/1/2 scores per subfeature.
 - Base interface: LLMProvider
 - RuleBasedProvider: deterministic keyword heuristics (no network)
-- (Optional) OpenAIProvider/HFProvider: add later
+- AsyncLLMProvider: async base (ascore) with subfeature batching, bounded
+  concurrency, token-bucket rate limiting and retries with backoff
+- OpenAICompatibleProvider: any /v1/chat/completions endpoint over pooled
+  httpx connections (see tools/llm_stub_server.py for an offline stub)
+- (Optional) HFProvider: add later
 """
 
 from __future__ import annotations
-from typing import Dict, Any, Iterable
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+import asyncio
+import json
+import os
+import random
 import re
+import time
+
+_BOUNDARY = re.compile(r"\b")
+
+
+class KeywordMatcher:
+    """
+    Counts whole-word keyword hits for a fixed keyword set in one pass.
+
+    Equivalent to running len(re.findall(rf"\b{re.escape(kw)}\b", text)) for
+    every keyword, but compiled once into a single zero-width lookahead
+    alternation, so overlapping hits of different keywords (e.g. "structure"
+    inside "secondary structure") are all seen in a single scan.
+    Keywords and text are expected to be lowercased already.
+
+    count_chunks() gives the same counts for text that arrives in pieces,
+    holding only one chunk plus the longest keyword's worth of tail.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        # Longest first: at a given position the regex reports the longest
+        # keyword that matches; any other hit there must be one of its prefixes.
+        self.keywords: Tuple[str, ...] = tuple(sorted({k for k in keywords if k}, key=lambda k: (-len(k), k)))
+        self._prefixes: Dict[str, List[str]] = {
+            k: [p for p in self.keywords if p != k and k.startswith(p)] for k in self.keywords
+        }
+        alts = "|".join(re.escape(k) for k in self.keywords) or r"(?!)"
+        self._re = re.compile(rf"(?=\b({alts})\b)")
+        self._horizon = max((len(k) for k in self.keywords), default=0)
+
+    def count(self, text: str) -> Dict[str, int]:
+        counts = dict.fromkeys(self.keywords, 0)
+        last_end = dict.fromkeys(self.keywords, 0)  # findall() semantics: no self-overlap
+        self._scan(text, 0, len(text) + 1, 0, counts, last_end)
+        return counts
+
+    def count_chunks(self, chunks: Iterable[str]) -> Dict[str, int]:
+        """count("".join(chunks)) without joining; keywords spanning chunk boundaries are found."""
+        counts = dict.fromkeys(self.keywords, 0)
+        last_end = dict.fromkeys(self.keywords, 0)
+        buf, base, start = "", 0, 0  # buf[0] is at text offset `base`; positions before `start` are done
+        for chunk in chunks:
+            buf += chunk
+            # a hit at p is only certain once the keyword and the character after it have arrived
+            stop = len(buf) - self._horizon
+            if stop > start:
+                self._scan(buf, start, stop, base, counts, last_end)
+                # keep one character before `stop` for the \b test there
+                buf, base, start = buf[stop - 1:], base + stop - 1, 1
+        self._scan(buf, start, len(buf) + 1, base, counts, last_end)
+        return counts
+
+    def _scan(self, text: str, start: int, stop: int, base: int,
+              counts: Dict[str, int], last_end: Dict[str, int]) -> None:
+        """Count hits starting in text[start:stop]; `base` is text's offset in the whole input."""
+        for m in self._re.finditer(text, start):
+            p = m.start()
+            if p >= stop:
+                break
+            kw = m.group(1)
+            at = base + p
+            if at >= last_end[kw]:
+                counts[kw] += 1
+                last_end[kw] = at + len(kw)
+            for short in self._prefixes[kw]:
+                end = p + len(short)
+                if at >= last_end[short] and _BOUNDARY.match(text, end):
+                    counts[short] += 1
+                    last_end[short] = base + end
+
+
+@lru_cache(maxsize=32)
+def _compiled_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
 
 class LLMProvider:
     def score(self, paper_text: str, schema: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, Any]]]:
@@ -22,6 +105,22 @@ class LLMProvider:
         """
         raise NotImplementedError
 
+    def score_chunks(self, chunks: Iterable[str], schema: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        score() for a text given as consecutive pieces, e.g. the chunks of a
+        services.ingest_pipeline.TextFile (see _as_chunks there).
+        This default joins them; providers that can work incrementally override it.
+        """
+        return self.score("".join(chunks), schema)
+
+    def identity(self) -> Dict[str, Any]:
+        """
+        JSON-serializable description of everything that can change this
+        provider's output (class + config). Used as part of cache keys.
+        """
+        cls = type(self)
+        return {"provider": f"{cls.__module__}.{cls.__qualname__}"}
+
 
 class RuleBasedProvider(LLMProvider):
     """
@@ -59,6 +158,13 @@ class RuleBasedProvider(LLMProvider):
         thresholds: (#hits) -> {0,1,2}. E.g., hits <2 => 0, <5 => 1, else => 2
         """
         self.t0, self.t1, self.t2 = score_thresholds
+        # One matcher for the whole keyword table, shared across instances
+        self.matcher = _compiled_matcher(tuple(
+            kw.lower() for subdict in self.KEYWORDS.values() for kws in subdict.values() for kw in kws
+        ))
+
+    def identity(self) -> Dict[str, Any]:
+        return {**super().identity(), "thresholds": [self.t0, self.t1, self.t2], "keywords": self.KEYWORDS}
 
     def _score_for_hits(self, n: int) -> int:
         if n < self.t1:
@@ -68,7 +174,15 @@ class RuleBasedProvider(LLMProvider):
         return 2
 
     def score(self, paper_text: str, schema: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, Any]]]:
-        t = paper_text.lower()
+        # crude token match: one pass over the text for every keyword at once
+        return self._score_counts(self.matcher.count(paper_text.lower()), schema)
+
+    def score_chunks(self, chunks: Iterable[str], schema: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        # lowering chunk by chunk finds the same keyword hits as lowering the whole text
+        # (the only context-dependent mapping, Greek final sigma, is a letter either way)
+        return self._score_counts(self.matcher.count_chunks(c.lower() for c in chunks), schema)
+
+    def _score_counts(self, counts: Dict[str, int], schema: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, Any]]]:
         out: Dict[str, Dict[str, Dict[str, Any]]] = {}
         for cat, subdict in schema.items():
             out[cat] = {}
@@ -77,8 +191,7 @@ class RuleBasedProvider(LLMProvider):
                 hits = 0
                 note_bits: list[str] = []
                 for kw in keywords:
-                    # crude token match
-                    count = len(re.findall(rf"\b{re.escape(kw.lower())}\b", t))
+                    count = counts.get(kw.lower(), 0)
                     if count:
                         hits += count
                         note_bits.append(f"{kw}×{count}")
@@ -86,3 +199,271 @@ class RuleBasedProvider(LLMProvider):
                 note = " | ".join(note_bits) if note_bits else "no keyword evidence"
                 out[cat][sub] = {"score": score, "note": note}
         return out
+
+
+# -----------------------------------------------------------------------------
+# Async providers
+# -----------------------------------------------------------------------------
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens per second, bursts of up to `capacity`.
+    rate <= 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        if self.rate <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+class RetryableError(Exception):
+    """Transient failure (rate limit, 5xx, transport); `retry_after` in seconds if the server said so."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AsyncLLMProvider(LLMProvider):
+    """
+    Async base for network-backed providers.
+
+    ascore() splits the schema into batches of `batch_size` subfeatures (one
+    prompt each) and runs them concurrently, bounded by a semaphore of
+    `max_concurrency` and a TokenBucket of `requests_per_second`. Failed
+    batches are retried with exponential backoff + jitter.
+
+    Subclasses implement `_score_batch(paper_text, keys)` for a list of
+    (category, subfeature) keys and return {(category, subfeature): {"score", "note"}}.
+    The sync score() runs ascore() on a private event loop, so async
+    providers drop into the existing pipeline unchanged.
+    """
+
+    def __init__(self,
+                 batch_size: int = 8,
+                 max_concurrency: int = 8,
+                 requests_per_second: float = 0.0,
+                 max_retries: int = 4,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 20.0):
+        self.batch_size = max(1, int(batch_size))
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._loop_state: Optional[Tuple[Any, asyncio.Semaphore, TokenBucket]] = None
+
+    # Limits are bound to the running event loop; rebuild them when it changes
+    def _limits(self) -> Tuple[asyncio.Semaphore, TokenBucket]:
+        loop = asyncio.get_running_loop()
+        if self._loop_state is None or self._loop_state[0] is not loop:
+            self._loop_state = (loop, asyncio.Semaphore(self.max_concurrency),
+                                TokenBucket(self.requests_per_second))
+        return self._loop_state[1], self._loop_state[2]
+
+    def __getstate__(self):
+        # Picklable for process pools: loop-bound objects are recreated lazily
+        state = self.__dict__.copy()
+        state["_loop_state"] = None
+        return state
+
+    async def _score_batch(self, paper_text: str,
+                           keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def _run_batch(self, paper_text: str, keys: List[Tuple[str, str]]):
+        sem, bucket = self._limits()
+        attempt = 0
+        while True:
+            async with sem:
+                await bucket.acquire()
+                try:
+                    return await self._score_batch(paper_text, keys)
+                except RetryableError as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = e.retry_after
+            if delay is None:
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                delay *= random.uniform(0.5, 1.0)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def ascore(self, paper_text: str, schema: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        keys = [(cat, sub) for cat, subdict in schema.items() for sub in subdict.keys()]
+        batches = [keys[i:i + self.batch_size] for i in range(0, len(keys), self.batch_size)]
+        results = await asyncio.gather(*(self._run_batch(paper_text, b) for b in batches))
+
+        out: Dict[str, Dict[str, Dict[str, Any]]] = {cat: {} for cat in schema}
+        merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for r in results:
+            merged.update(r)
+        for cat, sub in keys:
+            out[cat][sub] = merged.get((cat, sub), {"score": 0, "note": "no answer from provider"})
+        return out
+
+    async def ascore_many(self, papers: Iterable[Tuple[str, str]],
+                          schema: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]:
+        """{name: ascore(text)} for many (name, text) pairs, sharing one set of limits."""
+        papers = list(papers)
+        scored = await asyncio.gather(*(self.ascore(text, schema) for _, text in papers))
+        return {name: res for (name, _), res in zip(papers, scored)}
+
+    async def aclose(self) -> None:
+        pass
+
+    def score(self, paper_text: str, schema: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        async def run():
+            try:
+                return await self.ascore(paper_text, schema)
+            finally:
+                await self.aclose()
+        return asyncio.run(run())
+
+
+def _clamp_score(raw: Any) -> int:
+    try:
+        return max(0, min(2, int(round(float(raw)))))
+    except (TypeError, ValueError):
+        return 0
+
+
+class OpenAICompatibleProvider(AsyncLLMProvider):
+    """
+    Scores subfeatures with an OpenAI-compatible /v1/chat/completions API.
+
+    Config (args or env): OPENAI_BASE_URL (default http://127.0.0.1:8001/v1, the
+    local stub), OPENAI_API_KEY, ABUS_LLM_MODEL. One httpx.AsyncClient per event
+    loop keeps connections pooled across batches and papers.
+    Requires `httpx`.
+    """
+
+    SYSTEM_PROMPT = (
+        "You score protein language models for the ABUS framework. For each requested "
+        "subfeature, read the paper and answer with 0 (no support), 1 (partial support) "
+        "or 2 (full support) plus a one-sentence justification. Reply with a JSON object "
+        'mapping each "category.subfeature" key to {"score": 0|1|2, "note": "..."}.'
+    )
+
+    def __init__(self,
+                 base_url: Optional[str] = None,
+                 api_key: Optional[str] = None,
+                 model: Optional[str] = None,
+                 max_paper_chars: int = 60000,
+                 timeout: float = 60.0,
+                 **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = (base_url or os.getenv("OPENAI_BASE_URL", "http://127.0.0.1:8001/v1")).rstrip("/")
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY", "")
+        self.model = model or os.getenv("ABUS_LLM_MODEL", "gpt-4o-mini")
+        self.max_paper_chars = max_paper_chars
+        self.timeout = timeout
+        self._client = None
+        self._client_loop = None
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state["_client"] = None
+        state["_client_loop"] = None
+        return state
+
+    def identity(self) -> Dict[str, Any]:
+        return {**super().identity(), "base_url": self.base_url, "model": self.model,
+                "system_prompt": self.SYSTEM_PROMPT, "max_paper_chars": self.max_paper_chars}
+
+    def _get_client(self):
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            try:
+                import httpx
+            except ImportError as e:
+                raise RuntimeError("OpenAICompatibleProvider requires `httpx` (pip install httpx)") from e
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_concurrency,
+                                    max_keepalive_connections=self.max_concurrency),
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+
+    def score_chunks(self, chunks: Iterable[str], schema: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        # only the first max_paper_chars reach the prompt; stop reading there
+        head: List[str] = []
+        n = 0
+        for chunk in chunks:
+            head.append(chunk[:self.max_paper_chars - n])
+            n += len(head[-1])
+            if n >= self.max_paper_chars:
+                break
+        return self.score("".join(head), schema)
+
+    def build_messages(self, paper_text: str, keys: List[Tuple[str, str]]) -> List[Dict[str, str]]:
+        wanted = [f"{cat}.{sub}" for cat, sub in keys]
+        user = (
+            "SUBFEATURES_JSON: " + json.dumps(wanted) + "\n\n"
+            "PAPER:\n" + paper_text[:self.max_paper_chars]
+        )
+        return [{"role": "system", "content": self.SYSTEM_PROMPT}, {"role": "user", "content": user}]
+
+    async def _score_batch(self, paper_text: str, keys: List[Tuple[str, str]]):
+        import httpx
+
+        client = self._get_client()
+        body = {
+            "model": self.model,
+            "messages": self.build_messages(paper_text, keys),
+            "temperature": 0,
+            "response_format": {"type": "json_object"},
+        }
+        try:
+            resp = await client.post("/chat/completions", json=body)
+        except httpx.TransportError as e:
+            raise RetryableError(f"transport error: {e}")
+        if resp.status_code == 429 or resp.status_code >= 500:
+            retry_after = resp.headers.get("retry-after")
+            try:
+                retry_after = float(retry_after) if retry_after is not None else None
+            except ValueError:
+                retry_after = None
+            raise RetryableError(f"HTTP {resp.status_code}", retry_after=retry_after)
+        resp.raise_for_status()
+
+        content = resp.json()["choices"][0]["message"]["content"]
+        try:
+            answer = json.loads(content)
+        except json.JSONDecodeError:
+            raise RetryableError("model returned non-JSON content")
+
+        out: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for cat, sub in keys:
+            item = answer.get(f"{cat}.{sub}") if isinstance(answer, dict) else None
+            if isinstance(item, dict):
+                out[(cat, sub)] = {"score": _clamp_score(item.get("score")), "note": str(item.get("note") or "")}
+        return out
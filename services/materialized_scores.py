@@ -0,0 +1,318 @@
+# services/materialized_scores.py
+"""
+Materialized model scores, so the score endpoints don't re-aggregate raw
+Score rows on every request:
+- model_category_stats: score sum + count per (model, category)
+- model_scores:         weighted overall per model
+
+Kept in sync by write_model_rows() inside the writer's transaction:
+capture_deltas() reads the previous values of the scores about to be
+written, apply_deltas() then adds (Δsum, Δcount) per (model, category) and
+recomputes `overall` for the touched models only. Touched models that were
+never materialized (e.g. data loaded before these tables existed) are
+rebuilt from their Score rows instead.
+
+- materialized_model_scores(session, names) -> {model: compute_model_scores() shape}
+- get_materialized_score(session, name)      -> one model (ValueError if unknown)
+- get_materialized_scores(session)           -> every model, sorted like compute_all_scores()
+- check_materialized(session)                -> mismatches against a full recompute
+- rebuild_materialized(session, names)       -> recompute from Score rows (backfill / repair)
+
+CLI:
+    python -m services.materialized_scores --check
+    python -m services.materialized_scores --fix        # rebuild only mismatched models
+    python -m services.materialized_scores --rebuild    # rebuild everything
+"""
+
+from __future__ import annotations
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import and_, bindparam, delete as sa_delete, func, insert as sa_insert, select as sa_select, update as sa_update
+from api.db_models import Model, Category, Subcategory, Score, ModelCategory, ModelCategoryStat, ModelScore
+from services.scoring_service import (
+    BATCH_SIZE,
+    IN_CHUNK,
+    _chunks,
+    _upsert_rows,
+    compute_all_scores,
+    load_models_full,
+    score_from_category_stats,
+    score_from_full,
+)
+
+Delta = Dict[Tuple[int, int], List[float]]  # (model_id, category_id) -> [Δsum, Δcount]
+
+_stats = ModelCategoryStat.__table__
+_overall = ModelScore.__table__
+
+
+# -----------------------------------------------------------------------------
+# Incremental maintenance (called from write_model_rows)
+# -----------------------------------------------------------------------------
+def capture_deltas(session, model_ids: List[int],
+                   scores: Dict[Tuple[int, int], Dict[str, Any]],
+                   sub_category: Dict[int, int],
+                   old: Optional[Dict[Tuple[int, int], float]] = None) -> Tuple[Set[int], Delta]:
+    """
+    Call before upserting `scores` ({(model_id, subcategory_id): row}).
+    Returns (ids of already materialized models among `model_ids`, their
+    per-(model, category) deltas). `sub_category` maps subcategory_id -> category_id;
+    `old` are the current values of `model_ids` if the caller has read them already.
+    """
+    done: Set[int] = set()
+    for batch in _chunks(model_ids, IN_CHUNK):
+        done.update(session.execute(sa_select(_overall.c.model_id).where(_overall.c.model_id.in_(batch))).scalars())
+    deltas: Delta = {}
+    if not done:
+        return done, deltas
+
+    if old is None:
+        st = Score.__table__
+        old = {}
+        for batch in _chunks(sorted(done), IN_CHUNK):
+            rows = session.execute(
+                sa_select(st.c.model_id, st.c.subcategory_id, st.c.value).where(st.c.model_id.in_(batch))
+            )
+            old.update(((m, s), v) for m, s, v in rows)
+
+    for (mid, sid), row in scores.items():
+        if mid not in done:
+            continue
+        d = deltas.setdefault((mid, sub_category[sid]), [0.0, 0])
+        prev = old.get((mid, sid))
+        if prev is None:
+            d[0] += row["value"]
+            d[1] += 1
+        else:
+            d[0] += row["value"] - prev
+    return done, deltas
+
+
+def apply_deltas(session, model_ids: List[int], done: Set[int], deltas: Delta) -> None:
+    """Call after the writes: apply `deltas`, rebuild unmaterialized models, refresh overall for all of `model_ids`."""
+    if deltas:
+        existing: Set[Tuple[int, int]] = set()
+        for batch in _chunks(sorted({m for m, _ in deltas}), IN_CHUNK):
+            existing.update(tuple(r) for r in session.execute(
+                sa_select(_stats.c.model_id, _stats.c.category_id).where(_stats.c.model_id.in_(batch))
+            ))
+        new_rows = [
+            {"model_id": m, "category_id": c, "score_sum": d[0], "score_count": d[1]}
+            for (m, c), d in deltas.items() if (m, c) not in existing
+        ]
+        changed = [
+            {"b_model_id": m, "b_category_id": c, "d_sum": d[0], "d_count": d[1]}
+            for (m, c), d in deltas.items() if (m, c) in existing and (d[0] or d[1])
+        ]
+        for batch in _chunks(new_rows, BATCH_SIZE):
+            session.execute(sa_insert(_stats), batch)
+        if changed:
+            upd = (
+                sa_update(_stats)
+                .where(and_(_stats.c.model_id == bindparam("b_model_id"),
+                            _stats.c.category_id == bindparam("b_category_id")))
+                .values(score_sum=_stats.c.score_sum + bindparam("d_sum"),
+                        score_count=_stats.c.score_count + bindparam("d_count"))
+            )
+            for batch in _chunks(changed, BATCH_SIZE):
+                session.execute(upd, batch)
+
+    _rebuild_stats(session, [m for m in model_ids if m not in done])
+    _refresh_overall(session, model_ids)
+
+
+def _rebuild_stats(session, model_ids: List[int]) -> None:
+    """Recompute model_category_stats for `model_ids` with one INSERT ... SELECT ... GROUP BY per chunk."""
+    st = Score.__table__
+    sub = Subcategory.__table__
+    for batch in _chunks(model_ids, IN_CHUNK):
+        session.execute(sa_delete(_stats).where(_stats.c.model_id.in_(batch)))
+        # ordered by first score id, so categories come out in get_model_full() order
+        grouped = (
+            sa_select(st.c.model_id, sub.c.category_id, func.sum(st.c.value), func.count(st.c.id))
+            .select_from(st.join(sub, sub.c.id == st.c.subcategory_id))
+            .where(st.c.model_id.in_(batch))
+            .group_by(st.c.model_id, sub.c.category_id)
+            .order_by(st.c.model_id, func.min(st.c.id))
+        )
+        session.execute(
+            sa_insert(_stats).from_select(["model_id", "category_id", "score_sum", "score_count"], grouped)
+        )
+
+
+def _stats_rows_stmt():
+    """(model_id, model_name, category_name, weight, sum, count) in category order per model."""
+    mc = ModelCategory.__table__
+    return (
+        sa_select(_stats.c.model_id, Model.__table__.c.name, Category.__table__.c.name,
+                  mc.c.weight, _stats.c.score_sum, _stats.c.score_count)
+        .select_from(_stats)
+        .join(Model.__table__, Model.__table__.c.id == _stats.c.model_id)
+        .join(Category.__table__, Category.__table__.c.id == _stats.c.category_id)
+        .outerjoin(mc, and_(mc.c.model_id == _stats.c.model_id, mc.c.category_id == _stats.c.category_id))
+        .where(_stats.c.score_count > 0)
+        .order_by(_stats.c.model_id, _stats.c.id)
+    )
+
+
+def _group_stats(rows) -> Dict[int, Tuple[str, List[Tuple[str, float, float, int]]]]:
+    out: Dict[int, Tuple[str, List[Tuple[str, float, float, int]]]] = {}
+    for mid, name, cat, weight, total, count in rows:
+        out.setdefault(mid, (name, []))[1].append((cat, float(weight or 0.0), total / count, int(count)))
+    return out
+
+
+def _refresh_overall(session, model_ids: List[int]) -> None:
+    rows: List[Dict[str, Any]] = []
+    for batch in _chunks(model_ids, IN_CHUNK):
+        grouped = _group_stats(session.execute(_stats_rows_stmt().where(_stats.c.model_id.in_(batch))))
+        for mid in batch:
+            name, stats = grouped.get(mid, ("", []))
+            rows.append({"model_id": mid, "overall": score_from_category_stats(name, stats)["overall"]})
+    _upsert_rows(session, _overall, rows, ["model_id"], ["overall"])
+
+
+# -----------------------------------------------------------------------------
+# Reads
+# -----------------------------------------------------------------------------
+def _load(session, model_names: Optional[List[str]]) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """(materialized results, names of known models without a model_scores row); one query per name chunk."""
+    mt, ct, mc = Model.__table__, Category.__table__, ModelCategory.__table__
+    stmt = (
+        sa_select(mt.c.name, _overall.c.overall, ct.c.name, mc.c.weight, _stats.c.score_sum, _stats.c.score_count)
+        .select_from(mt)
+        .outerjoin(_overall, _overall.c.model_id == mt.c.id)
+        .outerjoin(_stats, and_(_stats.c.model_id == mt.c.id, _stats.c.score_count > 0))
+        .outerjoin(ct, ct.c.id == _stats.c.category_id)
+        .outerjoin(mc, and_(mc.c.model_id == mt.c.id, mc.c.category_id == _stats.c.category_id))
+        .order_by(mt.c.id, _stats.c.id)
+    )
+
+    batches: Iterable[Optional[List[str]]] = [None] if model_names is None else _chunks(model_names, IN_CHUNK)
+    found: Dict[str, Dict[str, Any]] = {}
+    missing: List[str] = []
+    for batch in batches:
+        rows = session.execute(stmt if batch is None else stmt.where(mt.c.name.in_(batch)))
+        for name, overall, cat, weight, total, count in rows:
+            if overall is None:
+                if not missing or missing[-1] != name:
+                    missing.append(name)
+                continue
+            entry = found.get(name)
+            if entry is None:
+                entry = found[name] = {"model": name, "categories": {}, "overall": float(overall)}
+            if cat is not None:
+                entry["categories"][cat] = {"weight": float(weight or 0.0), "avg": total / count, "count": int(count)}
+    return found, missing
+
+
+def materialized_model_scores(session, model_names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    { model_name: compute_model_scores() result } for the given (or all) models,
+    served from the materialized tables. Models without a materialized row are
+    computed from their Score rows; unknown names are skipped.
+    """
+    names = None if model_names is None else list(dict.fromkeys(model_names))
+    found, missing = _load(session, names)
+    if missing:
+        full = load_models_full(session, missing)
+        for name in missing:
+            found[name] = score_from_full(name, full.get(name, {}))
+    return found
+
+
+def get_materialized_score(session, model_name: str) -> Dict[str, Any]:
+    """Materialized compute_model_scores(session, model_name)."""
+    found = materialized_model_scores(session, [model_name])
+    if model_name not in found:
+        raise ValueError(f"Model '{model_name}' not found")
+    return found[model_name]
+
+
+def get_materialized_scores(session) -> List[Dict[str, Any]]:
+    """Materialized compute_all_scores(session): every model, by overall descending."""
+    results = list(materialized_model_scores(session).values())
+    results.sort(key=lambda r: (-r["overall"], r["model"]))
+    return results
+
+
+# -----------------------------------------------------------------------------
+# Consistency check / repair
+# -----------------------------------------------------------------------------
+def check_materialized(session, tol: float = 1e-9) -> List[Dict[str, Any]]:
+    """
+    Compare the materialized tables against a full recompute (compute_all_scores).
+    Returns one {"model", "problem", ...} entry per mismatch; empty means consistent.
+    """
+    expected = {r["model"]: r for r in compute_all_scores(session)}
+    found, missing = _load(session, None)
+    problems: List[Dict[str, Any]] = [{"model": n, "problem": "not materialized"} for n in missing]
+
+    def off(a: float, b: float) -> bool:
+        return abs(a - b) > tol * max(1.0, abs(a), abs(b))
+
+    for name, want in expected.items():
+        have = found.get(name)
+        if have is None:
+            continue
+        if off(want["overall"], have["overall"]):
+            problems.append({"model": name, "problem": "overall",
+                             "expected": want["overall"], "actual": have["overall"]})
+        for cat in sorted(set(want["categories"]) | set(have["categories"])):
+            w, h = want["categories"].get(cat), have["categories"].get(cat)
+            if w is None or h is None:
+                problems.append({"model": name, "problem": "category", "category": cat,
+                                 "expected": w, "actual": h})
+            elif w["count"] != h["count"] or off(w["avg"], h["avg"]) or off(w["weight"], h["weight"]):
+                problems.append({"model": name, "problem": "category", "category": cat,
+                                 "expected": w, "actual": h})
+    return problems
+
+
+def rebuild_materialized(session, model_names: Optional[Iterable[str]] = None) -> int:
+    """Recompute the materialized rows of the given (or all) models from Score rows. Returns the model count."""
+    mt = Model.__table__
+    stmt = sa_select(mt.c.id).order_by(mt.c.id)
+    ids: List[int] = []
+    if model_names is None:
+        ids = list(session.execute(stmt).scalars())
+    else:
+        for batch in _chunks(list(dict.fromkeys(model_names)), IN_CHUNK):
+            ids.extend(session.execute(stmt.where(mt.c.name.in_(batch))).scalars())
+    _rebuild_stats(session, ids)
+    _refresh_overall(session, ids)
+    return len(ids)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+    import json
+    import sys
+    from api.db import get_session, init_db
+
+    ap = argparse.ArgumentParser(description="Check or rebuild the materialized ABUS scores")
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument("--check", action="store_true", help="report mismatches against a full recompute (default)")
+    mode.add_argument("--fix", action="store_true", help="rebuild the models that fail the check")
+    mode.add_argument("--rebuild", action="store_true", help="rebuild every model")
+    args = ap.parse_args(argv)
+
+    init_db()
+    with get_session() as s, s.begin():
+        if args.rebuild:
+            print(f"[materialized] rebuilt {rebuild_materialized(s)} models")
+            return
+        problems = check_materialized(s)
+        for p in problems:
+            print(json.dumps(p))
+        if args.fix and problems:
+            n = rebuild_materialized(s, sorted({p["model"] for p in problems}))
+            print(f"[materialized] rebuilt {n} models")
+        elif problems:
+            print(f"[materialized] {len(problems)} mismatches", file=sys.stderr)
+            sys.exit(1)
+        else:
+            print("[materialized] consistent")
+
+
+if __name__ == "__main__":
+    main()
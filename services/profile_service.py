@@ -0,0 +1,295 @@
+# services/profile_service.py
+"""
+Scoring profiles (README Step 7): named category-weight presets such as
+"ABUS-PPI", and rankings of every model under one or many profiles.
+
+A profile replaces each model's own ModelCategory weights by one weight
+vector over the categories (categories it leaves out weigh 0). As in
+compute_model_scores(), only categories the model has scores in take part,
+but there is no equal-weight fallback: a model with no scores in any
+category the profile weighs scores 0, so it ranks below every model that has
+data for what the profile asks about.
+
+All requested profiles are scored in one matrix product,
+    W ([P, C]) @ [avgs * active ; active].T ([C, 2M]) -> numerators, denominators
+over the per-category averages from the materialized tables
+(services.materialized_scores). That matrix and each profile's ranking are
+cached until the dataset version changes (services.data_version); saving a
+profile bumps the version too.
+
+- upsert_profile(session, payload)  -> name
+- list_profiles(session) / get_profile(session, name)
+- rank_models(session, {label: weights}, offset, limit) -> {label: ranking}
+- rank_matrix(cm, version, {label: weights}, offset, limit) -> the same over a given CategoryMatrix
+- get_rankings(session, profile_name, offset, limit)    -> ranking of a stored profile
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Any, List, Optional, Tuple
+import os
+import threading
+import numpy as np
+from sqlalchemy import delete as sa_delete, insert as sa_insert, select as sa_select
+from api.db_models import Category, ScoringProfile, ProfileWeight
+from services.data_version import data_version, mark_data_changed
+from services.materialized_scores import materialized_model_scores
+
+# Cached rankings (one entry per distinct weight vector) per dataset version
+RANKING_CACHE_SIZE = int(os.getenv("ABUS_RANKING_CACHE_SIZE", "256"))
+
+
+# -----------------------------------------------------------------------------
+# Stored profiles
+# -----------------------------------------------------------------------------
+def _category_ids(session) -> Dict[str, int]:
+    ct = Category.__table__
+    return dict(session.execute(sa_select(ct.c.name, ct.c.id)).all())
+
+
+def validate_weights(weights: Any, categories) -> Dict[str, float]:
+    """{category: weight} with known categories, non-negative numbers, not all zero."""
+    if not isinstance(weights, dict) or not weights:
+        raise ValueError("weights must be a non-empty object of {category: weight}")
+    out: Dict[str, float] = {}
+    for cat, val in weights.items():
+        if cat not in categories:
+            raise ValueError(f"Unknown category '{cat}' in weights")
+        if isinstance(val, bool) or not isinstance(val, (int, float)) or not np.isfinite(val) or val < 0:
+            raise ValueError(f"Bad weight for {cat}: {val!r}")
+        out[cat] = float(val)
+    if not any(out.values()):
+        raise ValueError("weights must not all be zero")
+    return out
+
+
+def upsert_profile(session, payload: Dict[str, Any]) -> str:
+    """
+    Accepts {"name": "ABUS-PPI", "description": "...", "weights": {"bioinformatics_relevance": 40, ...}}.
+    Replaces the stored weights of an existing profile with the same name.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("payload must be an object")
+    name = payload.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("payload.name is required")
+    name = name.strip()
+    cat_ids = _category_ids(session)
+    weights = validate_weights(payload.get("weights"), cat_ids)
+
+    pt, wt = ScoringProfile.__table__, ProfileWeight.__table__
+    pid = session.execute(sa_select(pt.c.id).where(pt.c.name == name)).scalar()
+    if pid is None:
+        pid = session.execute(
+            sa_insert(pt).values(name=name, description=payload.get("description"))
+        ).inserted_primary_key[0]
+    else:
+        if "description" in payload:
+            session.execute(pt.update().where(pt.c.id == pid).values(description=payload["description"]))
+        session.execute(sa_delete(wt).where(wt.c.profile_id == pid))
+    session.execute(sa_insert(wt), [
+        {"profile_id": pid, "category_id": cat_ids[cat], "weight": w} for cat, w in weights.items()
+    ])
+    mark_data_changed(session)
+    return name
+
+
+def _profiles(session, name: Optional[str] = None) -> List[Dict[str, Any]]:
+    pt, wt, ct = ScoringProfile.__table__, ProfileWeight.__table__, Category.__table__
+    stmt = (
+        sa_select(pt.c.name, pt.c.description, ct.c.name, wt.c.weight)
+        .select_from(pt)
+        .outerjoin(wt, wt.c.profile_id == pt.c.id)
+        .outerjoin(ct, ct.c.id == wt.c.category_id)
+        .order_by(pt.c.name, ct.c.id)
+    )
+    if name is not None:
+        stmt = stmt.where(pt.c.name == name)
+    out: Dict[str, Dict[str, Any]] = {}
+    for pname, desc, cat, weight in session.execute(stmt):
+        entry = out.setdefault(pname, {"name": pname, "description": desc, "weights": {}})
+        if cat is not None:
+            entry["weights"][cat] = float(weight)
+    return list(out.values())
+
+
+def list_profiles(session) -> List[Dict[str, Any]]:
+    """Every stored profile as {"name", "description", "weights"}, by name."""
+    return _profiles(session)
+
+
+def get_profile(session, name: str) -> Dict[str, Any]:
+    found = _profiles(session, name)
+    if not found:
+        raise ValueError(f"Profile '{name}' not found")
+    return found[0]
+
+
+# -----------------------------------------------------------------------------
+# Batch scoring
+# -----------------------------------------------------------------------------
+@dataclass
+class CategoryMatrix:
+    models: List[str]
+    categories: List[str]
+    avgs: np.ndarray       # float64 [M, C], 0 where the model has no scores in the category
+    active: np.ndarray     # float64 [M, C], 1 where it has
+    weights: np.ndarray    # float64 [M, C], the models' own ModelCategory weights
+    name_order: np.ndarray  # [M] rank of each model name, for tie-breaks
+    stacked: np.ndarray = field(init=False, repr=False)  # [avgs * active ; active], [2M, C]
+
+    def __post_init__(self):
+        self.stacked = np.concatenate([self.avgs * self.active, self.active])
+
+    @property
+    def category_index(self) -> Dict[str, int]:
+        return {c: j for j, c in enumerate(self.categories)}
+
+    def default_weights(self) -> Dict[str, float]:
+        """Mean of the models' own weight per category (over models scored in it)."""
+        n = self.active.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(n > 0, (self.weights * self.active).sum(axis=0) / n, 0.0)
+        return {c: float(w) for c, w in zip(self.categories, mean)}
+
+    def vector(self, weights: Dict[str, float]) -> np.ndarray:
+        idx = self.category_index
+        w = np.zeros(len(self.categories))
+        for cat, val in weights.items():
+            w[idx[cat]] = val
+        return w
+
+    def overall(self, W: np.ndarray) -> np.ndarray:
+        """
+        [P, M] overall score of every model under each of P weight vectors W ([P, C]), one matrix product.
+        0 where the model has no scores in any category the vector weighs.
+        """
+        M = len(self.models)
+        both = W @ self.stacked.T  # [P, 2M]: numerators, denominators
+        num, den = both[:, :M], both[:, M:]
+        out = np.zeros_like(num)
+        np.divide(num, den, out=out, where=den > 0)
+        return out
+
+
+def build_category_matrix(session) -> CategoryMatrix:
+    """Per-category averages of every model, from the materialized score tables."""
+    scores = materialized_model_scores(session)
+    ct = Category.__table__
+    categories = list(session.execute(sa_select(ct.c.name).order_by(ct.c.id)).scalars())
+    cat_pos = {c: j for j, c in enumerate(categories)}
+    models = list(scores)
+    avgs = np.zeros((len(models), len(categories)))
+    active = np.zeros_like(avgs)
+    weights = np.zeros_like(avgs)
+    for i, name in enumerate(models):
+        for cat, blob in scores[name]["categories"].items():
+            if blob["count"] > 0:
+                avgs[i, cat_pos[cat]] = blob["avg"]
+                active[i, cat_pos[cat]] = 1.0
+            weights[i, cat_pos[cat]] = blob["weight"]
+    name_order = np.empty(len(models), dtype=np.int64)
+    name_order[np.argsort(np.array(models, dtype=object), kind="stable")] = np.arange(len(models))
+    return CategoryMatrix(models, categories, avgs, active, weights, name_order)
+
+
+class RankingCache:
+    """
+    The CategoryMatrix and per-weight-vector rankings (model order + scores)
+    of one dataset version; everything is dropped when the version changes.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._version: Optional[int] = None
+        self._matrix: Optional[CategoryMatrix] = None
+        self._ranked: "OrderedDict[Tuple[float, ...], Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def matrix(self, session, version: int,
+               build: Callable[[Any], CategoryMatrix] = build_category_matrix) -> CategoryMatrix:
+        """The matrix of `version`, from `build(session)` on a miss (services.snapshot passes its own)."""
+        with self._lock:
+            if version != self._version:
+                self._version, self._matrix = version, None
+                self._ranked.clear()
+            if self._matrix is None:
+                self._matrix = build(session)
+            return self._matrix
+
+    def rankings(self, cm: CategoryMatrix, version: int,
+                 vectors: List[np.ndarray]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """(model indices best first, their scores) per weight vector; uncached ones in one product."""
+        keys = [tuple(v.tolist()) for v in vectors]
+        with self._lock:
+            current = version == self._version
+            out = [self._ranked.get(k) if current else None for k in keys]
+            for k in keys:
+                if current and k in self._ranked:
+                    self._ranked.move_to_end(k)
+        todo = list(dict.fromkeys(k for k, r in zip(keys, out) if r is None))
+        if todo:
+            scores = cm.overall(np.array(todo, dtype=np.float64).reshape(len(todo), len(cm.categories)))
+            fresh = {}
+            for p, k in enumerate(todo):
+                order = np.lexsort((cm.name_order, -scores[p]))
+                fresh[k] = (order, scores[p, order])
+            with self._lock:
+                if version == self._version and self.max_entries > 0:
+                    self._ranked.update(fresh)
+                    while len(self._ranked) > self.max_entries:
+                        self._ranked.popitem(last=False)
+            out = [r if r is not None else fresh[k] for k, r in zip(keys, out)]
+        return out
+
+
+ranking_cache = RankingCache(RANKING_CACHE_SIZE)
+
+
+def rank_models(session,
+                profiles: Dict[str, Dict[str, float]],
+                offset: int = 0,
+                limit: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Rank every model under each of `profiles` ({label: {category: weight}}).
+    Returns {label: {"weights", "total", "results": [{"rank", "model", "score"}, ...]}},
+    results best first (ties by model name), sliced to [offset, offset + limit).
+    """
+    version = data_version()
+    return rank_matrix(ranking_cache.matrix(session, version), version, profiles, offset=offset, limit=limit)
+
+
+def rank_matrix(cm: CategoryMatrix,
+                version: int,
+                profiles: Dict[str, Dict[str, float]],
+                offset: int = 0,
+                limit: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """rank_models() over `cm` (the matrix of dataset version `version`)."""
+    if not profiles:
+        raise ValueError("at least one profile is required")
+    if offset < 0 or (limit is not None and limit <= 0):
+        raise ValueError("offset must be >= 0 and limit positive")
+    checked = {label: validate_weights(w, cm.category_index) for label, w in profiles.items()}
+    ranked = ranking_cache.rankings(cm, version, [cm.vector(w) for w in checked.values()])
+
+    end = None if limit is None else offset + limit
+    out: Dict[str, Dict[str, Any]] = {}
+    for (label, weights), (order, scores) in zip(checked.items(), ranked):
+        out[label] = {
+            "weights": weights,
+            "total": len(order),
+            "results": [
+                {"rank": r, "model": cm.models[i], "score": s}
+                for r, i, s in zip(range(offset + 1, len(order) + 1),
+                                   order[offset:end].tolist(), scores[offset:end].tolist())
+            ],
+        }
+    return out
+
+
+def get_rankings(session, profile_name: str, offset: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+    """Ranking of every model under the stored profile `profile_name`."""
+    profile = get_profile(session, profile_name)
+    ranking = rank_models(session, {profile["name"]: profile["weights"]}, offset=offset, limit=limit)
+    return {"profile": profile["name"], "description": profile["description"], **ranking[profile["name"]]}
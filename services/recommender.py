@@ -0,0 +1,255 @@
+# services/recommender.py
+"""
+Feature-constraint recommender (README Step 2).
+
+Query shape:
+{
+  "usability.code_availability": ">= 1.5",
+  "bioinformatics_relevance.biological_input_modalities": "== 2"
+}
+
+Models that satisfy every constraint are ranked by ABUS overall score
+(optionally with category-weight overrides) and the top-k are returned.
+
+Each subfeature column of the ScoreMatrix is indexed once: its argsort plus,
+for low-cardinality columns, packed "value >= v" bitsets per distinct value.
+A constraint then costs a bisect and one or two bitset ops; constraints are
+intersected most-selective first.
+"""
+
+from __future__ import annotations
+from typing import Dict, Any, List, Optional, Tuple
+from bisect import bisect_left, bisect_right
+import heapq
+import re
+import threading
+import numpy as np
+from services.data_version import data_version
+from services.profile_service import validate_weights
+from services.score_matrix import ScoreMatrix, build_score_matrix
+
+_CONSTRAINT_RE = re.compile(r"^\s*(==|!=|>=|<=|>|<|=)?\s*([-+]?(?:\d+\.?\d*|\.\d+))\s*$")
+
+
+def parse_constraint(raw: Any) -> Tuple[str, float]:
+    """'>= 1.5' -> ('>=', 1.5); bare numbers (or '= 2') mean equality."""
+    if isinstance(raw, bool):
+        raise ValueError(f"Bad constraint {raw!r}")
+    if isinstance(raw, (int, float)):
+        return "==", float(raw)
+    if isinstance(raw, str):
+        m = _CONSTRAINT_RE.match(raw)
+        if m:
+            op = m.group(1) or "=="
+            return ("==" if op == "=" else op), float(m.group(2))
+    raise ValueError(f"Bad constraint {raw!r}; expected e.g. '>= 1.5' or a number")
+
+
+# Columns with at most this many distinct values get precomputed bitmaps;
+# anything more continuous falls back to slicing the argsort per query.
+MAX_BITMAP_DISTINCT = 64
+
+
+def _pack(mask: np.ndarray, words: int) -> np.ndarray:
+    """Bool [M] -> little-endian uint64 bitset of `words` words."""
+    buf = np.zeros(words * 8, dtype=np.uint8)
+    packed = np.packbits(mask, bitorder="little")
+    buf[:len(packed)] = packed
+    return buf.view(np.uint64)
+
+
+def column_order(sm: ScoreMatrix) -> np.ndarray:
+    """[S, M] stable argsort of every subfeature column, missing scores last."""
+    return np.argsort(sm.values, axis=0, kind="stable").T.copy()
+
+
+class Recommender:
+    """Immutable query engine over one ScoreMatrix snapshot."""
+
+    def __init__(self, sm: ScoreMatrix, order: Optional[np.ndarray] = None):
+        self.sm = sm
+        values = sm.values
+        M, S = values.shape
+        self._m = M
+        self._words = max(1, (M + 63) // 64)
+
+        # Per-subfeature sorted index; NaN (missing) sorts last and is cut off by n_valid.
+        # `order` is column_order(sm) computed elsewhere (services.snapshot maps it).
+        self._order = column_order(sm) if order is None else order  # [S, M]
+        sorted_vals = np.take_along_axis(values, self._order.T, axis=0).T  # [S, M]
+        n_valid = (~np.isnan(values)).sum(axis=0).tolist()
+
+        # Run-length view of each sorted column as plain lists (bisect needs no
+        # numpy call): distinct values and the sorted position where each starts,
+        # with n_valid appended.
+        # For low-cardinality columns (scores are mostly 0/1/2) also keep
+        # suffix bitsets: _suffix[j][d] = models whose value >= distinct[d],
+        # plus an all-zero row at the end, so any value range is two rows.
+        self._distinct: List[List[float]] = []
+        self._starts: List[List[int]] = []
+        self._suffix: List[Optional[np.ndarray]] = []
+        for j in range(S):
+            n = n_valid[j]
+            col = sorted_vals[j, :n]
+            first = np.flatnonzero(np.r_[True, col[1:] != col[:-1]]) if n else np.zeros(0, dtype=np.int64)
+            starts = first.tolist() + [n]
+            self._distinct.append(col[first].tolist())
+            self._starts.append(starts)
+
+            if len(first) <= MAX_BITMAP_DISTINCT:
+                suffix = np.zeros((len(starts), self._words), dtype=np.uint64)
+                mask = np.zeros(M, dtype=bool)
+                for d in range(len(first) - 1, -1, -1):
+                    mask[self._order[j, starts[d]:starts[d + 1]]] = True
+                    suffix[d] = _pack(mask, self._words)
+                self._suffix.append(suffix)
+            else:
+                self._suffix.append(None)
+
+        self.avgs, self.counts = sm.category_stats()
+        self.overall = sm.overall(self.avgs, self.counts)
+
+        # "category.sub" -> column
+        self._keys = {f"{cat}.{sub}": j for (cat, sub), j in sm.sub_index.items()}
+
+    def column(self, key: str) -> int:
+        try:
+            return self._keys[key]
+        except KeyError:
+            raise ValueError(f"Unknown subfeature '{key}' (expected 'category.subfeature')")
+
+    def _ranges(self, j: int, op: str, x: float) -> List[Tuple[int, int]]:
+        """Half-open ranges of distinct-value ranks in column j satisfying `op x`."""
+        distinct = self._distinct[j]
+        D = len(distinct)
+        left, right = bisect_left(distinct, x), bisect_right(distinct, x)
+        if op == ">=":
+            return [(left, D)]
+        if op == ">":
+            return [(right, D)]
+        if op == "<=":
+            return [(0, right)]
+        if op == "<":
+            return [(0, left)]
+        if op == "==":
+            return [(left, right)]
+        return [(0, left), (right, D)]  # "!="
+
+    def _packed(self, j: int, op: str, x: float) -> np.ndarray:
+        """uint64 bitset of models whose column j value satisfies `op x`."""
+        ranges = self._ranges(j, op, x)
+        suffix = self._suffix[j]
+        if suffix is not None:
+            D = len(suffix) - 1
+            parts = [suffix[d0] if d1 == D else suffix[d0] & ~suffix[d1] for d0, d1 in ranges if d0 < d1]
+            if not parts:
+                return np.zeros(self._words, dtype=np.uint64)
+            return parts[0] if len(parts) == 1 else parts[0] | parts[1]
+        starts, order = self._starts[j], self._order[j]
+        mask = np.zeros(self._m, dtype=bool)
+        for d0, d1 in ranges:
+            mask[order[starts[d0]:starts[d1]]] = True
+        return _pack(mask, self._words)
+
+    def bitmap(self, key: str, op: str, x: float) -> np.ndarray:
+        """Boolean [M] mask of models whose `key` value satisfies `op x`."""
+        bits = self._packed(self.column(key), op, x)
+        return np.unpackbits(bits.view(np.uint8), count=self._m, bitorder="little").astype(bool)
+
+    def filter(self, constraints: Dict[str, Any]) -> np.ndarray:
+        """
+        Indices of models matching every constraint (ascending).
+
+        Constraints are ordered by exact match count (a bisect over the
+        column's distinct values) and AND-ed as packed bitsets, stopping as
+        soon as the intersection is empty.
+        """
+        plan = []
+        for key, raw in constraints.items():
+            op, x = parse_constraint(raw)
+            j = self.column(key)
+            starts = self._starts[j]
+            size = sum(starts[d1] - starts[d0] for d0, d1 in self._ranges(j, op, x))
+            plan.append((size, j, op, x))
+        if not plan:
+            return np.arange(self._m)
+        plan.sort(key=lambda p: p[0])
+        if plan[0][0] == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        bits = self._packed(plan[0][1], plan[0][2], plan[0][3]).copy()
+        for _, j, op, x in plan[1:]:
+            np.bitwise_and(bits, self._packed(j, op, x), out=bits)
+            if not bits.any():
+                return np.zeros(0, dtype=np.int64)
+        mask = np.unpackbits(bits.view(np.uint8), count=self._m, bitorder="little")
+        return np.flatnonzero(mask)
+
+    def _scores_for(self, idx: np.ndarray, weights: Optional[Dict[str, float]]) -> np.ndarray:
+        if not weights:
+            return self.overall[idx]
+        w = self.sm.weights[idx].copy()
+        for cat, val in validate_weights(weights, self.sm.category_index).items():
+            w[:, self.sm.category_index[cat]] = val
+        return self.sm.overall(self.avgs[idx], self.counts[idx], weights=w)
+
+    def recommend(self,
+                  constraints: Dict[str, Any],
+                  k: int = 10,
+                  weights: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """
+        Returns:
+        {
+          "matched": <number of models satisfying all constraints>,
+          "results": [ {"model": str, "score": float, "features": {key: value}} , ... ]  # best first
+        }
+        `weights` overrides ModelCategory.weight per category for ranking only
+        (checked like profile weights: known categories, finite, >= 0, not all 0).
+        """
+        if k <= 0:
+            raise ValueError("k must be positive")
+        parsed_keys = list(constraints.keys())
+        idx = self.filter(constraints)
+        matched = int(len(idx))
+        scores = self._scores_for(idx, weights)
+
+        # Trim to the k-th best score (keeping ties) before the heap, so the
+        # heap only ever sees ~k entries even when thousands of models match
+        if len(idx) > 4 * k:
+            kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+            keep = scores >= kth
+            idx, scores = idx[keep], scores[keep]
+
+        # Ties broken by model order (insertion order in the DB)
+        top = heapq.nlargest(k, zip(scores.tolist(), (-idx).tolist()))
+
+        cols = [self.column(key) for key in parsed_keys]
+        results: List[Dict[str, Any]] = []
+        for score, neg_i in top:
+            i = -neg_i
+            results.append({
+                "model": self.sm.models[i],
+                "score": score,
+                "features": {key: float(self.sm.values[i, j]) for key, j in zip(parsed_keys, cols)},
+            })
+        return {"matched": matched, "results": results}
+
+
+# -----------------------------------------------------------------------------
+# Process-wide engine (rebuilt lazily when the dataset version changes)
+# -----------------------------------------------------------------------------
+_engine: Optional[Tuple[int, Recommender]] = None  # (data version it was built at, engine)
+_lock = threading.Lock()
+
+
+def get_recommender(session) -> Recommender:
+    """The engine of the current dataset version; writes from any process are seen (services.data_version)."""
+    global _engine
+    version = data_version()
+    cached = _engine
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _lock:
+        if _engine is None or _engine[0] != version:
+            _engine = (version, Recommender(build_score_matrix(session)))
+        return _engine[1]
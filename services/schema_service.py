@@ -2,10 +2,23 @@
 """
 Utilities to fetch the canonical ABUS scoring schema from the DB:
 { category_name: { subfeature_name: {} } }
+
+- get_schema_from_db(): uncached load, one Category ⟕ Subcategory query
+- get_schema():         process-wide cached copy (SchemaCache) with a version
+                        counter; writers call mark_schema_changed(session) and
+                        the cache is invalidated when that session commits.
+                        Changes made by other processes (e.g. the seeder) are
+                        picked up by a cheap max-id check every ABUS_SCHEMA_TTL
+                        seconds (default 5).
 """
 
 from __future__ import annotations
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+import os
+import threading
+import time
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session as OrmSession
 from sqlmodel import select
 from api.db_models import Category, Subcategory
 from api.db import get_session
@@ -20,12 +33,84 @@ def get_schema_from_db() -> Dict[str, Dict[str, Any]]:
     """
     out: Dict[str, Dict[str, Any]] = {}
     with get_session() as s:
-        cats = s.exec(select(Category)).all()
-        for c in cats:
-            out[c.name] = {}
-        subs = s.exec(select(Subcategory)).all()
-        for sub in subs:
-            cat = s.get(Category, sub.category_id)
-            out.setdefault(cat.name, {})
-            out[cat.name][sub.name] = {}
+        rows = s.exec(
+            select(Category.name, Subcategory.name)
+            .select_from(Category)
+            .outerjoin(Subcategory, Subcategory.category_id == Category.id)
+            .order_by(Category.id, Subcategory.id)
+        ).all()
+    for cat_name, sub_name in rows:
+        subs = out.setdefault(cat_name, {})
+        if sub_name is not None:
+            subs[sub_name] = {}
     return out
+
+
+def _db_fingerprint() -> Tuple[Optional[int], Optional[int]]:
+    """(max category id, max subcategory id): changes whenever rows are added."""
+    with get_session() as s:
+        return tuple(s.exec(select(
+            select(func.max(Category.id)).scalar_subquery(),
+            select(func.max(Subcategory.id)).scalar_subquery(),
+        )).one())
+
+
+class SchemaCache:
+    """
+    Cached schema plus a monotonically increasing `version` that bumps on
+    every invalidation. Treat the returned dict as read-only.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = float(os.getenv("ABUS_SCHEMA_TTL", "5")) if ttl is None else ttl
+        self.version = 0
+        self._schema: Optional[Dict[str, Dict[str, Any]]] = None
+        self._fingerprint = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._schema = None
+            self.version += 1
+
+    def get(self) -> Dict[str, Dict[str, Any]]:
+        schema = self._schema
+        if schema is not None and (self.ttl < 0 or time.monotonic() - self._checked < self.ttl):
+            return schema
+        with self._lock:
+            if self._schema is not None and self.ttl >= 0 and time.monotonic() - self._checked >= self.ttl:
+                # Out-of-process writers: compare a cheap fingerprint instead of reloading
+                if _db_fingerprint() != self._fingerprint:
+                    self._schema = None
+                    self.version += 1
+                self._checked = time.monotonic()
+            if self._schema is None:
+                self._fingerprint = _db_fingerprint()
+                self._schema = get_schema_from_db()
+                self._checked = time.monotonic()
+            return self._schema
+
+
+schema_cache = SchemaCache()
+
+
+def get_schema() -> Dict[str, Dict[str, Any]]:
+    """Cached schema (see SchemaCache)."""
+    return schema_cache.get()
+
+
+def mark_schema_changed(session) -> None:
+    """Flag that `session` created categories/subcategories; the cache is dropped on commit."""
+    session.info["abus_schema_changed"] = True
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_on_commit(session) -> None:
+    if session.info.pop("abus_schema_changed", False):
+        schema_cache.invalidate()
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _clear_on_rollback(session) -> None:
+    session.info.pop("abus_schema_changed", None)
@@ -0,0 +1,269 @@
+# services/score_cache.py
+"""
+Persistent, content-addressed cache of provider scoring results.
+
+One entry per (paper, provider, subfeature):
+    key = sha256(sha256(paper_text) | provider.identity() | category | subfeature | schema[category][subfeature])
+    value = {"score": 0|1|2, "note": "..."}
+
+so re-ingesting a paper costs no provider calls, and when the taxonomy grows
+only the new subfeatures are scored. A text given as chunks (a list, a
+re-readable file) hashes the same as the joined string. Entries live in a small SQLite file with
+LRU eviction by entry count and/or total bytes; hit/miss counters are kept
+per ScoreCache instance (see stats()).
+
+Config: ABUS_SCORE_CACHE = path to the SQLite file (default
+./.abus_cache/scores.sqlite), or "off" to disable the default cache.
+"""
+
+from __future__ import annotations
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from services.llm_providers import LLMProvider
+
+Key = Tuple[str, str]  # (category, subfeature)
+
+DEFAULT_PATH = os.path.join(".abus_cache", "scores.sqlite")
+
+
+def _canonical(obj: Any) -> str:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def text_digest(paper_text: Union[str, Iterable[str]]) -> str:
+    """sha256 of the UTF-8 text; an iterable of chunks hashes like their concatenation."""
+    h = hashlib.sha256()
+    for chunk in ([paper_text] if isinstance(paper_text, str) else paper_text):
+        h.update(chunk.encode("utf-8", errors="surrogatepass"))
+    return h.hexdigest()
+
+
+class ScoreCache:
+    def __init__(self, path: str = DEFAULT_PATH,
+                 max_entries: Optional[int] = 200_000,
+                 max_bytes: Optional[int] = 256 * 1024 * 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    # Picklable for process pools: the connection is reopened lazily
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_last_used ON entries (last_used)")
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # -------------------------------------------------------------------------
+    # Keys
+    # -------------------------------------------------------------------------
+    def keys_for(self, provider: LLMProvider, paper_text: Union[str, Iterable[str], None],
+                 schema: Dict[str, Any], digest: Optional[str] = None) -> Dict[Key, str]:
+        """`digest` (text_digest of the paper) replaces reading `paper_text` when already known."""
+        base = (digest or text_digest(paper_text)) + "|" + _canonical(provider.identity())
+        return {
+            (cat, sub): hashlib.sha256(f"{base}|{_canonical([cat, sub, spec])}".encode()).hexdigest()
+            for cat, subdict in schema.items()
+            for sub, spec in subdict.items()
+        }
+
+    # -------------------------------------------------------------------------
+    # Raw get/put
+    # -------------------------------------------------------------------------
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        if not keys:
+            return {}
+        found: Dict[str, Any] = {}
+        with self._lock:
+            db = self._db()
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                for k, v in db.execute(f"SELECT key, value FROM entries WHERE key IN ({marks})", chunk):
+                    found[k] = json.loads(v)
+            if found:
+                now = time.time()
+                db.executemany("UPDATE entries SET last_used = ? WHERE key = ?", [(now, k) for k in found])
+                db.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, Any]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for k, v in items.items():
+            blob = _canonical(v)
+            rows.append((k, blob, len(blob), now))
+        with self._lock:
+            db = self._db()
+            db.executemany("INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)", rows)
+            self.stores += len(rows)
+            self._evict(db)
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        """Drop least recently used entries down to 90% of the configured limits."""
+        count, total = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        over_n = self.max_entries is not None and count > self.max_entries
+        over_b = self.max_bytes is not None and total > self.max_bytes
+        if not (over_n or over_b):
+            return
+        target_n = int(self.max_entries * 0.9) if self.max_entries is not None else count
+        target_b = int(self.max_bytes * 0.9) if self.max_bytes is not None else total
+        doomed: List[str] = []
+        for key, size in db.execute("SELECT key, size FROM entries ORDER BY last_used ASC"):
+            if count <= target_n and total <= target_b:
+                break
+            doomed.append(key)
+            count -= 1
+            total -= size
+        db.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in doomed])
+        self.evictions += len(doomed)
+
+    # -------------------------------------------------------------------------
+    # Scoring helpers
+    # -------------------------------------------------------------------------
+    def lookup(self, provider: LLMProvider, paper_text: Union[str, Iterable[str]], schema: Dict[str, Any]):
+        """
+        `paper_text` is a string or a re-iterable of chunks (it is read once here).
+        Returns (cached, missing_schema, keys):
+          cached         {cat: {sub: {"score", "note"}}} for subfeatures already known
+          missing_schema the part of `schema` that still has to be scored
+          keys           {(cat, sub): cache key}, to pass to store()
+        """
+        keys = self.keys_for(provider, paper_text, schema)
+        found = self.get_many(list(keys.values()))
+        cached: Dict[str, Dict[str, Any]] = {}
+        missing: Dict[str, Dict[str, Any]] = {}
+        for (cat, sub), key in keys.items():
+            if key in found:
+                cached.setdefault(cat, {})[sub] = found[key]
+            else:
+                missing.setdefault(cat, {})[sub] = schema[cat][sub]
+        return cached, missing, keys
+
+    def store(self, keys: Dict[Key, str], scored: Dict[str, Dict[str, Any]]) -> None:
+        self.put_many({
+            keys[(cat, sub)]: val
+            for cat, subs in scored.items()
+            for sub, val in subs.items()
+            if (cat, sub) in keys
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total = self._db().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": count,
+            "bytes": total,
+        }
+
+
+def merge_scored(schema: Dict[str, Any], *parts: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Combine cached and freshly scored parts back into schema order."""
+    out: Dict[str, Dict[str, Any]] = {}
+    for cat, subdict in schema.items():
+        out[cat] = {}
+        for sub in subdict.keys():
+            for part in parts:
+                if sub in part.get(cat, {}):
+                    out[cat][sub] = part[cat][sub]
+                    break
+    return out
+
+
+class CachedProvider(LLMProvider):
+    """Wraps a provider so only subfeatures missing from `cache` are scored."""
+
+    def __init__(self, provider: LLMProvider, cache: ScoreCache):
+        self.provider = provider
+        self.cache = cache
+
+    def identity(self) -> Dict[str, Any]:
+        return self.provider.identity()
+
+    def score(self, paper_text: str, schema: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        cached, missing, keys = self.cache.lookup(self.provider, paper_text, schema)
+        fresh = self.provider.score(paper_text, missing) if missing else {}
+        self.cache.store(keys, fresh)
+        return merge_scored(schema, cached, fresh)
+
+    def score_chunks(self, chunks: Iterable[str], schema: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        if iter(chunks) is not chunks:
+            # re-iterable (a list, a text file): hash it, then score only what is missing
+            cached, missing, keys = self.cache.lookup(self.provider, chunks, schema)
+            fresh = self.provider.score_chunks(chunks, missing) if missing else {}
+            self.cache.store(keys, fresh)
+            return merge_scored(schema, cached, fresh)
+        # a one-shot stream: score everything while hashing, so the next run of this text hits
+        hasher = hashlib.sha256()
+
+        def hashed():
+            for chunk in chunks:
+                hasher.update(chunk.encode("utf-8", errors="surrogatepass"))
+                yield chunk
+        stream = hashed()
+        fresh = self.provider.score_chunks(stream, schema)
+        for _ in stream:  # providers may stop reading early (prompt length caps)
+            pass
+        self.cache.store(self.cache.keys_for(self.provider, None, schema, digest=hasher.hexdigest()), fresh)
+        return fresh
+
+
+_default_cache: Optional[ScoreCache] = None
+_default_lock = threading.Lock()
+
+
+def default_score_cache() -> Optional[ScoreCache]:
+    """Process-wide cache from ABUS_SCORE_CACHE (None if set to "off")."""
+    global _default_cache
+    path = os.getenv("ABUS_SCORE_CACHE", DEFAULT_PATH)
+    if path.lower() in ("off", "0", "false", "none", ""):
+        return None
+    with _default_lock:
+        if _default_cache is None or _default_cache.path != path:
+            _default_cache = ScoreCache(path)
+        return _default_cache
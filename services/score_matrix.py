@@ -0,0 +1,136 @@
+# services/score_matrix.py
+"""
+Dense in-memory view of the Score table for batch scoring:
+- values:     models × subcategories (NaN where a model has no score)
+- membership: subcategories × categories one-hot index
+- weights:    models × categories (ModelCategory.weight, 0 if missing)
+
+build_score_matrix(session) loads everything with a handful of flat column
+queries (no per-row lookups); ScoreMatrix.category_stats() / overall()
+reproduce compute_model_scores() for every model at once.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Tuple
+import numpy as np
+from sqlmodel import select
+from api.db_models import Model, Category, Subcategory, Score, ModelCategory
+
+
+def _rowsum(a: np.ndarray) -> np.ndarray:
+    """
+    Sum over the (short) category axis of an [M, C] array.
+    Reducing the transposed copy adds whole columns one after another, which is
+    several times faster than a per-row reduction over C ~ 5 and keeps
+    Python's left-to-right summation order.
+    """
+    return np.ascontiguousarray(a.T).sum(axis=0)
+
+
+@dataclass
+class ScoreMatrix:
+    models: List[str]
+    categories: List[str]
+    subcategories: List[Tuple[str, str]]  # (category_name, sub_name)
+    values: np.ndarray                    # float64 [M, S], NaN = missing (read-only float32 when mapped from a snapshot)
+    membership: np.ndarray                # float64 [S, C], one-hot
+    weights: np.ndarray                   # float64 [M, C]
+    model_index: Dict[str, int] = field(default_factory=dict)
+    category_index: Dict[str, int] = field(default_factory=dict)
+    sub_index: Dict[Tuple[str, str], int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.model_index = {n: i for i, n in enumerate(self.models)}
+        self.category_index = {n: j for j, n in enumerate(self.categories)}
+        self.sub_index = {k: j for j, k in enumerate(self.subcategories)}
+
+    @property
+    def sub_category(self) -> np.ndarray:
+        """[S] category index of each subcategory column."""
+        return self.membership.argmax(axis=1) if self.membership.size else np.zeros(0, dtype=np.int64)
+
+    def category_stats(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (avgs, counts), both [M, C]. avg is 0 where count is 0,
+        matching compute_model_scores' empty-category convention.
+        """
+        present = ~np.isnan(self.values)
+        filled = np.where(present, self.values, 0.0)
+        sums = filled @ self.membership
+        counts = present.astype(np.float64) @ self.membership
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avgs = np.where(counts > 0, sums / counts, 0.0)
+        return avgs, counts
+
+    def overall(self, avgs: np.ndarray, counts: np.ndarray, weights: np.ndarray | None = None) -> np.ndarray:
+        """
+        Weighted overall score per model ([M]).
+        Only categories the model has scores in take part (as in get_model_full);
+        if their weights sum to <= 0, fall back to equal weights over them.
+        `weights` may be [M, C] or a single [C] profile broadcast to all models.
+        """
+        active = counts > 0
+        w = np.where(active, self.weights if weights is None else weights, 0.0)
+        total = _rowsum(w)
+        n_active = _rowsum(active.astype(np.float64))
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weighted = _rowsum(avgs * (w / total[:, None]))
+            equal = _rowsum(avgs * (1.0 / n_active)[:, None])
+        return np.where(total > 0, weighted, np.where(n_active > 0, equal, 0.0))
+
+    def to_results(self, avgs: np.ndarray, counts: np.ndarray, overall: np.ndarray) -> List[Dict[str, Any]]:
+        """Per-model dicts in compute_model_scores() shape."""
+        out: List[Dict[str, Any]] = []
+        for i, name in enumerate(self.models):
+            cats = {}
+            for j in np.flatnonzero(counts[i] > 0):
+                cats[self.categories[j]] = {
+                    "weight": float(self.weights[i, j]),
+                    "avg": float(avgs[i, j]),
+                    "count": int(counts[i, j]),
+                }
+            out.append({"model": name, "categories": cats, "overall": float(overall[i])})
+        return out
+
+
+def build_score_matrix(session) -> ScoreMatrix:
+    """Load the whole Score table into a ScoreMatrix with constant query count."""
+    model_rows = session.exec(select(Model.id, Model.name).order_by(Model.id)).all()
+    cat_rows = session.exec(select(Category.id, Category.name).order_by(Category.id)).all()
+    sub_rows = session.exec(
+        select(Subcategory.id, Subcategory.name, Subcategory.category_id).order_by(Subcategory.id)
+    ).all()
+    score_rows = session.exec(select(Score.model_id, Score.subcategory_id, Score.value)).all()
+    weight_rows = session.exec(
+        select(ModelCategory.model_id, ModelCategory.category_id, ModelCategory.weight)
+    ).all()
+
+    model_pos = {mid: i for i, (mid, _) in enumerate(model_rows)}
+    cat_pos = {cid: j for j, (cid, _) in enumerate(cat_rows)}
+    sub_pos = {sid: k for k, (sid, _, _) in enumerate(sub_rows)}
+    cat_names = [name for _, name in cat_rows]
+
+    M, C, S = len(model_rows), len(cat_rows), len(sub_rows)
+    values = np.full((M, S), np.nan)
+    membership = np.zeros((S, C))
+    weights = np.zeros((M, C))
+
+    if S:
+        membership[np.arange(S), [cat_pos[cid] for _, _, cid in sub_rows]] = 1.0
+    if score_rows:
+        r, c, v = zip(*score_rows)
+        values[[model_pos[x] for x in r], [sub_pos[x] for x in c]] = v
+    if weight_rows:
+        r, c, v = zip(*weight_rows)
+        weights[[model_pos[x] for x in r], [cat_pos[x] for x in c]] = [float(x or 0.0) for x in v]
+
+    return ScoreMatrix(
+        models=[name for _, name in model_rows],
+        categories=cat_names,
+        subcategories=[(cat_names[cat_pos[cid]], name) for _, name, cid in sub_rows],
+        values=values,
+        membership=membership,
+        weights=weights,
+    )
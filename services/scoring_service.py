@@ -1,14 +1,27 @@
 """
 Domain services for ABUS:
+- load_models_full(session, names) -> {model: nested dict} for many models in one query
 - get_model_full(session, model_name) -> nested dict with weights, scores, notes
+- get_model_scores(session, model_name) -> {category: {subcategory: score}}
 - compute_model_scores(session, model_name) -> per-category + overall score
+- compute_all_scores(session) -> compute_model_scores for every model, via ScoreMatrix
 - upsert_model_from_payload(session, payload) -> create/update a full model entry
+- upsert_models_from_payloads(session, payloads) -> batch upsert with per-model errors
+- write_model_rows(session, weight_rows, score_rows) -> set-based write shared with the seeder
+  (also maintains the materialized scores and the score history, see
+  services.materialized_scores / services.history_service)
 """
 
 from __future__ import annotations
-from typing import Dict, Any, Tuple
+import math
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, bindparam, insert as sa_insert, select as sa_select, update as sa_update
+from sqlalchemy.exc import SQLAlchemyError
 from sqlmodel import select
 from api.db_models import Model, Category, Subcategory, Score, ModelCategory
+from services.score_matrix import build_score_matrix
+from services.data_version import mark_data_changed
+from services.schema_service import mark_schema_changed
 
 
 def _get_model(session, name: str) -> Model:
@@ -18,6 +31,58 @@ def _get_model(session, name: str) -> Model:
     return m
 
 
+def _full_rows_stmt():
+    """
+    One joined query: Score ⋈ Model ⋈ Subcategory ⋈ Category ⟕ ModelCategory.
+    Yields (model_name, category_name, sub_name, value, note, weight) rows in
+    insertion order, so nested dicts come out in the same order as before.
+    """
+    return (
+        select(Model.name, Category.name, Subcategory.name, Score.value, Score.note, ModelCategory.weight)
+        .select_from(Score)
+        .join(Model, Model.id == Score.model_id)
+        .join(Subcategory, Subcategory.id == Score.subcategory_id)
+        .join(Category, Category.id == Subcategory.category_id)
+        .outerjoin(
+            ModelCategory,
+            and_(ModelCategory.model_id == Score.model_id, ModelCategory.category_id == Category.id),
+        )
+        .order_by(Score.model_id, Score.id)
+    )
+
+
+def _models_full_stmt(model_names: Optional[Iterable[str]]):
+    """_full_rows_stmt() restricted to `model_names` (None = all); None if the list is empty."""
+    stmt = _full_rows_stmt()
+    if model_names is not None:
+        names = list(model_names)
+        if not names:
+            return None
+        stmt = stmt.where(Model.name.in_(names))
+    return stmt
+
+
+def _assemble_full(rows) -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    for model_name, cat_name, sub_name, value, note, weight in rows:
+        blob = out.setdefault(model_name, {})
+        if cat_name not in blob:
+            blob[cat_name] = {"weight": float(weight or 0.0), "subfeatures": {}}
+        blob[cat_name]["subfeatures"][sub_name] = {"score": float(value), "note": note}
+    return out
+
+
+def load_models_full(session, model_names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Shared read path for one, many or all models (model_names=None).
+    Returns { model_name: <get_model_full shape> } using a single joined query,
+    independent of the number of categories/subfeatures.
+    Unknown names are silently skipped; models without scores map to {}.
+    """
+    stmt = _models_full_stmt(model_names)
+    return _assemble_full(session.exec(stmt).all()) if stmt is not None else {}
+
+
 def get_model_full(session, model_name: str) -> Dict[str, Any]:
     """
     Returns:
@@ -31,23 +96,21 @@ def get_model_full(session, model_name: str) -> Dict[str, Any]:
       ...
     }
     """
-    m = _get_model(session, model_name)
-
-    # Load weights per category for this model
-    weights = {}
-    for mc in session.exec(select(ModelCategory).where(ModelCategory.model_id == m.id)).all():
-        weights[mc.category_id] = mc.weight
-
-    # Build nested
-    out: Dict[str, Any] = {}
-    scores = session.exec(select(Score).where(Score.model_id == m.id)).all()
-    for sc in scores:
-        sub = session.get(Subcategory, sc.subcategory_id)
-        cat = session.get(Category, sub.category_id)
-        if cat.name not in out:
-            out[cat.name] = {"weight": float(weights.get(cat.id, 0.0)), "subfeatures": {}}
-        out[cat.name]["subfeatures"][sub.name] = {"score": float(sc.value), "note": sc.note}
-    return out
+    full = load_models_full(session, [model_name])
+    if model_name in full:
+        return full[model_name]
+    # No score rows: distinguish "unknown model" from "model without scores"
+    _get_model(session, model_name)
+    return {}
+
+
+def get_model_scores(session, model_name: str) -> Dict[str, Dict[str, float]]:
+    """Compact shape used by GET /api/models/{name}: {category: {subcategory: score}}."""
+    full = get_model_full(session, model_name)
+    return {
+        cat: {sub: blob["score"] for sub, blob in cat_blob["subfeatures"].items()}
+        for cat, cat_blob in full.items()
+    }
 
 
 def compute_model_scores(session, model_name: str) -> Dict[str, Any]:
@@ -66,18 +129,31 @@ def compute_model_scores(session, model_name: str) -> Dict[str, Any]:
       "overall": float
     }
     """
-    full = get_model_full(session, model_name)
+    return score_from_full(model_name, get_model_full(session, model_name))
+
 
-    cat_avgs: Dict[str, Tuple[float, int]] = {}
+def score_from_full(model_name: str, full: Dict[str, Any]) -> Dict[str, Any]:
+    """Pure aggregation over a get_model_full() dict; see compute_model_scores."""
+    stats: List[CategoryStat] = []
     for cat, blob in full.items():
         subs = blob.get("subfeatures", {})
         vals = [x.get("score") for x in subs.values() if isinstance(x.get("score"), (int, float))]
-        if vals:
-            avg = sum(vals) / len(vals)
-            cat_avgs[cat] = (avg, len(vals))
+        stats.append((cat, float(blob["weight"]), sum(vals) / len(vals) if vals else None, len(vals)))
+    return score_from_category_stats(model_name, stats)
+
 
-    cats = list(full.keys())
-    weights = [float(full[c]["weight"]) for c in cats]
+# (category, weight, avg or None if no scores, count)
+CategoryStat = Tuple[str, float, Optional[float], int]
+
+
+def score_from_category_stats(model_name: str, stats: List[CategoryStat]) -> Dict[str, Any]:
+    """
+    compute_model_scores() from per-category aggregates, so precomputed
+    sums/counts (see services.materialized_scores) give the same numbers.
+    """
+    cat_avgs: Dict[str, Tuple[float, int]] = {c: (avg, n) for c, _, avg, n in stats if avg is not None}
+    cats = [c for c, _, _, _ in stats]
+    weights = [w for _, w, _, _ in stats]
     total_weight = sum(weights)
 
     # If weights are all zero/missing, fall back to equal weights over categories that have scores
@@ -97,8 +173,7 @@ def compute_model_scores(session, model_name: str) -> Dict[str, Any]:
 
     # Detailed category block
     categories_out = {}
-    for c in cats:
-        w = float(full[c]["weight"])
+    for c, w in zip(cats, weights):
         if c in cat_avgs:
             avg, cnt = cat_avgs[c]
             categories_out[c] = {"weight": w, "avg": avg, "count": cnt}
@@ -108,81 +183,213 @@ def compute_model_scores(session, model_name: str) -> Dict[str, Any]:
     return {"model": model_name, "categories": categories_out, "overall": overall}
 
 
-def upsert_model_from_payload(session, payload: Dict[str, Any]) -> str:
+def compute_all_scores(session) -> List[Dict[str, Any]]:
     """
-    Accepts payload like:
-    {
-      "name": "MULAN",
-      "categories": {
-        "adaptability": {
-          "weight": 20,
-          "subfeatures": {
-            "transferability": {"score": 2, "note": "..."},
-            ...
-          }
-        },
-        ...
-      }
-    }
-    Creates/updates the model, its weights, and subfeature scores/notes.
-    Returns the model name.
+    Same result as compute_model_scores() for every model, computed with a
+    few matrix operations over a ScoreMatrix. Sorted by overall, descending.
+    """
+    sm = build_score_matrix(session)
+    avgs, counts = sm.category_stats()
+    overall = sm.overall(avgs, counts)
+    results = sm.to_results(avgs, counts, overall)
+    results.sort(key=lambda r: (-r["overall"], r["model"]))
+    return results
+
+
+# -----------------------------------------------------------------------------
+# Writes
+# -----------------------------------------------------------------------------
+BATCH_SIZE = 5000
+IN_CHUNK = 500  # names per IN (...) list; keeps well under SQLite's variable limit
+
+WeightRow = Tuple[str, str, Optional[float]]                 # (model, category, weight | None)
+ScoreRow = Tuple[str, str, str, float, Optional[str]]        # (model, category, sub, score, note)
+
+
+def _chunks(rows: List[Any], size: int) -> Iterable[List[Any]]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _upsert_stmt(session, table, keys: List[str], update_cols: List[str]):
+    """
+    Dialect-specific INSERT ... ON CONFLICT (keys) DO UPDATE/NOTHING, or None
+    when the backend has no native upsert (caller falls back to split insert/update).
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    stmt = dialect_insert(table)
+    if not update_cols:
+        return stmt.on_conflict_do_nothing(index_elements=keys)
+    return stmt.on_conflict_do_update(
+        index_elements=keys, set_={c: getattr(stmt.excluded, c) for c in update_cols}
+    )
+
+
+def _upsert_rows(session, table, rows: List[Dict[str, Any]], keys: List[str], update_cols: List[str]) -> None:
+    if not rows:
+        return
+    stmt = _upsert_stmt(session, table, keys, update_cols)
+    if stmt is not None:
+        for batch in _chunks(rows, BATCH_SIZE):
+            session.execute(stmt, batch)
+        return
+
+    # Generic fallback: SELECT existing keys, then executemany INSERT + UPDATE
+    key_cols = [table.c[k] for k in keys]
+    existing = set()
+    for batch in _chunks(sorted({r[keys[0]] for r in rows}), IN_CHUNK):
+        existing.update(tuple(r) for r in session.execute(sa_select(*key_cols).where(key_cols[0].in_(batch))))
+    new_rows = [r for r in rows if tuple(r[k] for k in keys) not in existing]
+    old_rows = [r for r in rows if tuple(r[k] for k in keys) in existing]
+    for batch in _chunks(new_rows, BATCH_SIZE):
+        session.execute(sa_insert(table), batch)
+    if update_cols and old_rows:
+        upd = (
+            sa_update(table)
+            .where(and_(*[table.c[k] == bindparam(f"b_{k}") for k in keys]))
+            .values({c: bindparam(f"b_{c}") for c in update_cols})
+        )
+        params = [{f"b_{c}": r[c] for c in keys + update_cols} for r in old_rows]
+        for batch in _chunks(params, BATCH_SIZE):
+            session.execute(upd, batch)
+
+
+def _resolve_names(session, table, names: List[str],
+                   extra: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, int], bool]:
+    """(name -> id for `names`, whether any were inserted); missing names are inserted with executemany."""
+    where = [table.c[k] == v for k, v in (extra or {}).items()]
+
+    def load(batch):
+        return session.execute(sa_select(table.c.name, table.c.id).where(table.c.name.in_(batch), *where)).all()
+
+    ids: Dict[str, int] = {}
+    for batch in _chunks(names, IN_CHUNK):
+        ids.update(load(batch))
+    missing = [n for n in names if n not in ids]
+    if missing:
+        for batch in _chunks(missing, BATCH_SIZE):
+            session.execute(sa_insert(table), [{"name": n, **(extra or {})} for n in batch])
+        for batch in _chunks(missing, IN_CHUNK):
+            ids.update(load(batch))
+    return ids, bool(missing)
+
+
+def write_model_rows(session,
+                     weight_rows: List[WeightRow],
+                     score_rows: List[ScoreRow],
+                     extra_models: Iterable[str] = ()) -> None:
+    """
+    Set-based write shared by the upsert endpoints and the seeder.
+    - models / categories: one SELECT per IN-chunk of names, executemany INSERT for missing ones
+    - subcategories: one SELECT for the touched categories, executemany INSERT for missing ones
+    - model_categories / scores: INSERT ... ON CONFLICT (SQLite/Postgres) via executemany
+    Same result as applying the rows one by one: later rows win, and a missing
+    weight creates the ModelCategory with 0.0 but never overwrites an existing one.
+    `extra_models` are created even if they have no rows (e.g. empty payloads).
+    The materialized scores of every touched model are kept in sync
+    (see services.materialized_scores) and changed values are appended to
+    the score history (services.history_service).
+    """
+    model_names = list(dict.fromkeys([*extra_models, *(r[0] for r in weight_rows), *(r[0] for r in score_rows)]))
+    cat_names = list(dict.fromkeys([r[1] for r in weight_rows] + [r[1] for r in score_rows]))
+    if not model_names:
+        return
+
+    mark_data_changed(session)
+    model_ids, _ = _resolve_names(session, Model.__table__, model_names)
+    cat_ids, new_cats = _resolve_names(session, Category.__table__, cat_names)
+    if new_cats:
+        mark_schema_changed(session)
+
+    st = Subcategory.__table__
+
+    def load_subs():
+        rows = session.execute(
+            sa_select(st.c.category_id, st.c.name, st.c.id).where(st.c.category_id.in_(list(cat_ids.values())))
+        ).all()
+        return {(cid, name): sid for cid, name, sid in rows}
+
+    wanted_subs = list(dict.fromkeys((cat_ids[c], sub) for _, c, sub, _, _ in score_rows))
+    sub_ids = load_subs() if wanted_subs else {}
+    missing = [k for k in wanted_subs if k not in sub_ids]
+    if missing:
+        for batch in _chunks(missing, BATCH_SIZE):
+            session.execute(sa_insert(st), [{"category_id": cid, "name": n} for cid, n in batch])
+        sub_ids = load_subs()
+        mark_schema_changed(session)
+
+    # Collapse duplicate keys (later rows win) so one statement never touches a row twice
+    with_w: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    without_w: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    for m, c, w in weight_rows:
+        key = (model_ids[m], cat_ids[c])
+        row = {"model_id": key[0], "category_id": key[1], "weight": float(w or 0.0)}
+        (with_w if w is not None else without_w)[key] = row
+    scores: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    for m, c, sub, v, note in score_rows:
+        key = (model_ids[m], sub_ids[(cat_ids[c], sub)])
+        scores[key] = {"model_id": key[0], "subcategory_id": key[1], "value": float(v), "note": note}
+
+    # Materialized scores and the score history are updated in the same transaction
+    # (imported here: they import this module)
+    from services.history_service import load_states, record_revision
+    from services.materialized_scores import apply_deltas, capture_deltas
+    touched = list(model_ids.values())
+    before = load_states(session, touched)
+    old_values = {(mid, sid): v for mid, (s, _) in before.items() for sid, (v, _) in s.items()}
+    done, deltas = capture_deltas(session, touched, scores, {sid: cid for (cid, _), sid in sub_ids.items()},
+                                  old=old_values)
+
+    mc_keys = ["model_id", "category_id"]
+    _upsert_rows(session, ModelCategory.__table__, list(with_w.values()), mc_keys, ["weight"])
+    _upsert_rows(session, ModelCategory.__table__, [r for k, r in without_w.items() if k not in with_w], mc_keys, [])
+    _upsert_rows(session, Score.__table__, list(scores.values()), ["model_id", "subcategory_id"], ["value", "note"])
+    apply_deltas(session, touched, done, deltas)
+
+    after = {mid: (dict(s), dict(w)) for mid, (s, w) in before.items()}
+    for (mid, sid), row in scores.items():
+        after[mid][0][sid] = (row["value"], row["note"])
+    for (mid, cid), row in without_w.items():
+        after[mid][1].setdefault(cid, 0.0)
+    for (mid, cid), row in with_w.items():
+        after[mid][1][cid] = row["weight"]
+    record_revision(session, before, after)
+
+
+def normalize_payload(payload: Dict[str, Any]) -> Tuple[str, List[WeightRow], List[ScoreRow]]:
+    """
+    Validate an upsert payload (see upsert_model_from_payload) and flatten it
+    into (name, weight_rows, score_rows). Raises ValueError on bad input.
     """
+    if not isinstance(payload, dict):
+        raise ValueError("payload must be an object")
     name = payload.get("name")
     if not name or not isinstance(name, str):
         raise ValueError("payload.name is required")
 
-    # Upsert model
-    m = session.exec(select(Model).where(Model.name == name)).first()
-    if not m:
-        m = Model(name=name)
-        session.add(m)
-        session.flush()
-
     categories = payload.get("categories", {})
     if not isinstance(categories, dict):
         raise ValueError("payload.categories must be an object")
 
-    # Helpers
-    def get_or_create_category(cat_name: str) -> Category:
-        c = session.exec(select(Category).where(Category.name == cat_name)).first()
-        if not c:
-            c = Category(name=cat_name)
-            session.add(c)
-            session.flush()
-        return c
-
-    def get_or_create_sub(category_id: int, sub_name: str) -> Subcategory:
-        sub = session.exec(
-            select(Subcategory).where(Subcategory.category_id == category_id, Subcategory.name == sub_name)
-        ).first()
-        if not sub:
-            sub = Subcategory(category_id=category_id, name=sub_name)
-            session.add(sub)
-            session.flush()
-        return sub
-
+    weight_rows: List[WeightRow] = []
+    score_rows: List[ScoreRow] = []
     for cat_name, cat_blob in categories.items():
-        c = get_or_create_category(cat_name)
-
-        # Upsert weight
         weight = None
         if isinstance(cat_blob, dict) and "weight" in cat_blob:
             try:
                 weight = float(cat_blob["weight"])
             except Exception:
                 weight = None
-        mc = session.exec(
-            select(ModelCategory).where(ModelCategory.model_id == m.id, ModelCategory.category_id == c.id)
-        ).first()
-        if not mc:
-            mc = ModelCategory(model_id=m.id, category_id=c.id, weight=float(weight or 0.0))
-            session.add(mc)
-        else:
-            if weight is not None:
-                mc.weight = float(weight)
-                session.add(mc)
+            if weight is not None and not math.isfinite(weight):
+                raise ValueError(f"Bad weight for {cat_name}: {cat_blob['weight']!r} (must be finite)")
+        weight_rows.append((name, cat_name, weight))
 
-        # Upsert subfeatures
         if isinstance(cat_blob, dict) and "subfeatures" in cat_blob and isinstance(cat_blob["subfeatures"], dict):
             subfeatures = cat_blob["subfeatures"]
         elif isinstance(cat_blob, dict):
@@ -194,23 +401,85 @@ def upsert_model_from_payload(session, payload: Dict[str, Any]) -> str:
         for sub_name, sub_val in subfeatures.items():
             # normalize to {score, note}
             if isinstance(sub_val, dict) and "score" in sub_val:
-                score = float(sub_val["score"])
+                try:
+                    score = float(sub_val["score"])
+                except (TypeError, ValueError):
+                    raise ValueError(f"Bad score for {cat_name}/{sub_name}: {sub_val['score']!r}")
                 note = sub_val.get("note")
             elif isinstance(sub_val, (int, float)):
                 score = float(sub_val)
                 note = None
             else:
                 raise ValueError(f"Bad subfeature shape for {cat_name}/{sub_name}")
+            if not math.isfinite(score):
+                raise ValueError(f"Bad score for {cat_name}/{sub_name}: {score!r} (must be finite)")
+            score_rows.append((name, cat_name, sub_name, score, note))
+    return name, weight_rows, score_rows
 
-            sub = get_or_create_sub(c.id, sub_name)
-            existing = session.exec(
-                select(Score).where(Score.model_id == m.id, Score.subcategory_id == sub.id)
-            ).first()
-            if existing:
-                existing.value = score
-                existing.note = note
-                session.add(existing)
-            else:
-                session.add(Score(model_id=m.id, subcategory_id=sub.id, value=score, note=note))
 
-    return m.name
+def upsert_model_from_payload(session, payload: Dict[str, Any]) -> str:
+    """
+    Accepts payload like:
+    {
+      "name": "MULAN",
+      "categories": {
+        "adaptability": {
+          "weight": 20,
+          "subfeatures": {
+            "transferability": {"score": 2, "note": "..."},
+            ...
+          }
+        },
+        ...
+      }
+    }
+    Creates/updates the model, its weights, and subfeature scores/notes.
+    Returns the model name.
+    """
+    name, weight_rows, score_rows = normalize_payload(payload)
+    write_model_rows(session, weight_rows, score_rows, extra_models=[name])
+    return name
+
+
+def upsert_models_from_payloads(session, payloads: List[Any]) -> Dict[str, Any]:
+    """
+    Batch form of upsert_model_from_payload, for use inside one transaction.
+    Payloads are validated individually; all valid ones are then written with
+    the set-based statements of write_model_rows. If that write fails, each
+    model is retried in its own savepoint so one bad row cannot sink the batch.
+
+    Returns {"ok": [names...], "errors": [{"index": i, "name": str | None, "error": str}, ...]}
+    """
+    errors: List[Dict[str, Any]] = []
+    valid: List[Tuple[int, str, List[WeightRow], List[ScoreRow]]] = []
+    for i, payload in enumerate(payloads):
+        try:
+            valid.append((i, *normalize_payload(payload)))
+        except ValueError as e:
+            name = payload.get("name") if isinstance(payload, dict) else None
+            errors.append({"index": i, "name": name if isinstance(name, str) else None, "error": str(e)})
+
+    def write(items):
+        write_model_rows(
+            session,
+            [r for _, _, w, _ in items for r in w],
+            [r for _, _, _, sc in items for r in sc],
+            extra_models=[n for _, n, _, _ in items],
+        )
+
+    ok: List[str] = []
+    try:
+        with session.begin_nested():
+            write(valid)
+        ok = [n for _, n, _, _ in valid]
+    except SQLAlchemyError:
+        for item in valid:
+            try:
+                with session.begin_nested():
+                    write([item])
+                ok.append(item[1])
+            except SQLAlchemyError as e:
+                errors.append({"index": item[0], "name": item[1], "error": str(e.orig if hasattr(e, "orig") else e)})
+
+    errors.sort(key=lambda e: e["index"])
+    return {"ok": ok, "errors": errors}
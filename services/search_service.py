@@ -0,0 +1,211 @@
+# services/search_service.py
+"""
+Full-text search over Score.note (the per-subfeature justifications).
+
+Index, kept in sync by the database itself so every writer (upsert
+endpoints, seeder, ingest CLI) is covered without code changes:
+- SQLite:   FTS5 table score_notes_fts (external content = scores, porter
+            stemming) maintained by AFTER INSERT/UPDATE/DELETE triggers on
+            scores; backfilled with 'rebuild' when first created
+- Postgres: GIN expression index on to_tsvector('english', note)
+- others:   no index; search falls back to a LIKE scan
+
+search_notes(session, q, limit, per_model, constraints) returns BM25-ranked
+hits (ts_rank_cd on Postgres) grouped by model and category, best model
+first (by its best hit), with highlighted snippets. `constraints` are the
+recommender's numeric filters ({"usability.code_availability": ">= 1"}),
+evaluated on the cached Recommender and applied to the hits.
+
+init_search_index(engine) is called from api.db.init_db().
+"""
+
+from __future__ import annotations
+from typing import Dict, Any, List, Optional
+import html
+import re
+from sqlalchemy import text
+from services.recommender import get_recommender
+
+FTS_TABLE = "score_notes_fts"
+MAX_LIMIT = 100
+SNIPPET_TOKENS = 12
+MIN_WINDOW = 200  # hits fetched per query at least (see search_notes)
+
+# Highlight markers used inside SQL (control characters never found in notes);
+# the snippet is HTML-escaped afterwards and they become <mark> tags.
+_OPEN, _CLOSE, _ELLIPSIS = "\x02", "\x03", "…"
+
+_SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"note, content='scores', content_rowid='id', tokenize='porter unicode61')",
+    f"CREATE TRIGGER IF NOT EXISTS scores_fts_ai AFTER INSERT ON scores BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, note) VALUES (new.id, new.note); END",
+    f"CREATE TRIGGER IF NOT EXISTS scores_fts_ad AFTER DELETE ON scores BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, note) VALUES ('delete', old.id, old.note); END",
+    f"CREATE TRIGGER IF NOT EXISTS scores_fts_au AFTER UPDATE OF note ON scores BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, note) VALUES ('delete', old.id, old.note); "
+    f"INSERT INTO {FTS_TABLE}(rowid, note) VALUES (new.id, new.note); END",
+]
+
+_PG_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_scores_note_tsv ON scores "
+    "USING GIN (to_tsvector('english', coalesce(note, '')))",
+]
+
+
+def init_search_index(engine) -> None:
+    """Create the note index (and its sync triggers) if missing; backfill a new SQLite index."""
+    dialect = engine.dialect.name
+    with engine.begin() as conn:
+        if dialect == "sqlite":
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :n"), {"n": FTS_TABLE}
+            ).first()
+            for stmt in _SQLITE_DDL:
+                conn.execute(text(stmt))
+            if not exists:
+                conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        elif dialect == "postgresql":
+            for stmt in _PG_DDL:
+                conn.execute(text(stmt))
+
+
+def rebuild_search_index(session) -> None:
+    """Re-derive the SQLite index from scores (repair); a no-op elsewhere."""
+    if session.get_bind().dialect.name == "sqlite":
+        session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+_TERM_RE = re.compile(r"\w+\*?", re.UNICODE)
+
+
+def fts5_query(q: str) -> str:
+    """
+    User text -> FTS5 query: every word must match (implicit AND), a trailing *
+    makes it a prefix. Words are quoted so FTS5 operators and punctuation in the
+    input can never cause syntax errors.
+    """
+    terms = []
+    for m in _TERM_RE.finditer(q):
+        word = m.group(0)
+        prefix = word.endswith("*")
+        word = word.rstrip("*")
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    if not terms:
+        raise ValueError("q must contain at least one word")
+    return " ".join(terms)
+
+
+def _highlight(snippet: Optional[str]) -> str:
+    """Escape the snippet for HTML and turn the SQL markers into <mark> tags."""
+    return html.escape(snippet or "").replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
+
+
+_COLS = """m.name AS model, c.name AS category, sub.name AS subfeature, s.value AS value"""
+_JOINS = """JOIN models m ON m.id = s.model_id
+            JOIN subcategories sub ON sub.id = s.subcategory_id
+            JOIN categories c ON c.id = sub.category_id"""
+
+
+def _hits(session, q: str, window: int):
+    """The `window` best (model, category, subfeature, value, relevance, snippet) rows, most relevant first."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = text(f"""
+            SELECT {_COLS}, -{FTS_TABLE}.rank AS relevance,
+                   snippet({FTS_TABLE}, 0, :open, :close, :ellipsis, {SNIPPET_TOKENS}) AS snippet
+            FROM {FTS_TABLE} JOIN scores s ON s.id = {FTS_TABLE}.rowid
+            {_JOINS}
+            WHERE {FTS_TABLE} MATCH :q
+            ORDER BY {FTS_TABLE}.rank
+            LIMIT :window
+        """)
+        # ORDER BY rank (= bm25) is answered by FTS5 itself, so snippets and joins only run for the window
+        params = {"q": fts5_query(q), "open": _OPEN, "close": _CLOSE, "ellipsis": _ELLIPSIS, "window": window}
+    elif dialect == "postgresql":
+        stmt = text(f"""
+            SELECT {_COLS},
+                   ts_rank_cd(to_tsvector('english', coalesce(s.note, '')), query) AS relevance,
+                   ts_headline('english', s.note, query,
+                               'StartSel=' || :open || ', StopSel=' || :close || ', MaxWords={SNIPPET_TOKENS * 2}, MinWords=5')
+                       AS snippet
+            FROM scores s {_JOINS}, websearch_to_tsquery('english', :q) AS query
+            WHERE to_tsvector('english', coalesce(s.note, '')) @@ query
+            ORDER BY relevance DESC, s.id
+            LIMIT :window
+        """)
+        params = {"q": q, "open": _OPEN, "close": _CLOSE, "window": window}
+    else:
+        # No full-text index: substring match on every word, no ranking beyond hit order
+        words = [w.rstrip("*") for w in _TERM_RE.findall(q)]
+        if not words:
+            raise ValueError("q must contain at least one word")
+        where = " AND ".join(f"lower(s.note) LIKE :w{i}" for i in range(len(words)))
+        stmt = text(f"SELECT {_COLS}, 1.0 AS relevance, s.note AS snippet FROM scores s {_JOINS} "
+                    f"WHERE {where} ORDER BY s.id LIMIT :window")
+        params = {f"w{i}": f"%{w.lower()}%" for i, w in enumerate(words)}
+        params["window"] = window
+    return session.execute(stmt, params)
+
+
+def search_notes(session,
+                 q: str,
+                 limit: int = 20,
+                 per_model: int = 5,
+                 constraints: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Returns:
+    {
+      "q": str,
+      "results": [
+        {"model": str, "relevance": float,                    # of the model's best hit
+         "categories": {category: [{"subfeature", "score", "relevance", "snippet"}, ...]}},
+        ...                                                   # best model first
+      ]
+    }
+    At most `limit` models with up to `per_model` of their best hits each; only
+    models matching `constraints` (recommender syntax) when given.
+    """
+    if not isinstance(q, str) or not q.strip():
+        raise ValueError("q is required")
+    if not 1 <= limit <= MAX_LIMIT or per_model < 1:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT} and per_model positive")
+    allowed = None
+    if constraints:
+        engine = get_recommender(session)
+        allowed = {engine.sm.models[i] for i in engine.filter(constraints).tolist()}
+
+    # Fetch the best `window` hits and widen it only while it holds fewer than `limit`
+    # models: a model's best hit is always found, its other hits within the window.
+    window = max(MIN_WINDOW, limit * per_model * 4)
+    while True:
+        rows = _hits(session, q.strip(), window).all()
+        results = _group(rows, limit, per_model, allowed)
+        if len(results) >= limit or len(rows) < window:
+            return {"q": q, "results": results}
+        window *= 4
+
+
+def _group(rows, limit: int, per_model: int, allowed) -> List[Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    hits: Dict[str, int] = {}
+    for model, category, subfeature, value, relevance, snippet in rows:
+        if allowed is not None and model not in allowed:
+            continue
+        entry = results.get(model)
+        if entry is None:
+            if len(results) >= limit:
+                continue
+            entry = results[model] = {"model": model, "relevance": float(relevance), "categories": {}}
+            hits[model] = 0
+        if hits[model] >= per_model:
+            continue
+        hits[model] += 1
+        entry["categories"].setdefault(category, []).append({
+            "subfeature": subfeature,
+            "score": float(value),
+            "relevance": float(relevance),
+            "snippet": _highlight(snippet),
+        })
+    return list(results.values())
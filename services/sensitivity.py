@@ -0,0 +1,164 @@
+# services/sensitivity.py
+"""
+Ranking stability under category-weight uncertainty.
+
+Weight vectors are sampled from a Dirichlet distribution centered on the
+base weights (a stored profile, ad-hoc weights, or by default the mean of
+the models' own ModelCategory weights, i.e. 20/30/15/15/20):
+    w ~ Dirichlet(concentration * base / sum(base))
+Categories with base weight 0 stay at 0. Higher concentration = samples
+closer to the base.
+
+Every model is scored under every sample with CategoryMatrix.overall()
+(one matrix product per chunk of samples), in chunks sized so the [n, M]
+score block and the rank comparisons stay under CHUNK_ELEMENTS. Ranks use
+competition ranking, 1 + number of models scoring strictly higher, so tied
+models share a rank.
+Per sample only O(M) work is done: np.partition picks the R best scores,
+so ranks are exact up to R and censored beyond.
+
+Reported:
+- top_k_probability: share of samples in which each model ranks <= k
+- tracked models (the `track` best under the base weights): rank
+  distribution over 1..R (+ "beyond"), median / p5 / p95 rank
+- pairwise_win_rate among the tracked models: P(row scores higher than
+  column), ties counting half
+"""
+
+from __future__ import annotations
+from typing import Callable, Dict, Any, Optional
+import numpy as np
+from services.data_version import data_version
+from services.profile_service import CategoryMatrix, get_profile, ranking_cache, validate_weights
+
+# Upper bound on models × samples scored at once (float64: 8 bytes each, a few temporaries)
+CHUNK_ELEMENTS = 2_000_000
+
+MAX_SAMPLES = 100_000
+MAX_TRACK = 200
+
+
+def sample_weights(base: np.ndarray, n: int, concentration: float, rng: np.random.Generator) -> np.ndarray:
+    """[n, C] Dirichlet samples around `base` (normalized); zero entries stay zero."""
+    base = np.asarray(base, dtype=np.float64)
+    on = base > 0
+    out = np.zeros((n, len(base)))
+    out[:, on] = rng.dirichlet(concentration * base[on] / base[on].sum(), size=n)
+    return out
+
+
+def _quantile_rank(cdf: np.ndarray, q: float) -> Optional[int]:
+    """Smallest rank r with P(rank <= r) >= q, from a cumulative distribution over ranks 1..R."""
+    hit = np.flatnonzero(cdf >= q - 1e-12)
+    return int(hit[0]) + 1 if len(hit) else None
+
+
+def weight_sensitivity(cm: CategoryMatrix,
+                       base_weights: Dict[str, float],
+                       samples: int = 2000,
+                       concentration: float = 100.0,
+                       k: int = 5,
+                       track: int = 10,
+                       seed: int = 0) -> Dict[str, Any]:
+    """Monte Carlo stability of the ranking over `cm`; see the module docstring for the output."""
+    if not 1 <= samples <= MAX_SAMPLES:
+        raise ValueError(f"samples must be between 1 and {MAX_SAMPLES}")
+    if not concentration > 0:
+        raise ValueError("concentration must be positive")
+    if k <= 0 or not 1 <= track <= MAX_TRACK:
+        raise ValueError(f"k must be positive and track between 1 and {MAX_TRACK}")
+    M = len(cm.models)
+    base = cm.vector(base_weights)
+    out: Dict[str, Any] = {
+        "samples": samples, "concentration": concentration, "k": k, "seed": seed,
+        "base_weights": base_weights, "models": [], "top_k_probability": {},
+        "pairwise_win_rate": {"models": [], "matrix": []},
+    }
+    if M == 0:
+        return out
+
+    base_scores = cm.overall(base[None, :])[0]
+    base_order = np.lexsort((cm.name_order, -base_scores))
+    tracked = base_order[:min(track, M)]
+    T = len(tracked)
+    k_eff = min(k, M)
+    R = min(M, max(k, T) * 2)  # exact ranks up to R
+
+    rng = np.random.default_rng(seed)
+    in_top_k = np.zeros(M, dtype=np.int64)
+    rank_hist = np.zeros((T, R), dtype=np.int64)  # rank_hist[t, r - 1] = #samples with rank r
+    wins = np.zeros((T, T))
+
+    chunk = max(1, CHUNK_ELEMENTS // max(M, T * R))  # also bounds the [n, T, R] rank comparison
+    done = 0
+    while done < samples:
+        n = min(chunk, samples - done)
+        scores = cm.overall(sample_weights(base, n, concentration, rng))  # [n, M]
+
+        # the R best scores of each sample, descending; models >= the k-th are in the top k
+        best = -np.sort(np.partition(-scores, R - 1, axis=1)[:, :R], axis=1)  # [n, R]
+        in_top_k += (scores >= best[:, k_eff - 1:k_eff]).sum(axis=0)
+
+        # ranks of the tracked models: exact if they are among the R best, else censored (R + 1)
+        mine = scores[:, tracked]  # [n, T]
+        ranks = 1 + (best[:, None, :] > mine[:, :, None]).sum(axis=2)  # [n, T]
+        ranks[mine < best[:, -1:]] = R + 1
+        for t in range(T):
+            rank_hist[t] += np.bincount(ranks[:, t], minlength=R + 2)[1:R + 1]
+
+        wins += (mine[:, :, None] > mine[:, None, :]).sum(axis=0)
+        wins += 0.5 * (mine[:, :, None] == mine[:, None, :]).sum(axis=0)
+        done += n
+
+    np.fill_diagonal(wins, 0.0)
+    probs = in_top_k / samples
+    out["top_k_probability"] = {
+        cm.models[i]: float(probs[i]) for i in np.lexsort((cm.name_order, -probs)) if probs[i] > 0
+    }
+    names = [cm.models[i] for i in tracked]
+    dist = rank_hist / samples
+    cdf = np.cumsum(dist, axis=1)
+    for t, i in enumerate(tracked):
+        out["models"].append({
+            "model": names[t],
+            "base_rank": int(1 + (base_scores > base_scores[i]).sum()),
+            "base_score": float(base_scores[i]),
+            "top_k_probability": float(probs[i]),
+            "median_rank": _quantile_rank(cdf[t], 0.5),
+            "rank_p5": _quantile_rank(cdf[t], 0.05),
+            "rank_p95": _quantile_rank(cdf[t], 0.95),
+            "rank_distribution": {str(r + 1): float(p) for r, p in enumerate(dist[t]) if p > 0},
+            "beyond_rank": {"rank": R, "probability": float((samples - rank_hist[t].sum()) / samples)},
+        })
+    out["pairwise_win_rate"] = {"models": names, "matrix": (wins / samples).round(6).tolist()}
+    return out
+
+
+def analyze_sensitivity(session,
+                        profile: Optional[str] = None,
+                        weights: Optional[Dict[str, float]] = None,
+                        **params: Any) -> Dict[str, Any]:
+    """weight_sensitivity() over the current data, around a stored profile, `weights`, or the default weights."""
+    cm = ranking_cache.matrix(session, data_version())
+    return sensitivity_around(cm, lambda name: get_profile(session, name), profile, weights, **params)
+
+
+def sensitivity_around(cm: CategoryMatrix,
+                       lookup: Callable[[str], Dict[str, Any]],
+                       profile: Optional[str] = None,
+                       weights: Optional[Dict[str, float]] = None,
+                       **params: Any) -> Dict[str, Any]:
+    """analyze_sensitivity() over `cm`; `lookup(name)` returns a stored profile."""
+    if profile is not None and weights:
+        raise ValueError("pass either profile or weights, not both")
+    if profile is not None:
+        base = lookup(profile)["weights"]
+    elif weights:
+        base = validate_weights(weights, cm.category_index)
+    else:
+        base = cm.default_weights()
+        if not any(base.values()):
+            base = {c: 1.0 for c in cm.categories}
+    result = weight_sensitivity(cm, base, **params)
+    result["profile"] = profile
+    return result
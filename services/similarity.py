@@ -0,0 +1,395 @@
+# services/similarity.py
+"""
+"Similar models": nearest neighbours over subfeature score vectors.
+
+Each model is a row of the ScoreMatrix (models × subfeatures). Missing
+subfeatures are imputed explicitly with the column mean, i.e. "no evidence
+either way": vectors are centered on the column means and a missing score
+becomes 0. The centered rows are L2-normalized once (only the unit rows and
+their norms are kept), so
+- cosine:    one mat-vec of the normalized matrix against the query row
+- euclidean: sqrt(sum_s w_s * (x_s - y_s)^2) over the imputed values, with
+             w_s = the category weight spread evenly over its subfeatures
+             (the query model's ModelCategory weights unless overridden,
+             normalized to sum 1, so distances stay on the 0..2 score scale)
+Each result also reports `overlap`, the number of subfeatures both models
+actually have scores for; models without any scores are never returned.
+
+Optionally (ABUS_SIMILAR_TOPK=K > 0) the cosine top-K of every model is
+precomputed in blocks and answered from that table for k <= K. The
+process-wide index belongs to one dataset version (services.data_version)
+and is rebuilt after writes from anywhere; the upsert endpoints call
+refresh_similarity() right after their commit, which instead reloads only
+the touched models and patches the table: a row is recomputed only if one of its neighbours fell
+below its previous K-th entry, otherwise the touched models are merged in.
+The column means stay frozen between full rebuilds; once more than
+REBUILD_FRACTION of the models have been touched the index is rebuilt.
+"""
+
+from __future__ import annotations
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+import os
+import threading
+import numpy as np
+from sqlalchemy import select as sa_select
+from api.db_models import Model, Category, Subcategory, Score, ModelCategory
+from services.data_version import data_version
+from services.score_matrix import ScoreMatrix, build_score_matrix
+from services.scoring_service import IN_CHUNK, _chunks
+
+METRICS = ("cosine", "euclidean")
+
+# Precomputed cosine neighbours per model (0 = answer every query from the matrix)
+TOPK_TABLE = int(os.getenv("ABUS_SIMILAR_TOPK", "0"))
+
+# Rebuild from scratch (fresh column means) once this share of models changed
+REBUILD_FRACTION = 0.1
+
+# Rows per block when computing the all-pairs table: [BLOCK, M] float64 at a time
+BLOCK = 1024
+
+
+def parse_weights(raw: Optional[str]) -> Optional[Dict[str, float]]:
+    """'usability:40,bioinformatics_relevance:60' -> {...}; None/'' -> None."""
+    if not raw:
+        return None
+    out: Dict[str, float] = {}
+    for part in raw.split(","):
+        cat, sep, val = part.partition(":")
+        try:
+            if not sep:
+                raise ValueError
+            out[cat.strip()] = float(val)
+        except ValueError:
+            raise ValueError(f"Bad weight {part!r}; expected 'category:number'")
+    return out
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Row indices of the k largest `scores` ([M] or [R, M]), best first, ties by
+    lower index. argpartition picks the candidates; rows whose k-th value is
+    tied beyond the cut are resolved exactly.
+    """
+    single = scores.ndim == 1
+    s = scores[None, :] if single else scores
+    R, M = s.shape
+    k = min(k, M)
+    if k == 0:
+        out = np.zeros((R, 0), dtype=np.int64)
+        return out[0] if single else out
+    part = np.argpartition(-s, k - 1, axis=1)[:, :k]
+    vals = np.take_along_axis(s, part, axis=1)
+    kth = vals.min(axis=1)
+    out = np.empty((R, k), dtype=np.int64)
+    tied = np.flatnonzero((s >= kth[:, None]).sum(axis=1) > k)
+    order = np.lexsort((part, -vals), axis=1)
+    out[:] = np.take_along_axis(part, order, axis=1)
+    for r in tied:
+        cand = np.flatnonzero(s[r] >= kth[r])
+        out[r] = cand[np.lexsort((cand, -s[r, cand]))[:k]]
+    return out[0] if single else out
+
+
+def _unit_rows(centered: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(L2 norm [M], normalized rows [M, S]); all-zero rows stay zero."""
+    norms = np.sqrt(np.einsum("ij,ij->i", centered, centered))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return norms, np.where(norms[:, None] > 0, centered / norms[:, None], 0.0)
+
+
+class SimilarityIndex:
+    """Immutable neighbour index over one ScoreMatrix snapshot; updated() returns a new one."""
+
+    def __init__(self,
+                 sm: ScoreMatrix,
+                 table_k: int = 0,
+                 center: Optional[np.ndarray] = None,
+                 table: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                 updates: int = 0):
+        self.sm = sm
+        present = ~np.isnan(sm.values)
+        if center is None:
+            counts = present.sum(axis=0)
+            sums = np.where(present, sm.values, 0.0).sum(axis=0)
+            center = np.divide(sums, counts, out=np.zeros(len(sums)), where=counts > 0)
+        self.center = center
+        self.empty = ~present.any(axis=1)  # no scores at all: never anyone's neighbour
+        # missing -> column mean; the centered rows are norms[:, None] * unit
+        self.norms, self.unit = _unit_rows(np.where(present, sm.values - center, 0.0))
+        self.unit_sq = (self.unit * self.unit) @ sm.membership  # [M, C] per-category sums of unit**2
+        self.sub_category = sm.sub_category
+        self.subs_per_category = np.bincount(self.sub_category, minlength=len(sm.categories)).astype(np.float64)
+        self.updates = updates
+
+        self.requested_k = table_k
+        self.table_k = min(table_k, max(0, len(sm.models) - 1))
+        self.neighbors: Optional[np.ndarray] = None  # int64 [M, K] (int32 when mapped), best first
+        self.similarities: Optional[np.ndarray] = None  # float64 [M, K]
+        if table is not None:
+            self.neighbors, self.similarities = table
+        elif table_k > 0:
+            self.neighbors, self.similarities = self._table_rows(np.arange(len(sm.models)))
+
+    # ---- all-pairs top-k table ----------------------------------------------
+    def _table_rows(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact cosine top-K for `rows`, BLOCK rows per matrix product."""
+        K = self.table_k
+        nbrs = np.empty((len(rows), K), dtype=np.int64)
+        sims = np.empty((len(rows), K))
+        for start in range(0, len(rows), BLOCK):
+            block = rows[start:start + BLOCK]
+            s = self.unit[block] @ self.unit.T
+            s[np.arange(len(block)), block] = -np.inf
+            s[:, self.empty] = -np.inf
+            idx = _top_k(s, K)
+            nbrs[start:start + len(block)] = idx
+            sims[start:start + len(block)] = np.take_along_axis(s, idx, axis=1)
+        return nbrs, sims
+
+    def _patched_table(self, old: "SimilarityIndex", touched: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Table for this index, given the previous one and the rows that changed
+        (rows >= len(old.neighbors) are new models). Everything outside a row's
+        old top-K ranks below its old K-th entry, so the row stays exact by
+        merging the new similarities of `touched`, unless a touched model that
+        was in it now ranks below that entry: only such rows are recomputed.
+        """
+        M, K = len(self.sm.models), self.table_k
+        if K == 0 or old.table_k == 0:
+            return self._table_rows(np.arange(M))
+        n_old = len(old.neighbors)
+        nbrs = np.full((M, K), -1, dtype=np.int64)
+        sims = np.full((M, K), -np.inf)
+        nbrs[:n_old, :old.neighbors.shape[1]] = old.neighbors[:, :K]
+        sims[:n_old, :old.similarities.shape[1]] = old.similarities[:, :K]
+
+        s_t = self.unit @ self.unit[touched].T  # [M, T]
+        s_t[touched, np.arange(len(touched))] = -np.inf
+        s_t[:, self.empty[touched]] = -np.inf
+
+        # a row's old K-th entry as (similarity, -index), compared lexicographically
+        last_s, last_i = sims[:, -1][:, None], nbrs[:, -1][:, None]
+        below = (s_t < last_s) | ((s_t == last_s) & (touched[None, :] > last_i))
+        was_in = (nbrs[:, :, None] == touched[None, None, :]).any(axis=1)  # [M, T]
+        dirty = np.zeros(M, dtype=bool)
+        dirty[touched] = True
+        dirty[n_old:] = True
+        dirty |= (was_in & below).any(axis=1)
+        if K > old.neighbors.shape[1]:
+            dirty[:] = True
+
+        keep = np.flatnonzero(~dirty)
+        if len(keep):
+            cur_n, cur_s = nbrs[keep], sims[keep]
+            cur_s = np.where(np.isin(cur_n, touched), -np.inf, cur_s)
+            cand_n = np.concatenate([cur_n, np.broadcast_to(touched, (len(keep), len(touched)))], axis=1)
+            cand_s = np.concatenate([cur_s, s_t[keep]], axis=1)
+            order = np.lexsort((cand_n, -cand_s), axis=1)[:, :K]
+            nbrs[keep] = np.take_along_axis(cand_n, order, axis=1)
+            sims[keep] = np.take_along_axis(cand_s, order, axis=1)
+        redo = np.flatnonzero(dirty)
+        if len(redo):
+            nbrs[redo], sims[redo] = self._table_rows(redo)
+        return nbrs, sims
+
+    # ---- incremental updates -------------------------------------------------
+    def updated(self, rows: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> "SimilarityIndex":
+        """
+        New index with `rows` ({model: (values [S], weights [C])}) replaced or
+        appended; column means are kept, the top-K table is patched.
+        """
+        sm = self.sm
+        models = list(sm.models)
+        values, weights = sm.values, sm.weights
+        new = [n for n in rows if n not in sm.model_index]
+        if new:
+            models += new
+            values = np.vstack([values, np.full((len(new), values.shape[1]), np.nan)])
+            weights = np.vstack([weights, np.zeros((len(new), weights.shape[1]))])
+        else:
+            values, weights = values.copy(), weights.copy()
+        pos = {n: i for i, n in enumerate(models)}
+        touched = np.array(sorted(pos[n] for n in rows), dtype=np.int64)
+        for name, (v, w) in rows.items():
+            values[pos[name]] = v
+            weights[pos[name]] = w
+
+        nsm = ScoreMatrix(models=models, categories=sm.categories, subcategories=sm.subcategories,
+                          values=values, membership=sm.membership, weights=weights)
+        out = SimilarityIndex(nsm, table_k=0, center=self.center, updates=self.updates + len(rows))
+        if self.neighbors is not None:
+            out.requested_k = self.requested_k
+            out.table_k = min(self.requested_k, len(models) - 1)
+            out.neighbors, out.similarities = out._patched_table(self, touched)
+        return out
+
+    # ---- queries ---------------------------------------------------------------
+    def _distances(self, i: int, w: np.ndarray) -> np.ndarray:
+        """
+        sqrt(sum_s w_s (x_s - y_s)^2) from every centered row x = norm * unit to
+        row i, as x^2.w + y^2.w - 2 x.(w y). w is constant within a category, so
+        x^2.w comes from unit_sq: one [M, S] mat-vec in all.
+        """
+        w_cat = np.zeros(self.unit_sq.shape[1])
+        w_cat[self.sub_category] = w
+        y = self.norms[i] * self.unit[i]
+        d2 = self.norms ** 2 * (self.unit_sq @ w_cat) + (y * y) @ w - 2.0 * self.norms * (self.unit @ (w * y))
+        return np.sqrt(np.maximum(d2, 0.0))
+
+    def position(self, name: str) -> int:
+        try:
+            return self.sm.model_index[name]
+        except KeyError:
+            raise ValueError(f"Model '{name}' not found")
+
+    def _sub_weights(self, i: int, weights: Optional[Dict[str, float]]) -> np.ndarray:
+        w_cat = self.sm.weights[i].copy()
+        for cat, val in (weights or {}).items():
+            if cat not in self.sm.category_index:
+                raise ValueError(f"Unknown category '{cat}' in weights")
+            w_cat[self.sm.category_index[cat]] = float(val)
+        if (w_cat < 0).any():
+            raise ValueError("weights must be non-negative")
+        if w_cat.sum() <= 0:
+            w_cat = np.ones_like(w_cat)  # same fallback as overall(): equal weights
+        with np.errstate(invalid="ignore", divide="ignore"):
+            per_sub = np.where(self.subs_per_category > 0, w_cat / self.subs_per_category, 0.0)
+        w = per_sub[self.sub_category]
+        return w / w.sum() if w.sum() > 0 else w
+
+    def similar(self,
+                name: str,
+                k: int = 10,
+                metric: str = "cosine",
+                weights: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """
+        Returns:
+        {
+          "model": str, "metric": "cosine" | "euclidean",
+          "results": [{"model": str, "similarity" | "distance": float, "overlap": int}, ...]  # closest first
+        }
+        A model without any scores has no meaningful neighbours: results is empty.
+        """
+        if k <= 0:
+            raise ValueError("k must be positive")
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'; expected one of {', '.join(METRICS)}")
+        if weights and metric != "euclidean":
+            raise ValueError("weights only apply to metric=euclidean")
+        i = self.position(name)
+        out: Dict[str, Any] = {"model": name, "metric": metric, "results": []}
+        present = ~np.isnan(self.sm.values[i])
+        if not present.any():
+            return out
+
+        if metric == "cosine":
+            key = "similarity"
+            if self.neighbors is not None and k <= self.table_k:
+                idx, vals = self.neighbors[i, :k], self.similarities[i, :k]
+            else:
+                s = self.unit @ self.unit[i]
+                s[i] = -np.inf
+                s[self.empty] = -np.inf
+                idx = _top_k(s, k)
+                vals = s[idx]
+        else:
+            key = "distance"
+            w = self._sub_weights(i, weights)
+            d = self._distances(i, w)
+            d[i] = np.inf
+            d[self.empty] = np.inf
+            idx = _top_k(-d, k)
+            vals = d[idx]
+
+        overlap = (~np.isnan(self.sm.values[idx]) & present).sum(axis=1)
+        out["results"] = [
+            {"model": self.sm.models[j], key: float(v), "overlap": int(o)}
+            for j, v, o in zip(idx.tolist(), vals.tolist(), overlap.tolist())
+            if np.isfinite(v)
+        ]
+        return out
+
+
+def _load_rows(session, sm: ScoreMatrix, names: Iterable[str]) -> Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]]:
+    """
+    Fresh (values, weights) rows for `names` in `sm`'s column layout; None if
+    they use a category or subfeature the snapshot does not know (full rebuild).
+    """
+    S, C = sm.values.shape[1], len(sm.categories)
+    rows: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    mt, ct, sub, st, mc = (Model.__table__, Category.__table__, Subcategory.__table__,
+                           Score.__table__, ModelCategory.__table__)
+    for batch in _chunks(sorted(set(names)), IN_CHUNK):
+        for (name,) in session.execute(sa_select(mt.c.name).where(mt.c.name.in_(batch))):
+            rows[name] = (np.full(S, np.nan), np.zeros(C))
+        scores = session.execute(
+            sa_select(mt.c.name, ct.c.name, sub.c.name, st.c.value)
+            .select_from(st.join(mt, mt.c.id == st.c.model_id)
+                         .join(sub, sub.c.id == st.c.subcategory_id)
+                         .join(ct, ct.c.id == sub.c.category_id))
+            .where(mt.c.name.in_(batch))
+        )
+        for model, cat, sub_name, value in scores:
+            j = sm.sub_index.get((cat, sub_name))
+            if j is None:
+                return None
+            rows[model][0][j] = value
+        weights = session.execute(
+            sa_select(mt.c.name, ct.c.name, mc.c.weight)
+            .select_from(mc.join(mt, mt.c.id == mc.c.model_id).join(ct, ct.c.id == mc.c.category_id))
+            .where(mt.c.name.in_(batch))
+        )
+        for model, cat, weight in weights:
+            c = sm.category_index.get(cat)
+            if c is None:
+                return None
+            rows[model][1][c] = float(weight or 0.0)
+    return rows
+
+
+# -----------------------------------------------------------------------------
+# Process-wide index (keyed on the dataset version, patched after local upserts)
+# -----------------------------------------------------------------------------
+_index: Optional[Tuple[int, SimilarityIndex]] = None  # (data version it reflects, index)
+_lock = threading.Lock()
+
+
+def get_similarity_index(session) -> SimilarityIndex:
+    """The index of the current dataset version; rebuilt when any process has written since."""
+    global _index
+    version = data_version()
+    cached = _index
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _lock:
+        if _index is None or _index[0] != version:
+            _index = (version, SimilarityIndex(build_score_matrix(session), table_k=TOPK_TABLE))
+        return _index[1]
+
+
+def similar_models(session, name: str, k: int = 10, metric: str = "cosine",
+                   weights: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    return get_similarity_index(session).similar(name, k=k, metric=metric, weights=weights)
+
+
+def refresh_similarity(session, names: List[str]) -> None:
+    """
+    Optional, after committing one transaction that upserted `names`: patch the
+    index in place of the full rebuild the version bump would cause. Only done
+    if that commit is the sole write since the index was built; otherwise the
+    next get_similarity_index() rebuilds.
+    """
+    global _index
+    if not names:
+        return
+    version = data_version()
+    with _lock:
+        if _index is None or _index[0] != version - 1:
+            return
+        idx = _index[1]
+        if idx.updates + len(names) > REBUILD_FRACTION * max(1, len(idx.sm.models)):
+            _index = None
+            return
+        rows = _load_rows(session, idx.sm, names)
+        _index = None if rows is None else (version, idx.updated(rows))
@@ -0,0 +1,537 @@
+# services/snapshot.py
+"""
+Read-only binary snapshot of the scored dataset, for DB-less API replicas.
+
+`python -m services.snapshot build abus.snap` writes the file from the DB;
+with ABUS_SNAPSHOT=abus.snap the API maps it and serves every read endpoint
+from it (see api.app). Opening is O(1): the header and section directory
+are parsed and every array is an np.frombuffer view on the mmap, so pages
+are shared through the OS page cache by all worker processes and nothing
+is decoded until a request needs it.
+
+Layout (little-endian):
+    header     magic "ABUSSNAP", format, section count, dataset version,
+               created_at, M models, C categories, S subcategories
+    directory  per section: name[16], numpy dtype[8], offset u64, nbytes u64
+    sections   each 64-byte aligned:
+      strings.off u64 [M+C+S+1]  offsets into strings: model names (sorted,
+                                 so lookups are a binary search on the map),
+                                 category names, subcategory names
+      strings     utf-8
+      sub.cat     i32 [S]        category of each subcategory
+      values      f32 [M, S]     scores, NaN = missing (f64 if any score is
+                                 not exactly representable in float32)
+      weights     f64 [M, C]     ModelCategory weights
+      cat.avg     f64 [M, C]     materialized per-category averages
+      cat.count   i32 [M, C]     scores per category
+      overall     f64 [M]        materialized overall score
+      notes.off   u64 [M*S+1]    offsets into notes per (model, subfeature)
+      notes.set   u8  [M*S]      1 where a note exists (tells "" from None)
+      notes       utf-8
+      notes.fold  utf-8          notes with ASCII letters lowercased (same
+                                 offsets), scanned by note search
+      profiles    utf-8 JSON     list_profiles()
+      rec.order   i32 [S, M]     recommender column_order() of values
+      sim.nbrs    i32 [M, K]     cosine top-K table, only if ABUS_SIMILAR_TOPK
+      sim.sims    f64 [M, K]     was > 0 when the file was built
+
+The engines wrap the mapped values without copying them. rec.order spares
+every worker the recommender's int64 argsort, for 4 bytes per (model,
+subfeature) cell in the file, the same as float32 values (values takes 8
+when a score is not exactly representable in float32). The similarity
+index derives its unit rows from values on first use instead, 8 bytes per
+cell in each worker that serves /similar: float32 copies in the file
+would double its size again and reorder exactly tied neighbours against
+the DB-backed index. Only the top-K table, O(M^2 * S) to compute, is stored.
+
+Snapshot methods return the same shapes as the DB services they stand in
+for (scoring_service, materialized_scores, export_service, profile_service,
+search_service); categories and subfeatures come out in id order. Note
+search and the `q` filter of list_models_page are case-insensitive
+substring matches, like the LIKE scan search_service falls back to on
+databases without a full-text index, run by the regex engine directly over
+the mapped bytes; note hits are ranked by their number of matches.
+
+The file is written to a temporary name and renamed into place, so
+processes still mapping the previous snapshot keep a consistent view.
+"""
+
+from __future__ import annotations
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import numpy as np
+
+MAGIC = b"ABUSSNAP"
+FORMAT = 1
+ALIGN = 64
+
+_HEADER = struct.Struct("<8sIIQdIII4x")   # magic, format, sections, version, created_at, M, C, S
+_ENTRY = struct.Struct("<16s8sQQ")        # name, dtype, offset, nbytes
+_RESCAN_CELLS = 4096    # search_notes: up to this many candidates, later terms check only those notes
+_SAMPLE_BYTES = 1 << 16  # search_notes: prefix of the notes used to order terms by frequency
+
+
+# -----------------------------------------------------------------------------
+# Writer
+# -----------------------------------------------------------------------------
+def _string_table(strings: List[str]) -> Tuple[np.ndarray, bytes]:
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return offsets, b"".join(encoded)
+
+
+def build_snapshot(session, path: str) -> Dict[str, Any]:
+    """Write the current dataset to `path` (atomically); returns a summary."""
+    from api.db_models import Model, Score, Subcategory
+    from services.data_version import data_version
+    from services.materialized_scores import materialized_model_scores
+    from services.profile_service import list_profiles
+    from services.recommender import column_order
+    from services.score_matrix import ScoreMatrix, build_score_matrix
+    from services.similarity import TOPK_TABLE, SimilarityIndex
+    from sqlalchemy import select as sa_select
+
+    version = data_version()
+    sm = build_score_matrix(session)
+    order = sorted(range(len(sm.models)), key=lambda i: sm.models[i])
+    names = [sm.models[i] for i in order]
+    M, C, S = len(names), len(sm.categories), len(sm.subcategories)
+
+    values = sm.values[order] if M else sm.values
+    weights = sm.weights[order] if M else sm.weights
+    by_name = ScoreMatrix(models=names, categories=sm.categories, subcategories=sm.subcategories,
+                          values=values, membership=sm.membership, weights=weights)
+    derived = [("rec.order", column_order(by_name).astype(np.int32))]
+    if TOPK_TABLE > 0 and M > 1:
+        sim = SimilarityIndex(by_name, table_k=TOPK_TABLE)
+        derived += [("sim.nbrs", sim.neighbors.astype(np.int32)), ("sim.sims", sim.similarities)]
+    values32 = values.astype(np.float32)
+    if np.array_equal(values32.astype(np.float64), values, equal_nan=True):
+        values = values32
+
+    scores = materialized_model_scores(session)
+    cat_avg = np.zeros((M, C))
+    cat_count = np.zeros((M, C), dtype=np.int32)
+    overall = np.zeros(M)
+    for i, name in enumerate(names):
+        entry = scores.get(name)
+        if entry is None:
+            continue
+        overall[i] = entry["overall"]
+        for cat, blob in entry["categories"].items():
+            j = sm.category_index[cat]
+            cat_avg[i, j], cat_count[i, j] = blob["avg"], blob["count"]
+
+    # Notes by (model row, subfeature column); build_score_matrix orders models and subcategories by id
+    mt, st, subt = Model.__table__, Score.__table__, Subcategory.__table__
+    model_ids = session.execute(sa_select(mt.c.id).order_by(mt.c.id)).scalars().all()
+    row_of = {model_ids[p]: r for r, p in enumerate(order)}
+    col_of = {sid: k for k, sid in enumerate(session.execute(sa_select(subt.c.id).order_by(subt.c.id)).scalars())}
+    notes: Dict[int, bytes] = {}
+    note_set = np.zeros(M * S, dtype=np.uint8)
+    for mid, sid, note in session.execute(sa_select(st.c.model_id, st.c.subcategory_id, st.c.note)):
+        if note is not None:
+            cell = row_of[mid] * S + col_of[sid]
+            notes[cell] = note.encode("utf-8")
+            note_set[cell] = 1
+    note_off = np.zeros(M * S + 1, dtype=np.uint64)
+    lengths = np.zeros(M * S, dtype=np.uint64)
+    for cell, blob in notes.items():
+        lengths[cell] = len(blob)
+    np.cumsum(lengths, out=note_off[1:])
+    note_blob = b"".join(notes[c] for c in sorted(notes))
+
+    str_off, str_blob = _string_table(names + sm.categories + [sub for _, sub in sm.subcategories])
+    sections = [
+        ("strings.off", str_off),
+        ("strings", np.frombuffer(str_blob, dtype=np.uint8)),
+        ("sub.cat", sm.sub_category.astype(np.int32)),
+        ("values", values),
+        ("weights", weights),
+        ("cat.avg", cat_avg),
+        ("cat.count", cat_count),
+        ("overall", overall),
+        ("notes.off", note_off),
+        ("notes.set", note_set),
+        ("notes", np.frombuffer(note_blob, dtype=np.uint8)),
+        ("notes.fold", np.frombuffer(note_blob.lower(), dtype=np.uint8)),  # bytes.lower() is ASCII-only
+        ("profiles", np.frombuffer(json.dumps(list_profiles(session)).encode("utf-8"), dtype=np.uint8)),
+        *derived,
+    ]
+
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT, len(sections), version, time.time(), M, C, S))
+        pos = _HEADER.size + _ENTRY.size * len(sections)
+        entries, layout = [], []
+        for name, arr in sections:
+            arr = np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder("<"))
+            pos = -(-pos // ALIGN) * ALIGN
+            entries.append(_ENTRY.pack(name.encode(), arr.dtype.str.encode(), pos, arr.nbytes))
+            layout.append((pos, arr))
+            pos += arr.nbytes
+        f.write(b"".join(entries))
+        for offset, arr in layout:
+            f.seek(offset)
+            f.write(arr.tobytes())
+        f.truncate(pos)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return {"path": path, "version": version, "models": M, "categories": C, "subfeatures": S,
+            "notes": len(notes), "bytes": pos, "values_dtype": values.dtype.name}
+
+
+# -----------------------------------------------------------------------------
+# Reader
+# -----------------------------------------------------------------------------
+class _Strings:
+    """Lazy sequence over a slice of the string table (bisect-able)."""
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray, start: int, count: int):
+        self._off, self._data, self._start, self._count = offsets, data, start, count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> str:
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        a, b = int(self._off[self._start + i]), int(self._off[self._start + i + 1])
+        return self._data[a:b].tobytes().decode("utf-8")
+
+    def tolist(self) -> List[str]:
+        return [self[i] for i in range(self._count)]
+
+
+class Snapshot:
+    """A mapped snapshot file; immutable, shared by all requests of the process."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, n, self.version, self.created_at, M, C, S = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or fmt != FORMAT:
+            raise ValueError(f"{path} is not an ABUS snapshot (format {FORMAT})")
+        self.shape = (M, C, S)
+        self._sections: Dict[str, np.ndarray] = {}
+        self._offsets: Dict[str, int] = {}
+        for k in range(n):
+            name, dtype, offset, nbytes = _ENTRY.unpack_from(self._mm, _HEADER.size + k * _ENTRY.size)
+            name, dt = name.rstrip(b"\0").decode(), np.dtype(dtype.rstrip(b"\0").decode())
+            self._sections[name] = np.frombuffer(self._mm, dtype=dt, count=nbytes // dt.itemsize, offset=offset)
+            self._offsets[name] = offset
+        sec = self._sections
+        self._str_off = sec["strings.off"]
+        self.models = _Strings(sec["strings.off"], sec["strings"], 0, M)
+        self.categories = _Strings(sec["strings.off"], sec["strings"], M, C).tolist()
+        self._sub_names = _Strings(sec["strings.off"], sec["strings"], M + C, S).tolist()
+        self.sub_cat = sec["sub.cat"]
+        self.values = sec["values"].reshape(M, S)
+        self.weights = sec["weights"].reshape(M, C)
+        self.cat_avg = sec["cat.avg"].reshape(M, C)
+        self.cat_count = sec["cat.count"].reshape(M, C)
+        self.overall = sec["overall"]
+        self._note_off = sec["notes.off"]
+        self._note_set = sec["notes.set"]
+        self._notes = sec["notes"]
+        self._lock = threading.RLock()  # derived structures build on each other
+        self._cache: Dict[str, Any] = {}
+
+    def _cached(self, key: str, build):
+        value = self._cache.get(key)
+        if value is None:
+            with self._lock:
+                if key not in self._cache:
+                    self._cache[key] = build()
+                value = self._cache[key]
+        return value
+
+    # --- lookups ---------------------------------------------------------------
+    def index(self, name: str) -> int:
+        i = bisect_left(self.models, name)
+        if i == len(self.models) or self.models[i] != name:
+            raise ValueError(f"Model '{name}' not found")
+        return i
+
+    def note(self, i: int, j: int) -> Optional[str]:
+        cell = i * self.shape[2] + j
+        a, b = int(self._note_off[cell]), int(self._note_off[cell + 1])
+        if b > a:
+            return self._notes[a:b].tobytes().decode("utf-8")
+        return "" if self._note_set[cell] else None
+
+    # --- scoring_service ------------------------------------------------------
+    def model_full(self, i: int) -> Dict[str, Any]:
+        row = self.values[i]
+        out: Dict[str, Any] = {}
+        for j in np.flatnonzero(~np.isnan(row)).tolist():
+            c = int(self.sub_cat[j])
+            cat = self.categories[c]
+            if cat not in out:
+                out[cat] = {"weight": float(self.weights[i, c]), "subfeatures": {}}
+            out[cat]["subfeatures"][self._sub_names[j]] = {"score": float(row[j]), "note": self.note(i, j)}
+        return out
+
+    def get_model_full(self, name: str) -> Dict[str, Any]:
+        return self.model_full(self.index(name))
+
+    def get_model_scores(self, name: str) -> Dict[str, Dict[str, float]]:
+        i = self.index(name)
+        row = self.values[i]
+        out: Dict[str, Dict[str, float]] = {}
+        for j in np.flatnonzero(~np.isnan(row)).tolist():
+            out.setdefault(self.categories[int(self.sub_cat[j])], {})[self._sub_names[j]] = float(row[j])
+        return out
+
+    def model_names(self) -> List[str]:
+        return self.models.tolist()
+
+    # --- materialized_scores --------------------------------------------------
+    def score(self, i: int) -> Dict[str, Any]:
+        cats = {
+            self.categories[j]: {"weight": float(self.weights[i, j]), "avg": float(self.cat_avg[i, j]),
+                                 "count": int(self.cat_count[i, j])}
+            for j in np.flatnonzero(self.cat_count[i] > 0).tolist()
+        }
+        return {"model": self.models[i], "categories": cats, "overall": float(self.overall[i])}
+
+    def get_score(self, name: str) -> Dict[str, Any]:
+        return self.score(self.index(name))
+
+    def get_scores(self) -> List[Dict[str, Any]]:
+        """Every model by overall descending, ties by name (models are stored by name)."""
+        order = np.lexsort((np.arange(len(self.overall)), -self.overall))
+        return [self.score(i) for i in order.tolist()]
+
+    # --- export_service -------------------------------------------------------
+    def list_models_page(self, limit: int = 100, cursor: Optional[str] = None,
+                         q: Optional[str] = None, with_scores: bool = False) -> Dict[str, Any]:
+        from services.export_service import MAX_PAGE, decode_cursor, encode_cursor
+        if not 1 <= limit <= MAX_PAGE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE}")
+        start = bisect_right(self.models, decode_cursor(cursor)) if cursor else 0
+        if not q:
+            picked = list(range(start, min(start + limit + 1, len(self.models))))
+        else:
+            # names are contiguous at the head of the string table, in name order
+            names = self._cached("names.fold", lambda: self._sections["strings"][:int(self._str_off[len(self.models)])]
+                                 .tobytes().lower())
+            picked = []
+            for m in re.compile(re.escape(q.encode("utf-8").lower())).finditer(names, int(self._str_off[start])):
+                i = bisect_right(self._str_off, m.start()) - 1
+                if m.end() <= self._str_off[i + 1] and (not picked or picked[-1] != i):
+                    picked.append(i)
+                    if len(picked) > limit:
+                        break
+        next_cursor = encode_cursor(self.models[picked[limit - 1]]) if len(picked) > limit else None
+        picked = picked[:limit]
+        if not with_scores:
+            return {"models": [self.models[i] for i in picked], "next_cursor": next_cursor}
+        return {
+            "models": [{"name": s["model"], "overall": s["overall"], "categories": s["categories"]}
+                       for s in (self.score(i) for i in picked)],
+            "next_cursor": next_cursor,
+        }
+
+    def iter_export_ndjson(self) -> Iterator[str]:
+        """export_service.iter_export_ndjson() from the snapshot (models by name)."""
+        from services.export_service import LINES_PER_CHUNK, _dumps
+        lines = [_dumps({"format": "abus-export/1", "version": self.version})]
+        for i in range(len(self.models)):
+            lines.append(_dumps({"model": self.models[i], "overall": float(self.overall[i]),
+                                 "categories": self.model_full(i)}))
+            if len(lines) >= LINES_PER_CHUNK:
+                yield "\n".join(lines) + "\n"
+                lines = []
+        if lines:
+            yield "\n".join(lines) + "\n"
+
+    def iter_export_columnar(self) -> Iterator[str]:
+        """export_service.iter_export_columnar() from the snapshot (models by name)."""
+        from services.export_service import _dumps, _json_items
+        M = len(self.models)
+        yield (
+            '{"format":"abus-columnar/1","version":' + _dumps(self.version)
+            + ',"categories":' + _dumps(self.categories)
+            + ',"subfeatures":' + _dumps([[self.categories[int(c)], s] for c, s in zip(self.sub_cat, self._sub_names)])
+            + ',"models":['
+        )
+        yield from _json_items(self.models[i] for i in range(M))
+        yield '],"weights":['
+        yield from _json_items(self.weights[i].astype(np.float64).tolist() for i in range(M))
+        yield '],"values":['
+        yield from _json_items([None if v != v else v for v in self.values[i].astype(np.float64).tolist()]
+                               for i in range(M))
+        yield "]}"
+
+    # --- in-memory engines (built on first use, per process) ------------------
+    def score_matrix(self):
+        from services.score_matrix import ScoreMatrix
+
+        def build():
+            M, C, S = self.shape
+            membership = np.zeros((S, C))
+            membership[np.arange(S), self.sub_cat] = 1.0
+            return ScoreMatrix(
+                models=self.models.tolist(),
+                categories=list(self.categories),
+                subcategories=[(self.categories[int(c)], s) for c, s in zip(self.sub_cat, self._sub_names)],
+                values=self.values,  # the mapped array, float32 when that is exact
+                membership=membership,
+                weights=self.weights,
+            )
+        return self._cached("score_matrix", build)
+
+    def build_category_matrix(self):
+        """profile_service.build_category_matrix() from the stored averages."""
+        from services.profile_service import CategoryMatrix
+        return CategoryMatrix(self.models.tolist(), list(self.categories), self.cat_avg.copy(),
+                              (self.cat_count > 0).astype(np.float64), self.weights.astype(np.float64),
+                              np.arange(len(self.models), dtype=np.int64))
+
+    def recommender(self):
+        from services.recommender import Recommender
+        M, C, S = self.shape
+        order = self._sections.get("rec.order")
+        return self._cached("recommender", lambda: Recommender(
+            self.score_matrix(), order=None if order is None else order.reshape(S, M)))
+
+    def similarity_index(self):
+        from services.similarity import TOPK_TABLE, SimilarityIndex
+
+        def build():
+            M, C, S = self.shape
+            sec = self._sections
+            if "sim.nbrs" not in sec:
+                return SimilarityIndex(self.score_matrix(), table_k=TOPK_TABLE)
+            table = (sec["sim.nbrs"].reshape(M, -1), sec["sim.sims"].reshape(M, -1))
+            return SimilarityIndex(self.score_matrix(), table_k=table[0].shape[1], table=table)
+        return self._cached("similarity", build)
+
+    # --- profile_service / sensitivity ----------------------------------------
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        return self._cached("profiles", lambda: json.loads(self._sections["profiles"].tobytes()))
+
+    def get_profile(self, name: str) -> Dict[str, Any]:
+        for p in self.list_profiles():
+            if p["name"] == name:
+                return p
+        raise ValueError(f"Profile '{name}' not found")
+
+    def _category_matrix(self):
+        from services.profile_service import ranking_cache
+        return ranking_cache.matrix(self, self.version, build=Snapshot.build_category_matrix)
+
+    def rank_models(self, profiles: Dict[str, Dict[str, float]], offset: int = 0,
+                    limit: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        from services.profile_service import rank_matrix
+        return rank_matrix(self._category_matrix(), self.version, profiles, offset=offset, limit=limit)
+
+    def get_rankings(self, profile_name: str, offset: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        profile = self.get_profile(profile_name)
+        ranking = self.rank_models({profile["name"]: profile["weights"]}, offset=offset, limit=limit)
+        return {"profile": profile["name"], "description": profile["description"], **ranking[profile["name"]]}
+
+    def analyze_sensitivity(self, profile: Optional[str] = None, weights: Optional[Dict[str, float]] = None,
+                            **params: Any) -> Dict[str, Any]:
+        from services.sensitivity import sensitivity_around
+        return sensitivity_around(self._category_matrix(), self.get_profile, profile, weights, **params)
+
+    # --- search_service -------------------------------------------------------
+    def search_notes(self, q: str, limit: int = 20, per_model: int = 5,
+                     constraints: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """search_service.search_notes() by substring match; relevance = number of matches in the note."""
+        from services.search_service import MAX_LIMIT, _CLOSE, _OPEN, _TERM_RE, _group
+        if not isinstance(q, str) or not q.strip():
+            raise ValueError("q is required")
+        if not 1 <= limit <= MAX_LIMIT or per_model < 1:
+            raise ValueError(f"limit must be between 1 and {MAX_LIMIT} and per_model positive")
+        words = [w.rstrip("*") for w in _TERM_RE.findall(q)]
+        words = [w for w in words if w]
+        if not words:
+            raise ValueError("q must contain at least one word")
+        allowed = None
+        if constraints:
+            engine = self.recommender()
+            allowed = {engine.sm.models[i] for i in engine.filter(constraints).tolist()}
+
+        start = self._offsets["notes.fold"]
+        fold = memoryview(self._mm)[start:start + len(self._notes)]  # re scans the mapped pages directly
+        needles = [re.compile(re.escape(w.encode("utf-8").lower())) for w in set(words)]
+        # rarest term first (counted in a sample), so the others only need to check its notes
+        sample = fold[:_SAMPLE_BYTES]
+        needles.sort(key=lambda n: (len(n.findall(sample)), -len(n.pattern)))
+        hits: Optional[Dict[int, int]] = None
+        for needle in needles:
+            if hits is None or len(hits) > _RESCAN_CELLS:
+                spans = np.array([m.span() for m in needle.finditer(fold)], dtype=np.uint64).reshape(-1, 2)
+                cells = np.searchsorted(self._note_off, spans[:, 0], side="right") - 1
+                cells = cells[spans[:, 1] <= self._note_off[cells + 1]]  # not across two notes
+                found = dict(zip(*(a.tolist() for a in np.unique(cells, return_counts=True))))
+            else:
+                found = {c: n for c in hits
+                         if (n := len(needle.findall(fold, int(self._note_off[c]), int(self._note_off[c + 1]))))}
+            hits = found if hits is None else {c: n + found[c] for c, n in hits.items() if c in found}
+            if not hits:
+                return {"q": q, "results": []}
+
+        S = self.shape[2]
+        pattern = re.compile("|".join(re.escape(w) for w in sorted(words, key=len, reverse=True)), re.IGNORECASE)
+        rows = []
+        for cell, n in sorted(hits.items(), key=lambda kv: (-kv[1], kv[0])):
+            i, j = divmod(cell, S)
+            note = self.note(i, j) or ""
+            rows.append((self.models[i], self.categories[int(self.sub_cat[j])], self._sub_names[j],
+                         float(self.values[i, j]), float(n), pattern.sub(lambda m: _OPEN + m.group(0) + _CLOSE, note)))
+        return {"q": q, "results": _group(rows, limit, per_model, allowed)}
+
+
+_snapshot: Optional[Snapshot] = None
+
+
+def open_snapshot(path: str) -> Snapshot:
+    """Process-wide Snapshot of `path`, mapped on first use."""
+    global _snapshot
+    if _snapshot is None or _snapshot.path != path:
+        _snapshot = Snapshot(path)
+    return _snapshot
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+    ap = argparse.ArgumentParser(description="Build or inspect an ABUS read snapshot")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="write the current DB to a snapshot file")
+    b.add_argument("path")
+    i = sub.add_parser("info", help="print a snapshot's header")
+    i.add_argument("path")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "build":
+        from api.db import get_session, init_db
+        init_db()
+        t0 = time.perf_counter()
+        with get_session() as s:
+            summary = build_snapshot(s, args.path)
+        print(f"[snapshot] {json.dumps(summary)} in {time.perf_counter() - t0:.2f} s")
+    else:
+        snap = Snapshot(args.path)
+        M, C, S = snap.shape
+        print(json.dumps({"path": snap.path, "version": snap.version, "created_at": snap.created_at,
+                          "models": M, "categories": C, "subfeatures": S,
+                          "values_dtype": snap.values.dtype.name,
+                          "sections": {k: int(v.nbytes) for k, v in snap._sections.items()}}))
+
+
+if __name__ == "__main__":
+    main()
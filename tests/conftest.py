@@ -0,0 +1,16 @@
+# tests/conftest.py
+"""Runs the tests against a throwaway SQLite file (set before api.db creates its engine)."""
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='abus_test_')}/test.db"
+
+from api.db import init_db  # noqa: E402
+
+init_db()
@@ -0,0 +1,69 @@
+# tests/test_history_service.py
+"""as_of / diff reconstruction across snapshot boundaries (services.history_service)."""
+
+import pytest
+from sqlalchemy import func, select as sa_select
+
+from api.db import get_session
+from api.db_models import Model, ModelSnapshot, ScoreRevision
+from services import history_service
+from services.history_service import LATEST, diff_model, get_model_full_as_of, resolve_revision
+from services.scoring_service import get_model_full, upsert_model_from_payload
+
+
+@pytest.fixture(autouse=True)
+def snapshot_every(monkeypatch):
+    monkeypatch.setattr(history_service, "SNAPSHOT_EVERY", 4)
+
+
+def _write(name, cells, weight=10.0):
+    """Upsert {sub: (score, note)} under one category; returns (revision, full state after it)."""
+    payload = {"name": name, "categories": {"usability": {
+        "weight": weight,
+        "subfeatures": {sub: {"score": score, "note": note} for sub, (score, note) in cells.items()},
+    }}}
+    with get_session() as s, s.begin():
+        upsert_model_from_payload(s, payload)
+    with get_session() as s:
+        return resolve_revision(s, LATEST), get_model_full(s, name)
+
+
+def _count(table, revision):
+    with get_session() as s:
+        return s.execute(sa_select(func.count()).select_from(table).where(table.revision == revision)).scalar()
+
+
+def test_as_of_and_diff_across_snapshot_boundary():
+    # 3 rows (2 cells + weight): deltas; +2 rows reach SNAPSHOT_EVERY -> snapshot; then deltas again
+    history = [
+        _write("Hist", {"a": (1, "first"), "b": (0, None)}),
+        _write("Hist", {"a": (2, "first"), "c": (1, "c note")}),   # a: score only, note carried forward
+        _write("Hist", {"b": (2, "b note")}),
+        _write("Hist", {"a": (0, "first")}, weight=20.0),
+    ]
+    with get_session() as s:
+        snaps = s.execute(sa_select(ModelSnapshot.revision).join(Model, Model.id == ModelSnapshot.model_id)
+                          .where(Model.name == "Hist")).scalars().all()
+        assert snaps == [history[1][0]]  # deltas on both sides of the boundary
+        for rev, state in history:
+            assert get_model_full_as_of(s, "Hist", rev) == state
+        assert get_model_full_as_of(s, "Hist", history[1][0])["usability"]["subfeatures"]["a"]["note"] == "first"
+
+        d = diff_model(s, "Hist", history[0][0], history[3][0])
+        assert d["weights"] == {"usability": {"from": 10.0, "to": 20.0}}
+        assert d["scores"]["usability"] == {
+            "a": {"from": {"score": 1.0, "note": "first"}, "to": {"score": 0.0, "note": "first"}},
+            "b": {"from": {"score": 0.0, "note": None}, "to": {"score": 2.0, "note": "b note"}},
+            "c": {"from": None, "to": {"score": 1.0, "note": "c note"}},
+        }
+        assert diff_model(s, "Hist", history[1][0], history[2][0])["scores"] == {
+            "usability": {"b": {"from": {"score": 0.0, "note": None}, "to": {"score": 2.0, "note": "b note"}}},
+        }
+
+
+def test_large_first_write_is_stored_once():
+    rev, state = _write("Big", {f"s{i}": (i % 3, f"n{i}") for i in range(6)})
+    assert _count(ModelSnapshot, rev) == 1
+    assert _count(ScoreRevision, rev) == 0
+    with get_session() as s:
+        assert get_model_full_as_of(s, "Big", rev) == state
@@ -0,0 +1,30 @@
+# tests/test_ingest_pipeline.py
+"""Per-paper failure reporting in batch ingestion (services.ingest_pipeline.iter_ingest)."""
+
+import json
+
+import pytest
+
+from services.ingest_pipeline import iter_ingest, iter_papers
+from services.score_cache import ScoreCache
+
+SCHEMA = {"usability": {"code_availability": {}, "documentation_quality": {}}}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_unreadable_paper_is_reported_not_raised(tmp_path, workers):
+    papers = tmp_path / "papers.jsonl"
+    papers.write_text("\n".join(json.dumps(rec) for rec in (
+        {"name": "a", "text": "Code is available on GitHub."},
+        {"name": "b", "path": str(tmp_path / "missing" / "x.txt")},
+        {"name": "c", "text": "Well documented, with a tutorial."},
+    )) + "\n")
+    cache = ScoreCache(str(tmp_path / "cache.sqlite"))
+
+    results = {r["name"]: r for r in iter_ingest(iter_papers(papers), workers=workers, schema=SCHEMA, cache=cache)}
+
+    assert sorted(results) == ["a", "b", "c"]
+    assert results["b"]["error"].startswith("FileNotFoundError")
+    for name in ("a", "c"):
+        assert "error" not in results[name]
+        assert set(results[name]["payload"]["categories"]["usability"]["subfeatures"]) == set(SCHEMA["usability"])
@@ -0,0 +1,132 @@
+# tests/test_ingest_queue.py
+"""Dedup, lease recovery and save retries of the background ingestion queue (services.ingest_queue)."""
+
+import time
+
+import pytest
+
+from api.db import get_session
+from services import scoring_service
+from services.ingest_queue import MAX_ATTEMPTS, IngestQueue
+from services.materialized_scores import check_materialized
+from services.score_cache import ScoreCache
+from services.scoring_service import get_model_full, upsert_model_from_payload
+
+TEXT = "Code is available on GitHub with a tutorial and documentation."
+
+
+@pytest.fixture(autouse=True)
+def schema():
+    with get_session() as s, s.begin():
+        upsert_model_from_payload(s, {"name": "QueueSchema", "categories": {
+            "usability": {"weight": 10, "subfeatures": {"code_availability": {"score": 1}}},
+        }})
+
+
+def _queue(tmp_path, **kw) -> IngestQueue:
+    kw.setdefault("workers", 1)
+    return IngestQueue(str(tmp_path / "jobs.sqlite"), executor="thread",
+                       cache=ScoreCache(str(tmp_path / "cache.sqlite")), **kw)
+
+
+def _drain(q: IngestQueue, timeout: float = 30.0) -> None:
+    q.start()
+    deadline = time.monotonic() + timeout
+    while True:
+        stats = q.stats()
+        if not stats["queued"] and not stats["running"]:
+            break
+        assert time.monotonic() < deadline, stats
+        time.sleep(0.05)
+    q.stop()
+
+
+def _status(q: IngestQueue, job_id: int):
+    job = q.get(job_id)
+    return job["status"], job["attempts"]
+
+
+def test_identical_submissions_are_deduplicated(tmp_path):
+    q = _queue(tmp_path, workers=0)
+    first = q.submit_many([{"name": "QDup", "text": TEXT}, {"name": "QDup2", "text": TEXT}])
+    again = q.submit_many([{"name": "QDup", "text": TEXT}])
+    other_weights = q.submit_many([{"name": "QDup", "text": TEXT, "weights": {"usability": 5}}])
+    other_text = q.submit_many([{"name": "QDup", "text": TEXT + " More."}])
+
+    assert [j["deduplicated"] for j in first] == [False, False]
+    assert again == [{"id": first[0]["id"], "name": "QDup", "status": "queued", "deduplicated": True}]
+    assert not other_weights[0]["deduplicated"] and other_weights[0]["id"] != first[0]["id"]
+    assert not other_text[0]["deduplicated"] and other_text[0]["id"] != first[0]["id"]
+    assert q.stats()["queued"] == 4
+    q.close()
+
+
+def test_expired_lease_of_dead_worker_is_recovered(tmp_path):
+    dead = _queue(tmp_path, lease_s=0.01)
+    job = dead.submit_many([{"name": "QLease", "text": TEXT}])[0]
+    assert [row[0] for row in dead._write(dead._claim, 1)] == [job["id"]]  # claimed, then never processed
+    assert _status(dead, job["id"]) == ("running", 1)
+    time.sleep(0.05)
+
+    live = _queue(tmp_path)
+    _drain(live)
+    assert _status(live, job["id"]) == ("done", 2)
+    with get_session() as s:
+        assert get_model_full(s, "QLease")
+    dead.close()
+    live.close()
+
+
+def test_job_abandoned_max_attempts_times_fails(tmp_path):
+    q = _queue(tmp_path, lease_s=0.01)
+    job = q.submit_many([{"name": "QAbandoned", "text": TEXT}])[0]
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        assert [row[0] for row in q._write(q._claim, 1)] == [job["id"]]
+        time.sleep(0.02)
+        q._write(q._recover)
+        assert q.get(job["id"])["attempts"] == attempt
+    got = q.get(job["id"])
+    assert got["status"] == "failed" and got["error"].startswith("abandoned")
+
+    # resubmitting a failed job re-queues it in place
+    again = q.submit_many([{"name": "QAbandoned", "text": TEXT}])[0]
+    assert again == {"id": job["id"], "name": "QAbandoned", "status": "queued", "deduplicated": False}
+    q.close()
+
+
+def test_failed_save_is_reported_and_retried(tmp_path, monkeypatch):
+    real = scoring_service.upsert_models_from_payloads
+    calls = []
+
+    def flaky(session, payloads):
+        calls.append([p["name"] for p in payloads])
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        return real(session, payloads)
+
+    monkeypatch.setattr(scoring_service, "upsert_models_from_payloads", flaky)
+    q = _queue(tmp_path, lease_s=0.3)
+    job = q.submit_many([{"name": "QSave", "text": TEXT}])[0]
+    _drain(q)
+    got = q.get(job["id"])
+    assert got["status"] == "failed" and got["error"] == "save failed: RuntimeError: database is locked"
+    with get_session() as s, pytest.raises(ValueError, match="not found"):
+        get_model_full(s, "QSave")
+
+    # resubmitted, and the dispatcher dies between the save and the "done" mark:
+    # the job is recovered and saved again, which the upsert makes harmless
+    finish = q._finish
+
+    def crash_once(db, done):
+        q._finish = finish
+        raise RuntimeError("dispatcher died")
+
+    q._finish = crash_once
+    assert q.submit_many([{"name": "QSave", "text": TEXT}])[0]["id"] == job["id"]
+    _drain(q)
+    assert _status(q, job["id"]) == ("done", 2)
+    assert calls == [["QSave"]] * 3
+    with get_session() as s:
+        assert get_model_full(s, "QSave")["usability"]["subfeatures"]["code_availability"]
+        assert check_materialized(s) == []
+    q.close()
@@ -0,0 +1,70 @@
+# tests/test_llm_providers.py
+"""KeywordMatcher and RuleBasedProvider keep the per-keyword re.findall semantics (services.llm_providers)."""
+
+import random
+import re
+
+import pytest
+
+from services.llm_providers import KeywordMatcher, RuleBasedProvider
+
+SCHEMA = {cat: dict.fromkeys(subs, {}) for cat, subs in RuleBasedProvider.KEYWORDS.items()}
+
+
+def _findall_counts(keywords, text):
+    return {kw: len(re.findall(rf"\b{re.escape(kw)}\b", text)) for kw in keywords}
+
+
+def _reference_score(provider, text, schema):
+    """RuleBasedProvider.score as it was before KeywordMatcher: one regex scan per keyword."""
+    t = text.lower()
+    out = {}
+    for cat, subdict in schema.items():
+        out[cat] = {}
+        for sub in subdict:
+            hits, note_bits = 0, []
+            for kw in provider.KEYWORDS.get(cat, {}).get(sub, []):
+                count = len(re.findall(rf"\b{re.escape(kw.lower())}\b", t))
+                if count:
+                    hits += count
+                    note_bits.append(f"{kw}×{count}")
+            out[cat][sub] = {"score": provider._score_for_hits(hits),
+                             "note": " | ".join(note_bits) if note_bits else "no keyword evidence"}
+    return out
+
+
+def _split(rng, text):
+    cuts = sorted(rng.randrange(len(text) + 1) for _ in range(rng.randrange(6)))
+    return [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])] + [""]
+
+
+def _random_text(rng, words, n):
+    seps = [" ", " ", "-", ".", "_", "", "\n", ", ", "é"]
+    return "".join(rng.choice(words) + rng.choice(seps) for _ in range(n))
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_small_alphabet_keywords_match_findall(seed):
+    # tiny alphabet: keywords that are prefixes of, overlap or contain one another
+    rng = random.Random(seed)
+    pieces = ["a", "b", "ab", "a b", "a-b", "b.a", "aa", "ba", "_a"]
+    keywords = {"".join(rng.choice(pieces) for _ in range(rng.randint(1, 3))) for _ in range(rng.randint(1, 8))}
+    matcher = KeywordMatcher(keywords)
+    for _ in range(20):
+        text = _random_text(rng, pieces, rng.randint(0, 60))
+        want = _findall_counts(matcher.keywords, text)
+        assert matcher.count(text) == want, (keywords, text)
+        assert matcher.count_chunks(_split(rng, text)) == want, (keywords, text)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_rule_based_scores_match_per_keyword_regex(seed):
+    rng = random.Random(seed)
+    provider = RuleBasedProvider()
+    keywords = [kw for subs in provider.KEYWORDS.values() for kws in subs.values() for kw in kws]
+    words = keywords + [kw[:-1] for kw in keywords] + [kw + "s" for kw in keywords] + ["Secondary", "GitHub", "3D", "x"]
+    for _ in range(10):
+        text = _random_text(rng, words, rng.randint(0, 200))
+        want = _reference_score(provider, text, SCHEMA)
+        assert provider.score(text, SCHEMA) == want
+        assert provider.score_chunks(_split(rng, text), SCHEMA) == want
@@ -0,0 +1,65 @@
+# tests/test_materialized_scores.py
+"""Incrementally maintained score tables stay equal to a full recompute (services.materialized_scores)."""
+
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from api.db import get_session
+from api.seed_from_json import seed_bulk
+from services.materialized_scores import check_materialized, get_materialized_scores
+from services.scoring_service import compute_all_scores, upsert_model_from_payload, upsert_models_from_payloads
+
+DATA = json.loads((Path(__file__).resolve().parents[1] / "abus" / "data" / "model_scores.json").read_text())
+
+
+def _assert_consistent():
+    with get_session() as s:
+        assert check_materialized(s) == []
+        have, want = get_materialized_scores(s), compute_all_scores(s)
+    assert [r["model"] for r in have] == [r["model"] for r in want]
+    for h, w in zip(have, want):
+        assert h["overall"] == pytest.approx(w["overall"], rel=1e-12, abs=1e-12)
+        assert h["categories"].keys() == w["categories"].keys()
+        for cat, blob in w["categories"].items():
+            assert h["categories"][cat]["count"] == blob["count"]
+            assert h["categories"][cat]["avg"] == pytest.approx(blob["avg"], rel=1e-12, abs=1e-12)
+            assert h["categories"][cat]["weight"] == pytest.approx(blob["weight"])
+
+
+def test_writes_keep_materialized_scores_exact():
+    with get_session() as s, s.begin():
+        seed_bulk(s, DATA)
+    _assert_consistent()
+
+    first = next(iter(DATA))
+    with get_session() as s, s.begin():
+        upsert_model_from_payload(s, {"name": first, "categories": {
+            "usability": {"weight": 55, "subfeatures": {"code_availability": {"score": 0, "note": "moved"}}},
+            "brand_new_category": {"weight": 5, "subfeatures": {"fresh": {"score": 2}}},
+        }})
+    _assert_consistent()
+
+    # the dict note fails in the database, so the batch falls back to one savepoint per model
+    with get_session() as s, s.begin():
+        res = upsert_models_from_payloads(s, [
+            {"name": "MatNew", "categories": {"usability": {"weight": 0, "subfeatures": {"code_availability": 1}}}},
+            {"name": "MatBroken", "categories": {"usability": {"subfeatures": {
+                "code_availability": {"score": 1, "note": {"not": "text"}}}}}},
+            {"name": first, "categories": {"adaptability": {"weight": 0, "subfeatures": {"transferability": 0}}}},
+        ])
+    assert res["ok"] == ["MatNew", first]
+    assert [e["index"] for e in res["errors"]] == [1]
+    _assert_consistent()
+
+    reseed = copy.deepcopy(DATA)
+    for model, categories in list(reseed.items())[::3]:
+        for blob in categories.values():
+            blob["weight"] = 0
+            for sub in blob.get("subfeatures", {}).values():
+                sub["score"] = 2 - sub["score"]
+    with get_session() as s, s.begin():
+        seed_bulk(s, reseed)
+    _assert_consistent()
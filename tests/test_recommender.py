@@ -0,0 +1,49 @@
+# tests/test_recommender.py
+"""POST /api/recommend weight overrides are checked like profile weights (services.recommender)."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app import app
+from api.db import get_session
+from services.scoring_service import upsert_model_from_payload
+
+
+@pytest.fixture(scope="module")
+def client():
+    with get_session() as s, s.begin():
+        for name, score in (("RecA", 2), ("RecB", 0)):
+            upsert_model_from_payload(s, {"name": name, "categories": {
+                "usability": {"weight": 10, "subfeatures": {"rec_probe": {"score": score}}},
+                "adaptability": {"weight": 10, "subfeatures": {"rec_probe": {"score": 2 - score}}},
+            }})
+    return TestClient(app)
+
+
+def _recommend(client, weights_json):
+    body = '{"constraints": {"usability.rec_probe": ">= 0"}, "k": 5, "weights": %s}' % weights_json
+    return client.post("/api/recommend", content=body, headers={"content-type": "application/json"})
+
+
+@pytest.mark.parametrize("raw", ["null", "NaN", "Infinity", '"inf"', "-1", "true"])
+def test_bad_override_is_rejected(client, raw):
+    r = _recommend(client, '{"usability": %s}' % raw)
+    assert r.status_code == 400, r.text
+    assert "Bad weight for usability" in r.json()["detail"]
+
+
+def test_unknown_category_and_all_zero_are_rejected(client):
+    assert _recommend(client, '{"nope": 1}').status_code == 400
+    assert _recommend(client, '{"usability": 0}').status_code == 400
+
+
+def test_override_reranks(client):
+    def top(weights):
+        r = _recommend(client, json.dumps(weights))
+        assert r.status_code == 200, r.text
+        return [x["model"] for x in r.json()["results"]]
+
+    assert top({"usability": 100, "adaptability": 1}) == ["RecA", "RecB"]
+    assert top({"usability": 1, "adaptability": 100}) == ["RecB", "RecA"]
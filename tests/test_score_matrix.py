@@ -0,0 +1,57 @@
+# tests/test_score_matrix.py
+"""The vectorized ScoreMatrix path gives compute_model_scores' numbers (services.score_matrix)."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from api.db import get_session
+from api.seed_from_json import seed_bulk
+from services.scoring_service import compute_all_scores, compute_model_scores, upsert_model_from_payload
+
+DATA = json.loads((Path(__file__).resolve().parents[1] / "abus" / "data" / "model_scores.json").read_text())
+
+EDGE_CASES = [
+    # all weights zero: equal weights over the categories that have scores
+    {"name": "SmZeroWeights", "categories": {
+        "usability": {"weight": 0, "subfeatures": {"code_availability": {"score": 2}, "setup_ease": {"score": 1}}},
+        "adaptability": {"weight": 0, "subfeatures": {"transferability": {"score": 0}}},
+    }},
+    # weighted category without any scores next to one with scores
+    {"name": "SmEmptyCategory", "categories": {
+        "usability": {"weight": 30, "subfeatures": {"code_availability": {"score": 2}}},
+        "adaptability": {"weight": 70, "subfeatures": {}},
+    }},
+    # the only weighted category has no scores; the scored one has weight 0
+    {"name": "SmWeightOnEmpty", "categories": {
+        "usability": {"weight": 0, "subfeatures": {"code_availability": {"score": 1}}},
+        "adaptability": {"weight": 50, "subfeatures": {}},
+    }},
+    # categories but no scores at all
+    {"name": "SmNoScores", "categories": {"usability": {"weight": 10, "subfeatures": {}}}},
+    # a single missing subfeature among present ones
+    {"name": "SmSparse", "categories": {
+        "usability": {"weight": 40, "subfeatures": {"setup_ease": {"score": 0}}},
+        "bioinformatics_relevance": {"weight": 60, "subfeatures": {"biological_input_modalities": {"score": 2}}},
+    }},
+]
+
+
+def test_compute_all_scores_matches_scalar_path():
+    with get_session() as s, s.begin():
+        seed_bulk(s, DATA)
+        for payload in EDGE_CASES:
+            upsert_model_from_payload(s, payload)
+    with get_session() as s:
+        vectorized = {r["model"]: r for r in compute_all_scores(s)}
+        assert {p["name"] for p in EDGE_CASES} | set(DATA) <= set(vectorized)
+        for name, got in vectorized.items():
+            want = compute_model_scores(s, name)
+            assert got["overall"] == pytest.approx(want["overall"], rel=1e-12, abs=1e-12), name
+            want_cats = {c: b for c, b in want["categories"].items() if b["count"] > 0}
+            assert got["categories"].keys() == want_cats.keys(), name
+            for cat, blob in want_cats.items():
+                assert got["categories"][cat]["count"] == blob["count"], (name, cat)
+                assert got["categories"][cat]["avg"] == pytest.approx(blob["avg"], rel=1e-12), (name, cat)
+                assert got["categories"][cat]["weight"] == blob["weight"], (name, cat)
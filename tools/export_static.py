@@ -0,0 +1,152 @@
+# tools/export_static.py
+"""
+Build the static data for the docs/ frontend from the DB.
+
+Writes into --out (default docs/data):
+- manifest.json                 model names + precomputed overall and category
+                                averages; the only file needed for first paint
+- models/<name>-<hash>.json     per-model detail shard (weights, scores, notes,
+                                computed score block), fetched on demand
+- .gz / .br next to every file  pre-compressed variants (.br needs `brotli`)
+
+Shard names carry a content hash, so they can be served with a long-lived
+immutable Cache-Control; manifest.json keeps a fixed name and is written last,
+so it never points at a shard that is not there yet. Shards that are no
+longer referenced are removed.
+
+Run:
+    python tools/export_static.py
+    python tools/export_static.py --out /tmp/site/data --no-brotli
+"""
+
+import os, sys
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import gzip
+import hashlib
+import json
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from api.db import get_session, init_db
+from services.data_version import data_version
+from services.materialized_scores import materialized_model_scores
+from services.scoring_service import load_models_full
+
+SHARD_DIR = "models"
+MANIFEST = "manifest.json"
+
+
+def _dumps(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), sort_keys=False).encode("utf-8")
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("._") or "model"
+
+
+def _compressors(brotli: bool):
+    out = [(".gz", lambda b: gzip.compress(b, compresslevel=9, mtime=0))]
+    if brotli:
+        try:
+            import brotli as _brotli
+        except ImportError:
+            print("[export] `brotli` not installed; skipping .br files (pip install brotli)", file=sys.stderr)
+        else:
+            out.append((".br", lambda b: _brotli.compress(b, quality=11)))
+    return out
+
+
+def _write(path: Path, body: bytes, compressors) -> int:
+    """Write `body` plus compressed variants atomically; returns bytes written (uncompressed)."""
+    for suffix, compress in [("", None), *compressors]:
+        target = path.with_name(path.name + suffix)
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_bytes(body if compress is None else compress(body))
+        os.replace(tmp, target)
+    return len(body)
+
+
+def build_export(session) -> Dict[str, Any]:
+    """{"manifest": {...}, "shards": {model_name: shard dict}} without shard paths filled in."""
+    scores = materialized_model_scores(session)
+    full = load_models_full(session)
+    categories: List[str] = []
+    models: List[Dict[str, Any]] = []
+    shards: Dict[str, Dict[str, Any]] = {}
+    for name, sc in scores.items():
+        for cat in sc["categories"]:
+            if cat not in categories:
+                categories.append(cat)
+        models.append({
+            "name": name,
+            "overall": round(sc["overall"], 6),
+            "avg": {cat: round(blob["avg"], 6) for cat, blob in sc["categories"].items()},
+        })
+        shards[name] = {"model": name, "score": sc, "full": full.get(name, {})}
+    manifest = {
+        "version": data_version(),
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "categories": categories,
+        "models": models,
+    }
+    return {"manifest": manifest, "shards": shards}
+
+
+def export_static(out_dir: Path, brotli: bool = True) -> Dict[str, Any]:
+    out_dir = Path(out_dir)
+    shard_dir = out_dir / SHARD_DIR
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    compressors = _compressors(brotli)
+
+    init_db()
+    with get_session() as s:
+        export = build_export(s)
+    manifest = export["manifest"]
+
+    written = set()
+    shard_bytes = 0
+    for entry in manifest["models"]:
+        body = _dumps(export["shards"][entry["name"]])
+        fname = f"{_slug(entry['name'])}-{hashlib.sha256(body).hexdigest()[:12]}.json"
+        entry["shard"] = f"{SHARD_DIR}/{fname}"
+        written.add(fname)
+        if not (shard_dir / fname).exists():
+            _write(shard_dir / fname, body, compressors)
+        shard_bytes += len(body)
+
+    manifest_body = _dumps(manifest)
+    _write(out_dir / MANIFEST, manifest_body, compressors)
+
+    removed = 0
+    for p in shard_dir.iterdir():
+        base = p.name.split(".json", 1)[0] + ".json"
+        if p.is_file() and base not in written:
+            p.unlink()
+            removed += 1
+
+    return {
+        "models": len(manifest["models"]),
+        "manifest_bytes": len(manifest_body),
+        "manifest_gzip_bytes": len(gzip.compress(manifest_body, compresslevel=9, mtime=0)),
+        "shard_bytes": shard_bytes,
+        "removed_files": removed,
+        "out": str(out_dir),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+    ap = argparse.ArgumentParser(description="Export precomputed ABUS data for the static docs/ site")
+    ap.add_argument("--out", default=os.path.join(ROOT, "docs", "data"), help="output directory (default: docs/data)")
+    ap.add_argument("--no-brotli", action="store_true", help="only write .gz variants")
+    args = ap.parse_args(argv)
+    print(json.dumps(export_static(Path(args.out), brotli=not args.no_brotli), indent=2))
+
+
+if __name__ == "__main__":
+    main()
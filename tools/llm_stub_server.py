@@ -0,0 +1,96 @@
+# tools/llm_stub_server.py
+"""
+Local OpenAI-compatible stub for offline testing of OpenAICompatibleProvider.
+
+- POST /v1/chat/completions: reads the SUBFEATURES_JSON / PAPER blocks that
+  OpenAICompatibleProvider sends and answers with deterministic scores from
+  RuleBasedProvider's keyword heuristics, as a JSON message content.
+- Optional artificial latency and injected 429/500 failures (to exercise
+  concurrency, rate limiting and retries).
+- GET /stats: request counts and peak concurrency seen by the server.
+
+Run:
+    python tools/llm_stub_server.py --port 8001 --latency 0.2 --fail-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 python -c "..."
+"""
+
+import os, sys
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import asyncio
+import json
+import random
+import time
+from fastapi import FastAPI, Body
+from fastapi.responses import JSONResponse
+
+from services.llm_providers import RuleBasedProvider
+
+
+def create_app(latency: float = 0.0, fail_rate: float = 0.0, seed: int = 0) -> FastAPI:
+    app = FastAPI(title="ABUS LLM stub")
+    rng = random.Random(seed)
+    rule = RuleBasedProvider()
+    stats = {"requests": 0, "failures_injected": 0, "in_flight": 0, "peak_in_flight": 0}
+
+    def answer(prompt: str) -> dict:
+        head, _, paper = prompt.partition("PAPER:\n")
+        keys = []
+        for line in head.splitlines():
+            if line.startswith("SUBFEATURES_JSON:"):
+                keys = json.loads(line.split(":", 1)[1])
+        schema: dict = {}
+        for key in keys:
+            cat, _, sub = key.partition(".")
+            schema.setdefault(cat, {})[sub] = {}
+        scored = rule.score(paper, schema)
+        return {f"{cat}.{sub}": v for cat, subs in scored.items() for sub, v in subs.items()}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(body: dict = Body(...)):
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+        try:
+            if latency:
+                await asyncio.sleep(latency)
+            if fail_rate and rng.random() < fail_rate:
+                stats["failures_injected"] += 1
+                status = rng.choice([429, 500, 503])
+                headers = {"retry-after": "0.05"} if status == 429 else {}
+                return JSONResponse({"error": {"message": "injected failure"}}, status_code=status, headers=headers)
+
+            user = next((m["content"] for m in body.get("messages", []) if m.get("role") == "user"), "")
+            content = json.dumps(answer(user))
+            return {
+                "id": f"chatcmpl-stub-{stats['requests']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": len(user) // 4, "completion_tokens": len(content) // 4},
+            }
+        finally:
+            stats["in_flight"] -= 1
+
+    @app.get("/stats")
+    def get_stats():
+        return stats
+
+    return app
+
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    ap = argparse.ArgumentParser(description="OpenAI-compatible stub server for ABUS")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8001)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to every completion")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 429/5xx")
+    args = ap.parse_args()
+    uvicorn.run(create_app(args.latency, args.fail_rate), host=args.host, port=args.port, log_level="warning")